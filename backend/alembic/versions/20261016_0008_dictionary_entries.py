@@ -0,0 +1,35 @@
+"""Migration 008 - persistent cache for dictionary lookups.
+
+Revision ID: 20261016_0008
+Revises: 20260311_0007
+Create Date: 2026-10-16
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_0008"
+down_revision: Union[str, None] = "20260311_0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dictionary_entries",
+        sa.Column("word", sa.String(length=80), nullable=False),
+        sa.Column("lemma", sa.String(length=120), nullable=True),
+        sa.Column("pos", sa.String(length=32), nullable=True),
+        sa.Column("translation", sa.String(length=240), nullable=True),
+        sa.Column("definition", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("word"),
+    )
+    op.create_index(op.f("ix_dictionary_entries_updated_at"), "dictionary_entries", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_dictionary_entries_updated_at"), table_name="dictionary_entries")
+    op.drop_table("dictionary_entries")
@@ -0,0 +1,38 @@
+"""Migration 010 - daily activity rollup per user.
+
+Revision ID: 20261016_0010
+Revises: 20261016_0009
+Create Date: 2026-10-16
+
+Após aplicar, preencha o histórico com ``python -m app.cli.rebuild_activity_rollup``.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_0010"
+down_revision: Union[str, None] = "20261016_0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_activity_rollup",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("messages", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sessions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reviews", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reading_activities", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("date", "user_id"),
+    )
+    op.create_index(op.f("ix_daily_activity_rollup_user_id"), "daily_activity_rollup", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_daily_activity_rollup_user_id"), table_name="daily_activity_rollup")
+    op.drop_table("daily_activity_rollup")
@@ -0,0 +1,41 @@
+"""Migration 011 - per-user learning stats and daily good-review counter.
+
+Revision ID: 20261016_0011
+Revises: 20261016_0010
+Create Date: 2026-10-16
+
+Após aplicar, preencha o histórico com ``python -m app.cli.rebuild_activity_rollup``.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_0011"
+down_revision: Union[str, None] = "20261016_0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "daily_activity_rollup",
+        sa.Column("good_reviews", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "user_learning_stats",
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("total_reviews", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("good_reviews", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("current_streak", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_review_date", sa.Date(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_learning_stats")
+    op.drop_column("daily_activity_rollup", "good_reviews")
@@ -0,0 +1,34 @@
+"""Migration 012 - per-user FSRS weights.
+
+Revision ID: 20261016_0012
+Revises: 20261016_0011
+Create Date: 2026-10-16
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_0012"
+down_revision: Union[str, None] = "20261016_0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_fsrs_params",
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("weights", sa.JSON(), nullable=False),
+        sa.Column("review_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("log_loss", sa.Float(), nullable=False),
+        sa.Column("default_log_loss", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_fsrs_params")
@@ -0,0 +1,39 @@
+"""Migration 013 - per-user activity totals for the admin metrics page.
+
+Revision ID: 20261016_0013
+Revises: 20261016_0012
+Create Date: 2026-10-16
+
+Após aplicar, preencha com ``python -m app.cli.rebuild_activity_rollup``.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_0013"
+down_revision: Union[str, None] = "20261016_0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_activity_summary",
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("messages", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sessions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reviews", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reading_activities", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reading_questions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_active", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_user_activity_summary_last_active", "user_activity_summary", ["last_active"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_activity_summary_last_active", table_name="user_activity_summary")
+    op.drop_table("user_activity_summary")
@@ -0,0 +1,26 @@
+"""Migration 014 - unbounded dictionary translations.
+
+Revision ID: 20261017_0014
+Revises: 20261016_0013
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0014"
+down_revision: Union[str, None] = "20261016_0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("dictionary_entries") as batch_op:
+        batch_op.alter_column("translation", type_=sa.Text(), existing_type=sa.String(length=240), existing_nullable=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("dictionary_entries") as batch_op:
+        batch_op.alter_column("translation", type_=sa.String(length=240), existing_type=sa.Text(), existing_nullable=True)
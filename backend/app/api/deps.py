@@ -3,9 +3,11 @@ from typing import Literal
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from sqlalchemy import event, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.core.security import TokenError, decode_access_token
 from app.db.models import TierLimits, User
@@ -20,6 +22,47 @@ _chat_limiter = rate_limit_dependency(settings.rate_limit_chat)
 _llm_router_singleton: LLMRouter | None = None
 
 
+# ── Cache de usuários autenticados (TTL curto, por processo) ─────────────────
+# Guarda só os valores das colunas; a cada requisição o User é reanexado à sessão
+# com merge(load=False), sem SELECT, e continua podendo ser alterado e commitado.
+
+_user_cache: LRUCache[str, dict] = LRUCache(
+    "users",
+    settings.user_cache_max_entries,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
+_USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+def invalidate_user_cache(user_id: str | None = None) -> None:
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.delete(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(_mapper, _connection, target: User) -> None:
+    # Cobre update_user/delete_user do admin e as edições de perfil; outros workers
+    # enxergam a mudança quando o TTL expira.
+    invalidate_user_cache(target.id)
+
+
+async def _load_user(db: AsyncSession, user_id: str) -> User | None:
+    if settings.user_cache_ttl_seconds > 0:
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            user = User(**cached)
+            make_transient_to_detached(user)
+            return await db.merge(user, load=False)
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    if user is not None and settings.user_cache_ttl_seconds > 0:
+        _user_cache.set(user_id, {column: getattr(user, column) for column in _USER_COLUMNS})
+    return user
+
+
 # ── get_current_user — deve ser definido ANTES de qualquer Depends que o usa ──
 
 async def get_current_user(
@@ -42,8 +85,7 @@ async def get_current_user(
     if not user_id:
         raise credentials_exception
 
-    stmt = select(User).where(User.id == user_id)
-    user = (await db.execute(stmt)).scalar_one_or_none()
+    user = await _load_user(db, user_id)
     if not user:
         raise credentials_exception
     request.state.user_id = user.id
@@ -123,14 +165,14 @@ def _make_daily_dep(key_prefix: str, limit_type: Literal["chat", "analysis"], la
         chat_limit, analysis_limit = await _get_limits_for_tier(db, current_user.tier)
         limit = chat_limit if limit_type == "chat" else analysis_limit
         key = f"{key_prefix}:{current_user.id}"
-        allowed = daily_user_limiter.check(key, limit=limit, window_seconds=SECONDS_PER_DAY)
+        allowed = await daily_user_limiter.check(key, limit=limit, window_seconds=SECONDS_PER_DAY)
         if not allowed:
-            used = daily_user_limiter.count(key, window_seconds=SECONDS_PER_DAY)
+            used = await daily_user_limiter.count(key, window_seconds=SECONDS_PER_DAY)
             raise HTTPException(
                 status_code=429,
                 detail=(
                     f"Limite diário de {label} atingido ({used}/{limit}) para o seu plano '{current_user.tier}'. "
-                    "Sua cota será reiniciada 24 h após sua primeira solicitação de hoje."
+                    "Sua cota é liberada gradualmente ao longo das próximas 24 h."
                 ),
             )
     return dependency
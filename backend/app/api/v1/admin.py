@@ -1,19 +1,28 @@
 ﻿"""Endpoints administrativos - listagem de usuarios, gestao de tier e limites."""
 
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime, time, timedelta
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, require_admin
-from app.db.models import Flashcard, Message, ReadingAttempt, ReviewLog, Session, TierLimits, User
+from app.core.metrics import metrics
+from app.db.models import (
+    DailyActivityRollup,
+    ReadingAttempt,
+    TierLimits,
+    User,
+    UserActivitySummary,
+)
 from app.db.session import get_db
 from app.schemas.admin import (
     AdminMetricsResponse,
     AdminUserListItem,
     AdminUserUpdate,
     DailyActivity,
+    RuntimeMetricsResponse,
     TierLimitsResponse,
     TierLimitsUpdate,
     UserMetric,
@@ -23,6 +32,17 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 VALID_TIERS = {"free", "pro"}
 
+UserMetricSortKey = Literal[
+    "last_active",
+    "created_at",
+    "full_name",
+    "total_sessions",
+    "total_messages",
+    "total_reviews",
+    "total_reading_activities",
+    "total_reading_questions",
+]
+
 
 @router.get("/users", response_model=list[AdminUserListItem], dependencies=[Depends(require_admin)])
 async def list_users(db: AsyncSession = Depends(get_db)) -> list[AdminUserListItem]:
@@ -115,163 +135,108 @@ async def update_tier_limits(
     return row
 
 
+def _user_metrics_query(sort: UserMetricSortKey, order: Literal["asc", "desc"]):
+    """Métricas por usuário lidas de ``user_activity_summary`` (mantida a cada evento), então
+    a página custa um join e um ORDER BY ... LIMIT, não uma agregação sobre todos os eventos."""
+    summary = UserActivitySummary
+    columns = {
+        "total_sessions": func.coalesce(summary.sessions, 0),
+        "total_messages": func.coalesce(summary.messages, 0),
+        "total_reviews": func.coalesce(summary.reviews, 0),
+        "total_reading_activities": func.coalesce(summary.reading_activities, 0),
+        "total_reading_questions": func.coalesce(summary.reading_questions, 0),
+        "last_active": summary.last_active,
+    }
+    sort_column = columns[sort] if sort in columns else getattr(User, sort)
+    ordering = sort_column.asc().nulls_first() if order == "asc" else sort_column.desc().nulls_last()
+
+    return (
+        select(
+            User.id,
+            User.full_name,
+            User.email,
+            User.tier,
+            User.is_active,
+            User.created_at,
+            *(expr.label(name) for name, expr in columns.items()),
+        )
+        .outerjoin(summary, summary.user_id == User.id)
+        .order_by(ordering, User.id)
+    )
+
+
 @router.get("/metrics", response_model=AdminMetricsResponse, dependencies=[Depends(require_admin)])
 async def get_metrics(
     days: int = Query(default=30, ge=1, le=90, description="Periodo em dias (1-90)"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Usuarios por pagina"),
+    offset: int = Query(default=0, ge=0),
+    sort: UserMetricSortKey = Query(default="last_active"),
+    order: Literal["asc", "desc"] = Query(default="desc"),
     db: AsyncSession = Depends(get_db),
 ) -> AdminMetricsResponse:
     now = datetime.now(UTC)
     cutoff = now - timedelta(days=days)
 
-    all_users = (await db.execute(select(User))).scalars().all()
-    total_users = len(all_users)
-    active_users = sum(1 for u in all_users if u.is_active)
-    inactive_users = total_users - active_users
-    new_users_period = sum(1 for u in all_users if u.created_at >= cutoff)
-
-    messages_period = (
+    total_users, active_users, new_users_period = (
         await db.execute(
-            select(func.count(Message.id))
-            .join(Session, Session.id == Message.session_id)
-            .where(Message.role == "user", Message.created_at >= cutoff)
+            select(
+                func.count(User.id),
+                func.coalesce(func.sum(case((User.is_active.is_(True), 1), else_=0)), 0),
+                func.coalesce(func.sum(case((User.created_at >= cutoff, 1), else_=0)), 0),
+            )
         )
-    ).scalar_one()
-
-    sessions_period = (
-        await db.execute(select(func.count(Session.id)).where(Session.created_at >= cutoff))
-    ).scalar_one()
-
-    reviews_period = (
-        await db.execute(select(func.count(ReviewLog.id)).where(ReviewLog.reviewed_at >= cutoff))
-    ).scalar_one()
+    ).one()
+    inactive_users = total_users - active_users
 
-    reading_rows = (
+    # Séries diárias e totais do período vêm do rollup (dias inteiros em UTC), não dos eventos.
+    daily_rows = (
         await db.execute(
             select(
-                ReadingAttempt.completed_at,
-                ReadingAttempt.user_id,
-                ReadingAttempt.total_questions,
-                ReadingAttempt.correct_answers,
-            ).where(ReadingAttempt.completed_at >= cutoff)
+                DailyActivityRollup.day,
+                func.sum(DailyActivityRollup.messages),
+                func.sum(DailyActivityRollup.sessions),
+                func.sum(DailyActivityRollup.reviews),
+                func.sum(DailyActivityRollup.reading_activities),
+            )
+            .where(DailyActivityRollup.day >= cutoff.date())
+            .group_by(DailyActivityRollup.day)
+            .order_by(DailyActivityRollup.day)
         )
     ).all()
-
-    reading_activities_period = len(reading_rows)
-    reading_questions_answered_period = sum(total for _, _, total, _ in reading_rows)
-    reading_correct_answers_period = sum(correct for _, _, _, correct in reading_rows)
-
-    msg_rows = (
-        await db.execute(
-            select(Message.created_at)
-            .join(Session, Session.id == Message.session_id)
-            .where(Message.role == "user", Message.created_at >= cutoff)
+    daily_activity = [
+        DailyActivity(
+            date=day.isoformat(),
+            messages=int(messages),
+            sessions=int(sessions),
+            reviews=int(reviews),
+            reading_activities=int(reading),
         )
-    ).scalars().all()
-
-    sess_rows = (
-        await db.execute(select(Session.created_at).where(Session.created_at >= cutoff))
-    ).scalars().all()
-
-    rev_rows = (
-        await db.execute(select(ReviewLog.reviewed_at).where(ReviewLog.reviewed_at >= cutoff))
-    ).scalars().all()
-
-    daily: dict[str, dict[str, int]] = {}
-    for dt in msg_rows:
-        k = dt.date().isoformat()
-        daily.setdefault(k, {"messages": 0, "sessions": 0, "reviews": 0, "reading_activities": 0})["messages"] += 1
-    for dt in sess_rows:
-        k = dt.date().isoformat()
-        daily.setdefault(k, {"messages": 0, "sessions": 0, "reviews": 0, "reading_activities": 0})["sessions"] += 1
-    for dt in rev_rows:
-        k = dt.date().isoformat()
-        daily.setdefault(k, {"messages": 0, "sessions": 0, "reviews": 0, "reading_activities": 0})["reviews"] += 1
-    for completed_at, _, _, _ in reading_rows:
-        k = completed_at.date().isoformat()
-        daily.setdefault(k, {"messages": 0, "sessions": 0, "reviews": 0, "reading_activities": 0})["reading_activities"] += 1
-
-    daily_activity = [DailyActivity(date=k, **daily[k]) for k in sorted(daily.keys())]
-
-    user_metrics: list[UserMetric] = []
-    for user in all_users:
-        u_sessions = (
-            await db.execute(select(func.count(Session.id)).where(Session.user_id == user.id))
-        ).scalar_one()
-
-        u_messages = (
-            await db.execute(
-                select(func.count(Message.id))
-                .join(Session, Session.id == Message.session_id)
-                .where(Session.user_id == user.id, Message.role == "user")
-            )
-        ).scalar_one()
-
-        u_reviews = (
-            await db.execute(
-                select(func.count(ReviewLog.id))
-                .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
-                .where(Flashcard.user_id == user.id)
-            )
-        ).scalar_one()
-
-        reading_totals = (
-            await db.execute(
-                select(
-                    func.count(ReadingAttempt.id),
-                    func.coalesce(func.sum(ReadingAttempt.total_questions), 0),
-                    func.max(ReadingAttempt.completed_at),
-                ).where(ReadingAttempt.user_id == user.id)
-            )
-        ).one()
-        u_reading_activities, u_reading_questions, last_reading_dt = reading_totals
-
-        last_msg_dt = (
-            await db.execute(
-                select(func.max(Message.created_at))
-                .join(Session, Session.id == Message.session_id)
-                .where(Session.user_id == user.id, Message.role == "user")
-            )
-        ).scalar_one()
-
-        last_rev_dt = (
-            await db.execute(
-                select(func.max(ReviewLog.reviewed_at))
-                .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
-                .where(Flashcard.user_id == user.id)
-            )
-        ).scalar_one()
-
-        candidates = [d for d in [last_msg_dt, last_rev_dt, last_reading_dt] if d is not None]
-        last_active = max(candidates) if candidates else None
-
-        user_metrics.append(
-            UserMetric(
-                id=user.id,
-                full_name=user.full_name,
-                email=user.email,
-                tier=user.tier,
-                is_active=user.is_active,
-                created_at=user.created_at,
-                total_sessions=int(u_sessions),
-                total_messages=int(u_messages),
-                total_reviews=int(u_reviews),
-                total_reading_activities=int(u_reading_activities or 0),
-                total_reading_questions=int(u_reading_questions or 0),
-                last_active=last_active,
-            )
+        for day, messages, sessions, reviews, reading in daily_rows
+        if messages or sessions or reviews or reading
+    ]
+    messages_period = sum(item.messages for item in daily_activity)
+    sessions_period = sum(item.sessions for item in daily_activity)
+    reviews_period = sum(item.reviews for item in daily_activity)
+    reading_activities_period = sum(item.reading_activities for item in daily_activity)
+
+    reading_questions_answered_period, reading_correct_answers_period = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(ReadingAttempt.total_questions), 0),
+                func.coalesce(func.sum(ReadingAttempt.correct_answers), 0),
+            ).where(ReadingAttempt.completed_at >= datetime.combine(cutoff.date(), time.min, tzinfo=UTC))
         )
+    ).one()
 
-    user_metrics.sort(
-        key=lambda x: x.last_active or datetime.min.replace(tzinfo=UTC),
-        reverse=True,
-    )
+    user_rows = (await db.execute(_user_metrics_query(sort, order).limit(limit).offset(offset))).all()
+    user_metrics = [UserMetric.model_validate(row._mapping) for row in user_rows]
 
     return AdminMetricsResponse(
         period_days=days,
-        total_users=total_users,
-        active_users=active_users,
-        inactive_users=inactive_users,
-        new_users_period=new_users_period,
+        total_users=int(total_users),
+        active_users=int(active_users),
+        inactive_users=int(inactive_users),
+        new_users_period=int(new_users_period),
         messages_period=int(messages_period),
         sessions_period=int(sessions_period),
         reviews_period=int(reviews_period),
@@ -280,4 +245,12 @@ async def get_metrics(
         reading_correct_answers_period=int(reading_correct_answers_period),
         daily_activity=daily_activity,
         user_metrics=user_metrics,
+        user_metrics_offset=offset,
+        user_metrics_limit=limit,
     )
+
+
+@router.get("/runtime-metrics", response_model=RuntimeMetricsResponse, dependencies=[Depends(require_admin)])
+async def get_runtime_metrics() -> RuntimeMetricsResponse:
+    """Contadores e gauges em memória deste worker (cache, filas, especulação, etc.)."""
+    return RuntimeMetricsResponse(**metrics.snapshot())
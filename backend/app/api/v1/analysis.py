@@ -1,6 +1,8 @@
 """Analysis for messages and reading texts with caching to reduce repeated LLM calls."""
 
+import asyncio
 import hashlib
+import re
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
@@ -13,9 +15,13 @@ from app.api.deps import (
     get_daily_limit_dep,
     get_llm_router,
 )
+from app.core.cache import LRUCache
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
 from app.db.models import AnalysisCache, Message, Session, User
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, get_db
 from app.schemas.analysis import MessageAnalysisResponse, TextAnalysisRequest, TokenInfo
 from app.services.errors import ProviderError
 from app.services.llm_router import LLMRouter
@@ -25,6 +31,26 @@ router = APIRouter(prefix="/messages", tags=["analysis"])
 text_router = APIRouter(prefix="/analysis", tags=["analysis"])
 logger = get_logger(__name__)
 
+# Respostas prontas para servir, por hash com escopo: (resposta, provider, model).
+_analysis_memory_cache: LRUCache[str, tuple[MessageAnalysisResponse, str, str]] = LRUCache(
+    "analysis",
+    settings.analysis_memory_cache_max_entries,
+    max_bytes=settings.analysis_memory_cache_max_bytes,
+    ttl_seconds=settings.analysis_memory_cache_ttl_seconds,
+    sizeof=lambda entry: _approx_response_size(entry[0]),
+)
+# Requisições concorrentes pelo mesmo hash aguardam uma única chamada ao LLM.
+_analysis_flights: SingleFlight[str, tuple[MessageAnalysisResponse, str, str]] = SingleFlight("analysis")
+
+# Fim de sentença: pontuação (opcionalmente seguida de aspas/parênteses) + espaço + início de nova frase.
+_SENTENCE_BOUNDARY_RE = re.compile(
+    r"(?:(?<=[.!?…])|(?<=[.!?…][\"”’')\]]))\s+(?=[A-Z0-9\"“‘'(\[])"
+)
+_SENTENCE_CONTEXT = {
+    "topic": "reading_sentence",
+    "persona_prompt": "Analyze one sentence of a reading passage and keep token translations learner-friendly.",
+}
+
 
 def _sentence_hash(sentence: str) -> str:
     """Build a SHA-256 hash for text cache lookups."""
@@ -59,6 +85,28 @@ def _normalize_analysis_result(source_text: str, result: SentenceAnalysis) -> Se
     )
 
 
+def _split_passage(text: str) -> list[tuple[str, str]]:
+    """Divide o texto em sentenças, guardando o separador original após cada uma.
+
+    Retorna pares (sentença, separador) para que traduções possam ser recosturadas
+    preservando quebras de linha e parágrafos.
+    """
+    segments: list[tuple[str, str]] = []
+    lines = text.split("\n")
+    for index, line in enumerate(lines):
+        line_separator = "\n" if index < len(lines) - 1 else ""
+        sentences = [part.strip() for part in _SENTENCE_BOUNDARY_RE.split(line) if part.strip()]
+        if not sentences:
+            if segments:
+                sentence, separator = segments[-1]
+                segments[-1] = (sentence, separator + line_separator)
+            continue
+        for position, sentence in enumerate(sentences):
+            separator = " " if position < len(sentences) - 1 else line_separator
+            segments.append((sentence, separator))
+    return segments
+
+
 def _analysis_to_dict(result: SentenceAnalysis) -> dict:
     """Serialize SentenceAnalysis for cache storage."""
     return {
@@ -77,6 +125,14 @@ def _analysis_to_dict(result: SentenceAnalysis) -> dict:
     }
 
 
+def _approx_response_size(response: MessageAnalysisResponse) -> int:
+    """Estimativa barata de bytes ocupados (soma dos textos) para o limite do LRU."""
+    size = len(response.original_en) + len(response.translation_pt)
+    for tok in response.tokens:
+        size += 64 + sum(len(v) for v in (tok.token, tok.lemma, tok.pos, tok.translation, tok.definition) if v)
+    return size
+
+
 def _response_from_result(result: SentenceAnalysis) -> MessageAnalysisResponse:
     return MessageAnalysisResponse(
         original_en=result.original_en,
@@ -103,39 +159,167 @@ async def _analyze_text_with_cache(
     db: AsyncSession,
     provider_override: str | None = None,
     cache_scope: str = "text",
-) -> tuple[SentenceAnalysis, str, str]:
+) -> tuple[MessageAnalysisResponse, str, str]:
     candidate = text.strip()
     h = _sentence_hash(f"{cache_scope}:{candidate}")
 
+    hot = _analysis_memory_cache.get(h)
+    if hot is not None:
+        return hot
+
     cached = (
         await db.execute(select(AnalysisCache).where(AnalysisCache.sentence_hash == h))
     ).scalar_one_or_none()
 
     if cached:
         logger.info("analysis.cache_hit scope=%s", cache_scope)
-        return _cache_to_analysis(cached.analysis_json), cached.provider or "cache", cached.model or "cache"
+        entry = (
+            _response_from_result(_cache_to_analysis(cached.analysis_json)),
+            cached.provider or "cache",
+            cached.model or "cache",
+        )
+        _analysis_memory_cache.set(h, entry)
+        return entry
+
+    async def compute() -> tuple[MessageAnalysisResponse, str, str]:
+        return await _analyze_and_store(
+            h=h,
+            text=candidate,
+            context=context,
+            llm_router=llm_router,
+            provider_override=provider_override,
+            user_preference=current_user.preferred_ai_provider,
+        )
+
+    return await _analysis_flights.do(h, compute)
+
+
+async def _analyze_and_store(
+    *,
+    h: str,
+    text: str,
+    context: dict,
+    llm_router: LLMRouter,
+    provider_override: str | None,
+    user_preference: str | None,
+) -> tuple[MessageAnalysisResponse, str, str]:
+    """Executa a análise uma única vez por hash e grava o cache exatamente uma vez.
+
+    Roda dentro do single-flight, possivelmente além da vida da requisição que a iniciou,
+    por isso usa uma sessão própria em vez da sessão da requisição.
+    """
+    hot = _analysis_memory_cache.get(h)
+    if hot is not None:
+        return hot
 
     result, provider_name, model_name = await llm_router.analyze_sentence(
-        sentence_en=candidate,
+        sentence_en=text,
         context=context,
         provider_override=provider_override,
-        user_preference=current_user.preferred_ai_provider,
+        user_preference=user_preference,
     )
-    result = _normalize_analysis_result(candidate, result)
+    result = _normalize_analysis_result(text, result)
+
+    async with AsyncSessionLocal() as db:
+        db.add(
+            AnalysisCache(
+                sentence_hash=h,
+                analysis_json=_analysis_to_dict(result),
+                provider=provider_name,
+                model=model_name,
+            )
+        )
+        try:
+            await db.commit()
+        except Exception:
+            await db.rollback()
 
-    cache_entry = AnalysisCache(
-        sentence_hash=h,
-        analysis_json=_analysis_to_dict(result),
-        provider=provider_name,
-        model=model_name,
-    )
-    db.add(cache_entry)
-    try:
-        await db.commit()
-    except Exception:
-        await db.rollback()
+    entry = (_response_from_result(result), provider_name, model_name)
+    _analysis_memory_cache.set(h, entry)
+    return entry
 
-    return result, provider_name, model_name
+
+async def _analyze_passage_by_sentence(
+    *,
+    text: str,
+    llm_router: LLMRouter,
+    current_user: User,
+    db: AsyncSession,
+    provider_override: str | None = None,
+) -> tuple[MessageAnalysisResponse, str, str]:
+    """Analisa uma passagem sentença a sentença e costura o resultado num único response.
+
+    Cada sentença tem sua própria entrada no cache (memória → uma consulta IN no banco),
+    e só as que faltam vão ao LLM, em paralelo e com fan-out limitado.
+    """
+    segments = _split_passage(text)
+    if len(segments) > settings.analysis_max_sentences:
+        raise HTTPException(
+            status_code=422,
+            detail=f"text is too long (max {settings.analysis_max_sentences} sentences)",
+        )
+
+    hashes = [_sentence_hash(f"reading_sentence:{sentence}") for sentence, _ in segments]
+    entries: dict[str, tuple[MessageAnalysisResponse, str, str]] = {}
+
+    for h in set(hashes):
+        hot = _analysis_memory_cache.get(h)
+        if hot is not None:
+            entries[h] = hot
+    metrics.incr("analysis_sentence_lookups_total", len(entries), source="memory")
+
+    missing = [h for h in set(hashes) if h not in entries]
+    if missing:
+        rows = (
+            await db.execute(select(AnalysisCache).where(AnalysisCache.sentence_hash.in_(missing)))
+        ).scalars().all()
+        for row in rows:
+            entry = (
+                _response_from_result(_cache_to_analysis(row.analysis_json)),
+                row.provider or "cache",
+                row.model or "cache",
+            )
+            _analysis_memory_cache.set(row.sentence_hash, entry)
+            entries[row.sentence_hash] = entry
+        metrics.incr("analysis_sentence_lookups_total", len(rows), source="db")
+
+    to_compute = {h: sentence for h, (sentence, _) in zip(hashes, segments) if h not in entries}
+    if to_compute:
+        metrics.incr("analysis_sentence_lookups_total", len(to_compute), source="llm")
+        semaphore = asyncio.Semaphore(max(settings.analysis_sentence_concurrency, 1))
+
+        async def run(h: str, sentence: str) -> tuple[MessageAnalysisResponse, str, str]:
+            async def compute() -> tuple[MessageAnalysisResponse, str, str]:
+                return await _analyze_and_store(
+                    h=h,
+                    text=sentence,
+                    context=_SENTENCE_CONTEXT,
+                    llm_router=llm_router,
+                    provider_override=provider_override,
+                    user_preference=current_user.preferred_ai_provider,
+                )
+
+            async with semaphore:
+                return await _analysis_flights.do(h, compute)
+
+        computed = await asyncio.gather(*(run(h, sentence) for h, sentence in to_compute.items()))
+        entries.update(zip(to_compute.keys(), computed))
+
+    translation_parts: list[str] = []
+    tokens: list[TokenInfo] = []
+    for h, (_, separator) in zip(hashes, segments):
+        response = entries[h][0]
+        translation_parts.append(response.translation_pt.strip() + separator)
+        tokens.extend(response.tokens)
+
+    # Provider/model reportados: os da primeira sentença que precisou do LLM, senão os do cache.
+    source = next((entries[h] for h in to_compute), entries[hashes[0]])
+    stitched = MessageAnalysisResponse(
+        original_en=text,
+        translation_pt="".join(translation_parts).strip(),
+        tokens=tokens,
+    )
+    return stitched, source[1], source[2]
 
 
 @router.post("/{message_id}/analysis", response_model=MessageAnalysisResponse, dependencies=[Depends(get_daily_analysis_limit_dep())])
@@ -186,7 +370,7 @@ async def analyze_message(
         },
     )
 
-    return _response_from_result(result)
+    return result
 
 
 @text_router.post(
@@ -206,17 +390,12 @@ async def analyze_text(
         raise HTTPException(status_code=422, detail="text is too short")
 
     try:
-        result, provider_name, model_name = await _analyze_text_with_cache(
+        result, provider_name, model_name = await _analyze_passage_by_sentence(
             text=text,
-            context={
-                "topic": "reading_text",
-                "persona_prompt": "Analyze the full reading passage and keep token translations learner-friendly.",
-            },
             llm_router=llm_router,
             current_user=current_user,
             db=db,
             provider_override=provider_override,
-            cache_scope="reading_text",
         )
     except ProviderError as exc:
         raise HTTPException(status_code=503, detail=f"provider unavailable: {exc}")
@@ -229,7 +408,8 @@ async def analyze_text(
             "model": model_name,
             "token_count": len(result.tokens),
             "text_length": len(text),
+            "sentence_count": len(_split_passage(text)),
         },
     )
 
-    return _response_from_result(result)
+    return result
@@ -8,8 +8,8 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_refresh_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
 )
 from app.db.models import User
 from app.db.session import get_db
@@ -27,7 +27,7 @@ async def register_user(payload: UserRegister, db: AsyncSession = Depends(get_db
     user = User(
         full_name=payload.full_name.strip(),
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
         edge_tts_voice=settings.edge_tts_default_voice,
         is_active=False,
     )
@@ -40,7 +40,7 @@ async def register_user(payload: UserRegister, db: AsyncSession = Depends(get_db
 @router.post("/login", response_model=TokenPair, dependencies=[Depends(get_auth_rate_limit_dep())])
 async def login(payload: UserLogin, db: AsyncSession = Depends(get_db)) -> TokenPair:
     user = (await db.execute(select(User).where(User.email == payload.email))).scalar_one_or_none()
-    if not user or not verify_password(payload.password, user.password_hash):
+    if not user or not await verify_password_async(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="invalid email or password")
 
     if not user.is_active:
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, Query
 
-from app.api.deps import get_current_user
+from app.api.deps import get_chat_rate_limit_dep, get_current_user
+from app.core.config import settings
 from app.db.models import User
 from app.schemas.analysis import TokenInfo
+from app.schemas.dictionary import DictionaryBatchRequest, DictionaryBatchResponse
+from app.services.dictionary_index import OfflineDictionaryIndex
 from app.services.dictionary_lookup import DictionaryLookupService
 
 router = APIRouter(prefix="/dictionary", tags=["dictionary"])
 
-dictionary_lookup_service = DictionaryLookupService()
+dictionary_lookup_service = DictionaryLookupService(
+    index=OfflineDictionaryIndex.open_if_available(settings.dictionary_index_path)
+)
 
 
 @router.get("/lookup", response_model=TokenInfo)
@@ -16,3 +21,12 @@ async def lookup_word(
     _current_user: User = Depends(get_current_user),
 ) -> TokenInfo:
     return await dictionary_lookup_service.lookup(word)
+
+
+@router.post("/lookup/batch", response_model=DictionaryBatchResponse, dependencies=[Depends(get_chat_rate_limit_dep())])
+async def lookup_words_batch(
+    payload: DictionaryBatchRequest,
+    _current_user: User = Depends(get_current_user),
+) -> DictionaryBatchResponse:
+    entries = await dictionary_lookup_service.lookup_many(payload.words)
+    return DictionaryBatchResponse(entries=entries)
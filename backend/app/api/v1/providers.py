@@ -1,9 +1,11 @@
+from dataclasses import asdict
+
 from fastapi import APIRouter, Depends
 
 from app.api.deps import get_current_user, get_llm_router
 from app.core.config import settings
 from app.db.models import User
-from app.schemas.providers import ProviderStatusResponse
+from app.schemas.providers import CircuitBreakerStatus, ProviderStatusResponse
 from app.services.llm_router import LLMRouter
 
 router = APIRouter(prefix="/providers", tags=["providers"])
@@ -17,4 +19,7 @@ async def providers_status(
     return ProviderStatusResponse(
         default_provider=settings.default_ai_provider,
         available_providers=llm_router.available_provider_names(),
+        circuit_breakers=[
+            CircuitBreakerStatus(**asdict(snapshot)) for snapshot in llm_router.circuit_breaker_status()
+        ],
     )
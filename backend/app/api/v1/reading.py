@@ -16,6 +16,7 @@ from app.schemas.reading import (
     ReadingProgressOverview,
     ReadingQuestionResponse,
 )
+from app.services.activity_rollup import record_activity
 from app.services.errors import ProviderError
 from app.services.llm_router import LLMRouter
 
@@ -86,6 +87,9 @@ async def create_reading_attempt(
         accuracy_rate=accuracy_rate,
     )
     db.add(attempt)
+    await record_activity(
+        db, current_user.id, reading_activities=1, reading_questions=payload.total_questions
+    )
     await db.commit()
     await db.refresh(attempt)
 
@@ -7,6 +7,7 @@ from app.db.models import Message, Session, User
 from app.db.session import get_db
 from app.schemas.messages import MessageResponse
 from app.schemas.sessions import SessionCreate, SessionResponse, SessionUpdate
+from app.services.activity_rollup import record_activity, remove_session_activity
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
@@ -24,6 +25,7 @@ async def create_session(
         cefr_level=payload.cefr_level,
     )
     db.add(session_obj)
+    await record_activity(db, current_user.id, sessions=1)
     await db.commit()
     await db.refresh(session_obj)
     return session_obj
@@ -86,6 +88,7 @@ async def delete_session(
     if not session_obj:
         raise HTTPException(status_code=404, detail="session not found")
 
+    await remove_session_activity(db, session_obj)
     await db.delete(session_obj)
     await db.commit()
     return Response(status_code=204)
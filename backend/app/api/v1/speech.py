@@ -1,29 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
 from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
 from app.db.models import User
 from app.schemas.speech import SpeechSynthesizeRequest
-from app.services.edge_tts import DEFAULT_EDGE_TTS_VOICE, is_supported_edge_tts_voice, synthesize_with_edge_tts
+from app.services.edge_tts import resolve_edge_tts_voice
+from app.services.tts_cache import cached_audio, stream_and_cache, synthesize_cached, tts_cache_key
+from app.services.tts_prefetch import tts_prefetcher
 
 router = APIRouter(prefix="/speech", tags=["speech"])
+logger = get_logger(__name__)
 
 
-@router.post("/tts")
-async def synthesize_speech(
-    payload: SpeechSynthesizeRequest,
-    current_user: User = Depends(get_current_user),
+def _cache_headers(key: str) -> dict[str, str]:
+    # Conteúdo imutável por chave; "private" porque a rota exige autenticação e a voz depende
+    # do usuário: só o navegador de quem pediu guarda o áudio.
+    return {
+        "ETag": f'"{key}"',
+        "Cache-Control": f"private, max-age={settings.tts_cache_max_age_seconds}, immutable",
+    }
+
+
+def _etag_matches(request: Request, key: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return f'"{key}"' in candidates or "*" in candidates
+
+
+async def _stream_response(key: str, text: str, voice: str, rate: float, headers: dict[str, str]) -> Response:
+    chunks = stream_and_cache(key, text=text, voice=voice, rate=rate)
+    # Lê o primeiro bloco antes de enviar os headers: falhas logo no início ainda viram 502.
+    try:
+        first_chunk = await anext(chunks)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=502, detail="edge tts returned empty audio") from None
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"edge tts unavailable: {exc}") from exc
+
+    async def body() -> AsyncIterator[bytes]:
+        yield first_chunk
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as exc:
+            # Headers já enviados: propagar a exceção faz o servidor abortar a conexão
+            # (sem o terminador chunked), e o cliente não recebe um MP3 truncado como se fosse válido.
+            metrics.incr("tts_stream_aborted_total")
+            logger.warning("TTS stream aborted mid-synthesis: %s", exc)
+            raise
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(body(), media_type="audio/mpeg", headers=headers)
+
+
+async def _tts_response(
+    request: Request,
+    text: str,
+    rate: float,
+    current_user: User,
+    *,
+    stream: bool = False,
 ) -> Response:
-    text = payload.text.strip()
+    text = text.strip()
     if not text:
         raise HTTPException(status_code=400, detail="text is required")
 
-    voice = (current_user.edge_tts_voice or DEFAULT_EDGE_TTS_VOICE).strip()
-    if not is_supported_edge_tts_voice(voice):
-        voice = DEFAULT_EDGE_TTS_VOICE
+    resolved_voice = resolve_edge_tts_voice(current_user.edge_tts_voice)
+    key = tts_cache_key(text, resolved_voice, rate)
+    cache_headers = _cache_headers(key)
+    if _etag_matches(request, key):
+        return Response(status_code=304, headers=cache_headers)
+
+    if stream:
+        headers = {"Content-Disposition": 'inline; filename="speech.mp3"', **cache_headers}
+        cached = await cached_audio(key)
+        if cached is not None:
+            return Response(content=cached, media_type="audio/mpeg", headers=headers)
+        return await _stream_response(key, text, resolved_voice, rate, headers)
 
     try:
-        audio = await synthesize_with_edge_tts(text=text, voice=voice, rate=payload.rate)
+        with tts_prefetcher.interactive():
+            _, audio = await synthesize_cached(text=text, voice=resolved_voice, rate=rate)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"edge tts unavailable: {exc}") from exc
 
@@ -33,5 +98,26 @@ async def synthesize_speech(
     return Response(
         content=audio,
         media_type="audio/mpeg",
-        headers={"Content-Disposition": 'inline; filename="speech.mp3"'},
-    )
\ No newline at end of file
+        headers={"Content-Disposition": 'inline; filename="speech.mp3"', **cache_headers},
+    )
+
+
+@router.post("/tts")
+async def synthesize_speech(
+    payload: SpeechSynthesizeRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    return await _tts_response(request, payload.text, payload.rate, current_user, stream=payload.stream)
+
+
+@router.get("/tts")
+async def synthesize_speech_get(
+    request: Request,
+    text: str = Query(..., min_length=1, max_length=4000),
+    rate: float = Query(default=1.0, ge=0.5, le=1.5),
+    stream: bool = Query(default=False),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    """Variante GET (mesmos parâmetros): o navegador guarda a resposta e revalida com ETag."""
+    return await _tts_response(request, text, rate, current_user, stream=stream)
@@ -1,6 +1,6 @@
 """API SRS — Flashcards e Revisões com algoritmo FSRS v4."""
 
-from datetime import UTC, datetime, time, timedelta
+from datetime import UTC, date, datetime, timedelta
 import re
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -9,19 +9,24 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
+from app.core.config import settings
 from app.core.logging import get_logger
-from app.db.models import Flashcard, ReviewLog, User
+from app.db.models import DailyActivityRollup, Flashcard, ReviewLog, User, UserLearningStats
 from app.db.session import get_db
 from app.schemas.srs import (
     DailyReviewStat,
     FlashcardCreate,
     FlashcardResponse,
     ProgressOverview,
+    ReviewBatchRequest,
+    ReviewBatchResponse,
     ReviewRequest,
     ReviewResponse,
     ReviewStatsResponse,
 )
 from app.services.fsrs import apply_fsrs
+from app.services.fsrs_params import load_user_weights
+from app.services.learning_stats import current_streak, record_review, record_reviews
 
 router = APIRouter(tags=["srs"])
 logger = get_logger(__name__)
@@ -95,31 +100,24 @@ async def due_flashcards(
     return list((await db.execute(stmt)).scalars().all())
 
 
-@router.post("/reviews", response_model=ReviewResponse)
-async def review_flashcard(
-    payload: ReviewRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> ReviewResponse:
-    stmt = select(Flashcard).where(
-        Flashcard.id == payload.flashcard_id,
-        Flashcard.user_id == current_user.id,
-    )
-    flashcard = (await db.execute(stmt)).scalar_one_or_none()
-    if not flashcard:
-        raise HTTPException(status_code=404, detail="flashcard not found")
-
+def _apply_review(
+    flashcard: Flashcard, rating: str, reviewed_at: datetime, weights: list[float] | None
+) -> tuple[ReviewLog, ReviewResponse]:
+    """Aplica FSRS v4 ao card (em memória) e monta o ReviewLog correspondente."""
     old_interval = flashcard.interval_days
     old_ef = flashcard.ease_factor
 
     # Aplica FSRS v4 em vez de SM-2
     updated = apply_fsrs(
-        rating=payload.rating,
+        rating=rating,
         current_interval=flashcard.interval_days,
         current_repetitions=flashcard.repetitions,
         current_ef=flashcard.ease_factor,
         stability=flashcard.stability,
         difficulty=flashcard.difficulty,
+        reviewed_at=reviewed_at,
+        weights=weights,
+        desired_retention=settings.fsrs_desired_retention,
     )
 
     flashcard.interval_days = updated.interval_days
@@ -132,18 +130,16 @@ async def review_flashcard(
 
     log = ReviewLog(
         flashcard_id=flashcard.id,
-        rating=payload.rating,
+        rating=rating,
         old_interval=old_interval,
         new_interval=updated.interval_days,
         old_ef=old_ef,
         new_ef=updated.ease_factor,
+        reviewed_at=reviewed_at,
     )
-    db.add(log)
-    await db.commit()
-
-    return ReviewResponse(
+    response = ReviewResponse(
         flashcard_id=flashcard.id,
-        rating=payload.rating,
+        rating=rating,
         next_review=flashcard.next_review,
         interval_days=flashcard.interval_days,
         repetitions=flashcard.repetitions,
@@ -151,44 +147,114 @@ async def review_flashcard(
         stability=flashcard.stability,
         difficulty=flashcard.difficulty,
     )
+    return log, response
 
 
-@router.get("/reviews/stats", response_model=ReviewStatsResponse)
-async def review_stats(
+@router.post("/reviews", response_model=ReviewResponse)
+async def review_flashcard(
+    payload: ReviewRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> ReviewStatsResponse:
+) -> ReviewResponse:
+    stmt = select(Flashcard).where(
+        Flashcard.id == payload.flashcard_id,
+        Flashcard.user_id == current_user.id,
+    )
+    flashcard = (await db.execute(stmt)).scalar_one_or_none()
+    if not flashcard:
+        raise HTTPException(status_code=404, detail="flashcard not found")
+
+    reviewed_at = datetime.now(UTC)
+    weights = await load_user_weights(db, current_user.id)
+    log, response = _apply_review(flashcard, payload.rating, reviewed_at, weights)
+    db.add(log)
+    await record_review(db, current_user.id, payload.rating, at=reviewed_at)
+    await db.commit()
+    return response
+
+
+@router.post("/reviews/batch", response_model=ReviewBatchResponse)
+async def review_flashcards_batch(
+    payload: ReviewBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ReviewBatchResponse:
+    """Sincroniza revisões feitas offline: aplica na ordem enviada, com os horários do cliente,
+    numa única transação (tudo ou nada)."""
+    card_ids = {item.flashcard_id for item in payload.reviews}
+    cards = {
+        card.id: card
+        for card in (
+            await db.execute(
+                select(Flashcard).where(Flashcard.id.in_(card_ids), Flashcard.user_id == current_user.id)
+            )
+        ).scalars()
+    }
+    missing = sorted(card_ids - cards.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"flashcards not found: {', '.join(missing)}")
+
     now = datetime.now(UTC)
-    today_start = datetime.combine(now.date(), time.min, tzinfo=UTC)
+    weights = await load_user_weights(db, current_user.id)
+    logs: list[ReviewLog] = []
+    results: list[ReviewResponse] = []
+    reviewed: list[tuple[str, datetime]] = []
+    for item in payload.reviews:
+        # Sem fuso = UTC; relógio do aparelho adiantado não agenda revisões no futuro.
+        reviewed_at = item.reviewed_at if item.reviewed_at.tzinfo else item.reviewed_at.replace(tzinfo=UTC)
+        reviewed_at = min(reviewed_at, now)
+        log, response = _apply_review(cards[item.flashcard_id], item.rating, reviewed_at, weights)
+        logs.append(log)
+        results.append(response)
+        reviewed.append((item.rating, reviewed_at))
+
+    db.add_all(logs)
+    await record_reviews(db, current_user.id, reviewed)
+    await db.commit()
+    return ReviewBatchResponse(results=results)
 
-    total_cards = (
-        await db.execute(select(func.count(Flashcard.id)).where(Flashcard.user_id == current_user.id))
-    ).scalar_one()
 
-    due_now = (
+async def _daily_review_stats(db: AsyncSession, user_id: str, since: date) -> list[DailyReviewStat]:
+    """Revisões e acertos por dia a partir do rollup (no máximo uma linha por dia)."""
+    rows = (
         await db.execute(
-            select(func.count(Flashcard.id)).where(
-                Flashcard.user_id == current_user.id,
-                Flashcard.next_review <= now,
+            select(DailyActivityRollup.day, DailyActivityRollup.reviews, DailyActivityRollup.good_reviews)
+            .where(
+                DailyActivityRollup.user_id == user_id,
+                DailyActivityRollup.day >= since,
+                DailyActivityRollup.reviews > 0,
             )
+            .order_by(DailyActivityRollup.day)
         )
-    ).scalar_one()
+    ).all()
+    return [
+        DailyReviewStat(date=day.isoformat(), count=count, accuracy=round(good / count, 3))
+        for day, count, good in rows
+    ]
+
 
-    reviews_today = (
+@router.get("/reviews/stats", response_model=ReviewStatsResponse)
+async def review_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ReviewStatsResponse:
+    now = datetime.now(UTC)
+
+    total_cards, due_now = (
         await db.execute(
-            select(func.count(ReviewLog.id))
-            .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
-            .where(
-                Flashcard.user_id == current_user.id,
-                ReviewLog.reviewed_at >= today_start,
-            )
+            select(
+                func.count(Flashcard.id),
+                func.coalesce(func.sum(case((Flashcard.next_review <= now, 1), else_=0)), 0),
+            ).where(Flashcard.user_id == current_user.id)
         )
-    ).scalar_one()
+    ).one()
+
+    today = await db.get(DailyActivityRollup, (now.date(), current_user.id))
 
     return ReviewStatsResponse(
         total_cards=int(total_cards),
         due_now=int(due_now),
-        reviews_today=int(reviews_today),
+        reviews_today=today.reviews if today else 0,
     )
 
 
@@ -201,37 +267,7 @@ async def review_history(
     """Retorna estatísticas diárias de revisão dos últimos N dias."""
     now = datetime.now(UTC)
     cutoff = now - timedelta(days=min(days, 30))
-
-    rows = (
-        await db.execute(
-            select(ReviewLog.reviewed_at, ReviewLog.rating)
-            .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
-            .where(
-                Flashcard.user_id == current_user.id,
-                ReviewLog.reviewed_at >= cutoff,
-            )
-        )
-    ).all()
-
-    # Agrupa por data
-    daily: dict[str, dict] = {}
-    for reviewed_at, rating in rows:
-        date_key = reviewed_at.date().isoformat()
-        if date_key not in daily:
-            daily[date_key] = {"count": 0, "good": 0}
-        daily[date_key]["count"] += 1
-        if rating in ("good", "easy"):
-            daily[date_key]["good"] += 1
-
-    result: list[DailyReviewStat] = []
-    for date_key in sorted(daily.keys()):
-        d = daily[date_key]
-        result.append(DailyReviewStat(
-            date=date_key,
-            count=d["count"],
-            accuracy=round(d["good"] / d["count"], 3) if d["count"] else 0.0,
-        ))
-    return result
+    return await _daily_review_stats(db, current_user.id, cutoff.date())
 
 
 @router.get("/stats/overview", response_model=ProgressOverview)
@@ -241,24 +277,13 @@ async def progress_overview(
 ) -> ProgressOverview:
     """Dashboard pessoal: streak, palavras aprendidas e taxa de acerto."""
     now = datetime.now(UTC)
-    today_start = datetime.combine(now.date(), time.min, tzinfo=UTC)
-
-    # Total de revisões e taxa de acerto global
-    all_reviews = (
-        await db.execute(
-            select(ReviewLog.rating, ReviewLog.reviewed_at)
-            .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
-            .where(Flashcard.user_id == current_user.id)
-        )
-    ).all()
 
-    total_reviews = len(all_reviews)
-    good_reviews = sum(1 for r, _ in all_reviews if r in ("good", "easy"))
+    # Totais e streak mantidos a cada revisão (ver app.services.learning_stats)
+    stats = await db.get(UserLearningStats, current_user.id)
+    total_reviews = stats.total_reviews if stats else 0
+    good_reviews = stats.good_reviews if stats else 0
     accuracy_rate = round(good_reviews / total_reviews, 3) if total_reviews else 0.0
 
-    # Revisões hoje
-    reviews_today = sum(1 for _, reviewed_at in all_reviews if reviewed_at >= today_start)
-
     # Palavras "aprendidas" (repetitions >= 2)
     total_learned = (
         await db.execute(
@@ -269,47 +294,13 @@ async def progress_overview(
         )
     ).scalar_one()
 
-    # Streak: dias consecutivos com pelo menos 1 revisão
-    dates_with_reviews = sorted(
-        {r.date() for _, r in all_reviews},
-        reverse=True,
-    )
-    streak = 0
-    if dates_with_reviews:
-        expected = now.date()
-        for d in dates_with_reviews:
-            if d == expected:
-                streak += 1
-                expected = d - timedelta(days=1)
-            elif d == now.date() - timedelta(days=streak):
-                streak += 1
-                expected = d - timedelta(days=1)
-            else:
-                break
-
     # Histórico dos últimos 14 dias
-    cutoff_14 = now - timedelta(days=14)
-    recent_reviews = [(r, dt) for r, dt in all_reviews if dt >= cutoff_14]
-    daily: dict[str, dict] = {}
-    for rating, reviewed_at in recent_reviews:
-        date_key = reviewed_at.date().isoformat()
-        if date_key not in daily:
-            daily[date_key] = {"count": 0, "good": 0}
-        daily[date_key]["count"] += 1
-        if rating in ("good", "easy"):
-            daily[date_key]["good"] += 1
-
-    daily_history = [
-        DailyReviewStat(
-            date=k,
-            count=v["count"],
-            accuracy=round(v["good"] / v["count"], 3) if v["count"] else 0.0,
-        )
-        for k, v in sorted(daily.items())
-    ]
+    daily_history = await _daily_review_stats(db, current_user.id, (now - timedelta(days=14)).date())
+    today_key = now.date().isoformat()
+    reviews_today = next((item.count for item in daily_history if item.date == today_key), 0)
 
     return ProgressOverview(
-        streak_days=streak,
+        streak_days=current_streak(stats, now.date()),
         total_learned=int(total_learned),
         accuracy_rate=accuracy_rate,
         reviews_today=reviews_today,
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password_async, verify_password_async
 from app.db.models import User
 from app.db.session import get_db
 from app.schemas.admin import ProfileUpdate
@@ -46,11 +46,11 @@ async def update_profile(
     if payload.new_password is not None:
         if not payload.current_password:
             raise HTTPException(status_code=400, detail="current_password is required to change password")
-        if not verify_password(payload.current_password, current_user.password_hash):
+        if not await verify_password_async(payload.current_password, current_user.password_hash):
             raise HTTPException(status_code=400, detail="current_password is incorrect")
         if len(payload.new_password) < 8:
             raise HTTPException(status_code=400, detail="new_password must have at least 8 characters")
-        current_user.password_hash = hash_password(payload.new_password)
+        current_user.password_hash = await hash_password_async(payload.new_password)
 
     if payload.edge_tts_voice is not None:
         voice = payload.edge_tts_voice.strip() or DEFAULT_EDGE_TTS_VOICE
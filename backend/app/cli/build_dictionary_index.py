@@ -0,0 +1,158 @@
+"""Gera o índice offline de dicionário consultado pelo DictionaryLookupService.
+
+Uso:
+    python -m app.cli.build_dictionary_index SOURCE [SOURCE ...] --output data/dictionary.sqlite
+
+Cada SOURCE é um arquivo ``.jsonl`` (um objeto por linha) ou ``.tsv`` com as colunas
+``word``, ``pos``, ``definition``, ``translation`` e, opcionalmente, ``forms`` (flexões
+separadas por vírgula na TSV, lista no JSONL) e ``rank`` (frequência; menor = mais comum).
+Sem ``rank``, vale a ordem do arquivo. Só os ``--limit`` lemas mais frequentes entram.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.services.dictionary_index import INDEX_SCHEMA_VERSION
+from app.services.dictionary_lookup import _normalize_word
+
+DEFAULT_LIMIT = 50_000
+
+
+@dataclass(slots=True)
+class SourceEntry:
+    word: str
+    pos: str | None
+    definition: str | None
+    translation: str | None
+    forms: list[str] = field(default_factory=list)
+    rank: float = float("inf")
+
+
+def _clean(value: object) -> str | None:
+    text = str(value).strip() if value is not None else ""
+    return text or None
+
+
+def _parse_forms(value: object) -> list[str]:
+    if isinstance(value, list):
+        raw = value
+    elif isinstance(value, str):
+        raw = value.split(",")
+    else:
+        raw = []
+    return [form for form in (_normalize_word(str(item)) for item in raw) if form]
+
+
+def _to_entry(record: dict, position: int) -> SourceEntry | None:
+    word = _normalize_word(str(record.get("word") or ""))
+    if not word:
+        return None
+    rank = record.get("rank")
+    try:
+        rank_value = float(rank) if rank not in (None, "") else float(position)
+    except (TypeError, ValueError):
+        rank_value = float(position)
+    return SourceEntry(
+        word=word,
+        pos=_clean(record.get("pos")),
+        definition=_clean(record.get("definition")),
+        translation=_clean(record.get("translation")),
+        forms=_parse_forms(record.get("forms")),
+        rank=rank_value,
+    )
+
+
+def read_source(path: Path) -> Iterator[SourceEntry]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        if path.suffix.lower() == ".tsv":
+            records: Iterable[dict] = csv.DictReader(handle, delimiter="\t")
+        else:
+            records = (json.loads(line) for line in handle if line.strip())
+        for position, record in enumerate(records):
+            entry = _to_entry(record, position)
+            if entry is not None:
+                yield entry
+
+
+def select_entries(entries: Iterable[SourceEntry], limit: int) -> list[SourceEntry]:
+    """Mantém uma entrada por lema (a de menor rank, completando campos vazios) e corta em ``limit``."""
+    by_word: dict[str, SourceEntry] = {}
+    for entry in entries:
+        current = by_word.get(entry.word)
+        if current is None:
+            by_word[entry.word] = entry
+            continue
+        primary, other = (entry, current) if entry.rank < current.rank else (current, entry)
+        primary.pos = primary.pos or other.pos
+        primary.definition = primary.definition or other.definition
+        primary.translation = primary.translation or other.translation
+        primary.forms = list(dict.fromkeys(primary.forms + other.forms))
+        by_word[entry.word] = primary
+    ranked = sorted(by_word.values(), key=lambda item: item.rank)
+    return ranked[:limit]
+
+
+def write_index(entries: list[SourceEntry], output: Path) -> int:
+    """Grava o índice num arquivo temporário e troca de forma atômica. Retorna o total de chaves."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(output.suffix + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE entries ("
+            " word TEXT PRIMARY KEY,"
+            " lemma TEXT NOT NULL,"
+            " pos TEXT,"
+            " translation TEXT,"
+            " definition TEXT"
+            ") WITHOUT ROWID"
+        )
+        conn.executemany(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+            ((e.word, e.word, e.pos, e.translation, e.definition) for e in entries),
+        )
+        # Flexões apontam para o lema, mas nunca sobrescrevem um lema próprio ("left" ≠ "leave").
+        conn.executemany(
+            "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?)",
+            ((form, e.word, e.pos, e.translation, e.definition) for e in entries for form in e.forms),
+        )
+        conn.execute(f"PRAGMA user_version={INDEX_SCHEMA_VERSION}")
+        conn.commit()
+        total = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, output)
+    return total
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the offline dictionary index.")
+    parser.add_argument("sources", nargs="+", type=Path, help="JSONL or TSV source files")
+    parser.add_argument("--output", "-o", type=Path, required=True, help="Destination SQLite file")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Max lemmas to keep")
+    args = parser.parse_args(argv)
+
+    entries = select_entries((entry for source in args.sources for entry in read_source(source)), args.limit)
+    total = write_index(entries, args.output)
+    print(f"Wrote {len(entries)} lemmas ({total} keys) to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,227 @@
+"""Ajusta pesos FSRS por usuário a partir do ReviewLog e grava em ``user_fsrs_params``.
+
+Uso:
+    python -m app.cli.optimize_fsrs_weights [--workers 4] [--min-reviews 200] [--holdout 0.2]
+        [--user-id ID] [--reschedule]
+
+Os logs são lidos em streaming (ordenados por usuário, card e data, ``--chunk-size`` linhas
+por vez); cada usuário completo vai para um pool de processos, com no máximo
+``2 × --workers`` usuários em memória. As revisões mais recentes de cada usuário
+(``--holdout``) ficam fora do ajuste e decidem o resultado:
+
+- pesos com log-loss abaixo do ``W`` padrão nelas: gravados (substituem os anteriores);
+- pesos que não batem o ``W``: a linha anterior do usuário, se houver, é apagada, porque
+  pesos antigos que o ajuste atual não consegue justificar não devem continuar valendo;
+- histórico abaixo de ``--min-reviews``: nada muda (sem evidência nova).
+
+``--reschedule`` reagenda os cards dos usuários cujos pesos foram gravados ou apagados.
+Requer ``pip install .[fsrs]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cli.reschedule_flashcards import reschedule_flashcards
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.models import Flashcard, ReviewLog, UserFSRSParams
+from app.db.session import AsyncSessionLocal, engine
+from app.services.fsrs import RATING_MAP
+from app.services.fsrs_optimizer import DEFAULT_HOLDOUT_FRACTION, FitResult, fit_user
+from app.services.fsrs_params import invalidate_user_weights
+
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_MIN_REVIEWS = 200
+DEFAULT_ITERATIONS = 150
+_SECONDS_PER_DAY = 86_400.0
+
+logger = get_logger(__name__)
+
+
+def _days(value: datetime) -> float:
+    value = value if value.tzinfo else value.replace(tzinfo=UTC)
+    return value.timestamp() / _SECONDS_PER_DAY
+
+
+async def stream_user_histories(
+    db: AsyncSession, *, user_id: str | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[tuple[str, list[tuple[str, int, float]]]]:
+    """Emite (user_id, [(flashcard_id, rating, momento em dias), ...]) um usuário por vez."""
+    stmt = (
+        select(Flashcard.user_id, ReviewLog.flashcard_id, ReviewLog.rating, ReviewLog.reviewed_at)
+        .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
+        .order_by(Flashcard.user_id, ReviewLog.flashcard_id, ReviewLog.reviewed_at)
+        .execution_options(yield_per=chunk_size)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Flashcard.user_id == user_id)
+
+    current_user: str | None = None
+    rows: list[tuple[str, int, float]] = []
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        for owner, flashcard_id, rating, reviewed_at in partition:
+            if owner != current_user:
+                if rows:
+                    yield current_user, rows
+                current_user, rows = owner, []
+            if rating in RATING_MAP:
+                rows.append((flashcard_id, RATING_MAP[rating], _days(reviewed_at)))
+    if rows:
+        yield current_user, rows
+
+
+async def optimize_users(
+    db: AsyncSession,
+    executor: Executor,
+    *,
+    workers: int,
+    user_id: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    min_reviews: int = DEFAULT_MIN_REVIEWS,
+    iterations: int = DEFAULT_ITERATIONS,
+    holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+) -> dict[str, FitResult]:
+    """Ajusta todos os usuários com histórico suficiente e retorna o resultado de cada um
+    (``result.improved`` diz se os pesos bateram o ``W`` nas revisões reservadas).
+
+    Um usuário cujo ajuste falha é registrado no log e fica de fora (a linha dele não muda);
+    os demais seguem.
+    """
+    loop = asyncio.get_running_loop()
+    pending: dict[asyncio.Future, str] = {}
+    fitted: dict[str, FitResult] = {}
+
+    def collect(done: set[asyncio.Future]) -> None:
+        for future in done:
+            owner = pending.pop(future)
+            try:
+                _, result = future.result()
+            except Exception:
+                logger.exception("FSRS fit failed for user %s; keeping their stored weights", owner)
+                continue
+            if result is not None:
+                fitted[owner] = result
+
+    async for owner, rows in stream_user_histories(db, user_id=user_id, chunk_size=chunk_size):
+        future = loop.run_in_executor(
+            executor,
+            fit_user,
+            owner,
+            rows,
+            iterations,
+            min_reviews,
+            holdout_fraction,
+            settings.fsrs_desired_retention,
+        )
+        pending[future] = owner
+        if len(pending) >= 2 * workers:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            collect(done)
+    if pending:
+        done, _ = await asyncio.wait(pending)
+        collect(done)
+    return fitted
+
+
+async def store_weights(db: AsyncSession, fitted: dict[str, FitResult]) -> tuple[list[str], list[str]]:
+    """Grava os pesos que melhoraram e apaga a linha de quem não melhorou. Faz commit.
+
+    Retorna (usuários gravados, usuários cuja linha foi apagada).
+    """
+    stored = [fitted_user for fitted_user, result in fitted.items() if result.improved]
+    for fitted_user in stored:
+        result = fitted[fitted_user]
+        await db.merge(
+            UserFSRSParams(
+                user_id=fitted_user,
+                weights=result.weights,
+                review_count=result.review_count,
+                log_loss=result.log_loss,
+                default_log_loss=result.default_log_loss,
+            )
+        )
+    rejected = [fitted_user for fitted_user, result in fitted.items() if not result.improved]
+    removed: list[str] = []
+    if rejected:
+        removed = list(
+            (
+                await db.execute(
+                    delete(UserFSRSParams)
+                    .where(UserFSRSParams.user_id.in_(rejected))
+                    .returning(UserFSRSParams.user_id)
+                )
+            ).scalars()
+        )
+    await db.commit()
+    for fitted_user in (*stored, *removed):
+        invalidate_user_weights(fitted_user)
+    return stored, removed
+
+
+async def _run(args: argparse.Namespace) -> tuple[int, int, int]:
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # Leitura em streaming numa sessão, escrita noutra depois que o cursor fecha.
+            async with AsyncSessionLocal() as db:
+                fitted = await optimize_users(
+                    db,
+                    executor,
+                    workers=args.workers,
+                    user_id=args.user_id,
+                    chunk_size=args.chunk_size,
+                    min_reviews=args.min_reviews,
+                    iterations=args.iterations,
+                    holdout_fraction=args.holdout,
+                )
+        async with AsyncSessionLocal() as db:
+            stored, removed = await store_weights(db, fitted)
+            rescheduled = 0
+            if args.reschedule:
+                for changed_user in (*stored, *removed):
+                    rescheduled += await reschedule_flashcards(db, user_id=changed_user)
+        return len(stored), len(removed), rescheduled
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Fit per-user FSRS weights from review history.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--user-id", default=None, help="Only this user (default: everyone)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Review logs fetched per round trip")
+    parser.add_argument("--min-reviews", type=int, default=DEFAULT_MIN_REVIEWS, help="Skip users with fewer repeat reviews")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument(
+        "--holdout",
+        type=float,
+        default=DEFAULT_HOLDOUT_FRACTION,
+        help="Fraction of each user's latest reviews held out to compare the fit against W",
+    )
+    parser.add_argument("--reschedule", action="store_true", help="Reschedule the decks of users whose weights changed")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if not 0 < args.holdout < 1:
+        parser.error("--holdout must be between 0 and 1")
+
+    stored, removed, rescheduled = asyncio.run(_run(args))
+    print(
+        f"Stored weights for {stored} users; removed {removed} stale rows; rescheduled {rescheduled} flashcards",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
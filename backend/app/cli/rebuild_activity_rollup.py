@@ -0,0 +1,51 @@
+"""Recalcula ``daily_activity_rollup`` a partir dos eventos brutos e, em seguida,
+``user_learning_stats`` a partir do rollup. Sem ``--days``, também recalcula
+``user_activity_summary`` (totais de todo o histórico).
+
+Uso:
+    python -m app.cli.rebuild_activity_rollup            # histórico completo (backfill)
+    python -m app.cli.rebuild_activity_rollup --days 2   # compactação periódica (cron)
+
+A aplicação já mantém o rollup a cada evento; este comando serve para preencher o histórico
+após a migration e para corrigir eventuais divergências nos dias recentes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import UTC, datetime, timedelta
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.activity_rollup import rebuild_activity_summary, rebuild_daily_activity
+from app.services.learning_stats import rebuild_learning_stats
+
+
+async def _run(days: int | None) -> tuple[int, int]:
+    since = (datetime.now(UTC) - timedelta(days=days - 1)).date() if days else None
+    try:
+        async with AsyncSessionLocal() as db:
+            rollup_rows = await rebuild_daily_activity(db, since=since)
+            stats_rows = await rebuild_learning_stats(db)
+            if since is None:
+                await rebuild_activity_summary(db)
+        return rollup_rows, stats_rows
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the daily activity rollup.")
+    parser.add_argument("--days", type=int, default=None, help="Only rebuild the last N days (default: everything)")
+    args = parser.parse_args(argv)
+    if args.days is not None and args.days < 1:
+        parser.error("--days must be >= 1")
+
+    rollup_rows, stats_rows = asyncio.run(_run(args.days))
+    print(f"Rebuilt {rollup_rows} (day, user) rollup rows and {stats_rows} learner stats rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+"""Reagenda flashcards em massa reproduzindo o histórico com o FSRS vetorizado.
+
+Uso:
+    python -m app.cli.reschedule_flashcards [--user-id ID] [--weights w0,w1,...,w17]
+
+Para cada card com revisões, reaplica todos os ratings do ReviewLog (em ordem) a partir do
+estado inicial com os pesos informados (sem ``--weights``, os pesos ajustados de cada
+usuário, ou ``W``) e a retenção de ``FSRS_DESIRED_RETENTION`` (a mesma das revisões ao vivo),
+e agenda a próxima revisão a partir da última. Processa os cards em blocos (um commit por
+bloco); os cards do bloco ficam travados (``FOR UPDATE``) da leitura dos logs até o commit,
+então uma revisão ao vivo espera o bloco em vez de ser sobrescrita por um replay que não a
+viu. Requer ``pip install .[fsrs]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Flashcard, ReviewLog, UserFSRSParams
+from app.db.session import AsyncSessionLocal, engine
+from app.services.fsrs import RATING_MAP, W
+from app.services.fsrs_batch import replay_fsrs_batch
+
+DEFAULT_CHUNK_SIZE = 5_000
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+async def _stored_weights(db: AsyncSession, user_ids: set[str]) -> dict[str, tuple[float, ...]]:
+    rows = await db.execute(
+        select(UserFSRSParams.user_id, UserFSRSParams.weights).where(UserFSRSParams.user_id.in_(user_ids))
+    )
+    return {user_id: tuple(weights) for user_id, weights in rows if weights and len(weights) == len(W)}
+
+
+async def _reschedule_chunk(
+    db: AsyncSession, card_ids: list[str], weights: Sequence[float] | None, desired_retention: float
+) -> int:
+    rows = (
+        await db.execute(
+            select(Flashcard.user_id, ReviewLog.flashcard_id, ReviewLog.rating, ReviewLog.reviewed_at)
+            .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
+            .where(ReviewLog.flashcard_id.in_(card_ids))
+            .order_by(ReviewLog.flashcard_id, ReviewLog.reviewed_at)
+            # Só as linhas dos cards; as revisões ao vivo também as atualizam.
+            .with_for_update(of=Flashcard)
+        )
+    ).all()
+    histories = [(card_id, list(logs)) for card_id, logs in groupby(rows, key=lambda row: row.flashcard_id)]
+    if not histories:
+        return 0
+
+    # Sem --weights, cada usuário usa os pesos ajustados (user_fsrs_params) ou o W padrão.
+    if weights is None:
+        stored = await _stored_weights(db, {logs[0].user_id for _, logs in histories})
+        groups: dict[tuple[float, ...], list] = defaultdict(list)
+        for card_id, logs in histories:
+            groups[stored.get(logs[0].user_id, tuple(W))].append((card_id, logs))
+    else:
+        groups = {tuple(weights): histories}
+
+    updates = []
+    for group_weights, group in groups.items():
+        width = max(len(logs) for _, logs in group)
+        ratings = [[RATING_MAP[log.rating] for log in logs] + [0] * (width - len(logs)) for _, logs in group]
+        state, _ = replay_fsrs_batch(ratings, weights=group_weights, desired_retention=desired_retention)
+        updates.extend(
+            {
+                "id": card_id,
+                "interval_days": int(state.interval_days[index]),
+                "repetitions": int(state.repetitions[index]),
+                "ease_factor": float(state.ease_factor[index]),
+                "stability": float(state.stability[index]),
+                "difficulty": float(state.difficulty[index]),
+                "lapses": int(state.lapses_increment[index]),
+                "next_review": _as_utc(logs[-1].reviewed_at) + timedelta(days=int(state.interval_days[index])),
+            }
+            for index, (card_id, logs) in enumerate(group)
+        )
+    await db.execute(update(Flashcard), updates)
+    await db.commit()
+    return len(updates)
+
+
+async def reschedule_flashcards(
+    db: AsyncSession,
+    *,
+    user_id: str | None = None,
+    weights: Sequence[float] | None = None,
+    desired_retention: float | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Reagenda os cards (de um usuário ou de todos). Retorna quantos foram atualizados.
+
+    ``desired_retention`` padrão: ``settings.fsrs_desired_retention``.
+    """
+    if desired_retention is None:
+        desired_retention = settings.fsrs_desired_retention
+    updated = 0
+    last_id = ""
+    while True:
+        stmt = select(Flashcard.id).where(Flashcard.id > last_id).order_by(Flashcard.id).limit(chunk_size)
+        if user_id is not None:
+            stmt = stmt.where(Flashcard.user_id == user_id)
+        card_ids = list((await db.execute(stmt)).scalars())
+        if not card_ids:
+            return updated
+        updated += await _reschedule_chunk(db, card_ids, weights, desired_retention)
+        last_id = card_ids[-1]
+
+
+def _parse_weights(value: str) -> list[float]:
+    weights = [float(item) for item in value.split(",")]
+    if len(weights) != len(W):
+        raise argparse.ArgumentTypeError(f"expected {len(W)} comma-separated weights")
+    return weights
+
+
+async def _run(args: argparse.Namespace) -> int:
+    try:
+        async with AsyncSessionLocal() as db:
+            return await reschedule_flashcards(
+                db,
+                user_id=args.user_id,
+                weights=args.weights,
+                chunk_size=args.chunk_size,
+            )
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Reschedule flashcards by replaying their review history.")
+    parser.add_argument("--user-id", default=None, help="Only this user's deck (default: every deck)")
+    parser.add_argument(
+        "--weights", type=_parse_weights, default=None, help="FSRS weights (default: each user's fitted weights or W)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    updated = asyncio.run(_run(args))
+    print(f"Rescheduled {updated} flashcards", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
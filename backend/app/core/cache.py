@@ -0,0 +1,109 @@
+"""Cache LRU em memória com TTL e limite de tamanho (entradas e bytes aproximados)."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+from time import monotonic
+from typing import Generic, TypeVar
+
+from app.core.metrics import metrics
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """LRU limitado por número de entradas e, opcionalmente, por bytes estimados via ``sizeof``.
+
+    Contadores ``cache_hits_total``/``cache_misses_total``/``cache_evictions_total`` e gauges
+    ``cache_entries``/``cache_bytes`` são publicados com o label ``cache=<name>``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        *,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+        sizeof: Callable[[V], int] | None = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.name = name
+        self.max_entries = max(max_entries, 1)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof or (lambda _value: 0)
+        self._clock = clock
+        # chave -> (valor, expira_em, tamanho)
+        self._entries: OrderedDict[K, tuple[V, float | None, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def _publish(self) -> None:
+        metrics.set_gauge("cache_entries", len(self._entries), cache=self.name)
+        metrics.set_gauge("cache_bytes", self._bytes, cache=self.name)
+
+    def _drop(self, key: K) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                metrics.incr("cache_misses_total", cache=self.name)
+                return None
+            value, expires_at, _ = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                self._drop(key)
+                self._publish()
+                metrics.incr("cache_misses_total", cache=self.name)
+                metrics.incr("cache_expired_total", cache=self.name)
+                return None
+            self._entries.move_to_end(key)
+            metrics.incr("cache_hits_total", cache=self.name)
+            return value
+
+    def set(self, key: K, value: V, *, ttl_seconds: float | None = None) -> None:
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # maior que o cache inteiro: não vale a pena guardar
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            evicted = 0
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                evicted += 1
+            if evicted:
+                metrics.incr("cache_evictions_total", evicted, cache=self.name)
+            self._publish()
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+                self._publish()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._publish()
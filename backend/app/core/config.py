@@ -1,7 +1,8 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
-from pydantic import field_validator
+from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -44,18 +45,111 @@ class Settings(BaseSettings):
     chat_timeout_seconds: int = 12
     analysis_timeout_seconds: int = 8
 
+    # Pool HTTP compartilhado pelos providers (um AsyncClient de vida longa por provider)
+    http2_enabled: bool = True
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 60.0
+    http_default_timeout_seconds: float = 30.0
+
+    # Limite de concorrência e fila de admissão por provider
+    gemini_max_concurrency: int = 16
+    gemini_max_queue: int = 64
+    ollama_max_concurrency: int = 2
+    ollama_max_queue: int = 8
+    llm_default_max_concurrency: int = 8
+    llm_default_max_queue: int = 32
+    llm_queue_timeout_seconds: float = 5.0
+
+    # Circuit breaker por provider/método
+    circuit_breaker_window_seconds: float = 120.0
+    circuit_breaker_window_size: int = 50
+    circuit_breaker_min_samples: int = 5
+    circuit_breaker_error_rate_threshold: float = 0.5
+    circuit_breaker_slow_call_seconds: float = 0.0  # 0 desativa o critério de latência (p90)
+    circuit_breaker_open_seconds: float = 30.0
+
+    # Hedging: duplica correct_input/analyze_sentence no próximo provider se o primário demorar
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 90.0
+    llm_hedge_default_delay_seconds: float = 2.0
+    llm_hedge_min_delay_seconds: float = 0.3
+    llm_hedge_max_ratio: float = 0.1
+    llm_hedge_burst: float = 5.0
+
+    # Pipeline especulativo: gera a resposta sobre o texto cru enquanto a correção roda
+    chat_speculative_reply: bool = False
+    chat_speculation_similarity_threshold: float = 0.9
+
+    # Camada LRU em memória na frente da tabela analysis_cache
+    analysis_memory_cache_max_entries: int = 2048
+    analysis_memory_cache_max_bytes: int = 32 * 1024 * 1024
+    analysis_memory_cache_ttl_seconds: float = 3600.0
+    # /analysis/text: passagens são analisadas e cacheadas por sentença
+    analysis_max_sentences: int = 80
+    analysis_sentence_concurrency: int = 4
+
+    # Threads dedicadas ao hash/verificação argon2
+    password_hash_workers: int = 4
+
+    # Cache do usuário autenticado em get_current_user (0 desativa)
+    user_cache_ttl_seconds: float = 30.0
+    user_cache_max_entries: int = 10000
+
+    # Retenção alvo do FSRS (0-1) para /reviews, /reviews/batch e app.cli.reschedule_flashcards
+    fsrs_desired_retention: float = 0.90
+    # Pesos FSRS por usuário (tabela user_fsrs_params), cacheados por processo
+    fsrs_weights_cache_ttl_seconds: float = 300.0
+    fsrs_weights_cache_max_entries: int = 10000
+
+    # Dicionário: LRU em memória + tabela dictionary_entries
+    dictionary_cache_max_entries: int = 20000
+    dictionary_cache_ttl_seconds: float = 24 * 3600.0
+    dictionary_persist_ttl_days: int = 30
+    dictionary_negative_ttl_seconds: float = 300.0
+    dictionary_http_timeout_seconds: float = 6.0
+    dictionary_batch_concurrency: int = 8
+    # Máximo de palavras buscadas nas APIs remotas por requisição em lote (o resto fica de fora)
+    dictionary_batch_max_remote_lookups: int = 40
+    # Índice offline gerado por app.cli.build_dictionary_index (vazio = desativado)
+    dictionary_index_path: str = "data/dictionary.sqlite"
+
     admin_email: str = "admin@aienglishmentor.com"
     admin_password: str = "ChangeMe123!"
 
     rate_limit_auth: int = 12
     rate_limit_chat: int = 30
     rate_limit_window_seconds: int = 60
+    # "sliding_window" (contador de janela deslizante) ou "token_bucket"; memória O(1) por chave
+    rate_limit_algorithm: Literal["sliding_window", "token_bucket"] = "sliding_window"
+    rate_limit_sweep_interval_seconds: float = 60.0
+    # Onde ficam os contadores: "memory" (por processo), "database" (tabela rate_limit_counters) ou "redis"
+    rate_limit_backend: Literal["memory", "database", "redis"] = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
 
     daily_message_limit: int = 50
     daily_analysis_limit: int = 30
 
     edge_tts_default_voice: str = "en-US-JennyNeural"
 
+    # Cache de áudio TTS (memória + disco; TTS_CACHE_DIR vazio desativa o disco)
+    tts_cache_memory_max_entries: int = 512
+    tts_cache_memory_max_bytes: int = 32 * 1024 * 1024
+    tts_cache_dir: str = "data/tts_cache"
+    tts_cache_disk_max_bytes: int = 512 * 1024 * 1024
+    tts_cache_max_age_seconds: int = 30 * 24 * 3600
+    # Textos com mais de tts_chunk_threshold_chars são divididos em blocos de sentenças de até
+    # ~tts_chunk_target_chars, sintetizados em paralelo (threshold >= target)
+    tts_chunk_threshold_chars: int = 400
+    tts_chunk_target_chars: int = 300
+    tts_chunk_concurrency: int = 4
+    # Pré-síntese em segundo plano das respostas do assistente (opt-in). A taxa padrão é a
+    # do slider do chat (0.8x), usada quando o cliente não envia speech_rate
+    tts_prefetch_enabled: bool = False
+    tts_prefetch_rate: float = 0.8
+    tts_prefetch_workers: int = 2
+    tts_prefetch_max_queue: int = 100
+
     @field_validator("allowed_origins", mode="before")
     @classmethod
     def parse_origins(cls, value: str | list[str]) -> list[str]:
@@ -65,6 +159,21 @@ class Settings(BaseSettings):
             return []
         return [origin.strip() for origin in value.split(",") if origin.strip()]
 
+    @field_validator("fsrs_desired_retention")
+    @classmethod
+    def check_retention(cls, value: float) -> float:
+        if not 0 < value < 1:
+            raise ValueError("FSRS_DESIRED_RETENTION must be between 0 and 1")
+        return value
+
+    @model_validator(mode="after")
+    def check_tts_chunking(self) -> "Settings":
+        if self.tts_chunk_target_chars <= 0:
+            raise ValueError("TTS_CHUNK_TARGET_CHARS must be positive")
+        if self.tts_chunk_threshold_chars < self.tts_chunk_target_chars:
+            raise ValueError("TTS_CHUNK_THRESHOLD_CHARS must be >= TTS_CHUNK_TARGET_CHARS")
+        return self
+
 
 @lru_cache
 def get_settings() -> Settings:
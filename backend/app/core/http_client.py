@@ -0,0 +1,22 @@
+"""Fábrica de clientes httpx reutilizáveis (pool de conexões com keep-alive)."""
+
+import httpx
+
+from app.core.config import settings
+
+
+def build_async_client(*, timeout: float | None = None, http2: bool | None = None) -> httpx.AsyncClient:
+    """Cria um AsyncClient de vida longa com os limites de pool definidos em Settings.
+
+    O timeout padrão pode ser sobrescrito por requisição (``client.post(..., timeout=...)``).
+    """
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    return httpx.AsyncClient(
+        http2=settings.http2_enabled if http2 is None else http2,
+        limits=limits,
+        timeout=timeout if timeout is not None else settings.http_default_timeout_seconds,
+    )
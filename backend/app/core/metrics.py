@@ -0,0 +1,57 @@
+"""Métricas de runtime em memória (contadores e gauges por processo).
+
+Leve de propósito: nada de dependência externa. Cada worker mantém seus próprios
+valores, expostos em ``GET /admin/runtime-metrics``.
+"""
+
+from threading import Lock
+
+
+def _metric_key(name: str, labels: dict[str, object]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f"{key}={labels[key]}" for key in sorted(labels))
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._lock = Lock()
+
+    def incr(self, name: str, value: float = 1, **labels: object) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: object) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        """Registra uma amostra como par de contadores ``_count``/``_sum`` e gauge ``_max``."""
+        count_key = _metric_key(f"{name}_count", labels)
+        sum_key = _metric_key(f"{name}_sum", labels)
+        max_key = _metric_key(f"{name}_max", labels)
+        with self._lock:
+            self._counters[count_key] = self._counters.get(count_key, 0) + 1
+            self._counters[sum_key] = self._counters.get(sum_key, 0) + value
+            self._gauges[max_key] = max(self._gauges.get(max_key, value), value)
+
+    def counter(self, name: str, **labels: object) -> float:
+        with self._lock:
+            return self._counters.get(_metric_key(name, labels), 0)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = MetricsRegistry()
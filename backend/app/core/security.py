@@ -1,12 +1,27 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
+from time import perf_counter
+from typing import TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import metrics
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# Pool dedicado ao argon2: rajadas de login disputam só estas threads, sem travar o event loop
+# nem o executor padrão usado pelo resto da aplicação.
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(settings.password_hash_workers, 1),
+    thread_name_prefix="argon2",
+)
+_password_queue_depth = 0
+T = TypeVar("T")
+
 ALGORITHM = "HS256"
 
 
@@ -22,6 +37,31 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
     return pwd_context.verify(plain_password, password_hash)
 
 
+async def _run_in_password_pool(operation: str, fn: Callable[..., T], *args) -> T:
+    global _password_queue_depth
+    enqueued_at = perf_counter()
+    _password_queue_depth += 1
+    metrics.set_gauge("password_hash_queue_depth", _password_queue_depth)
+
+    def run() -> T:
+        metrics.observe("password_hash_wait_ms", (perf_counter() - enqueued_at) * 1000, operation=operation)
+        return fn(*args)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, run)
+    finally:
+        _password_queue_depth -= 1
+        metrics.set_gauge("password_hash_queue_depth", _password_queue_depth)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_password_pool("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, password_hash: str) -> bool:
+    return await _run_in_password_pool("verify", verify_password, plain_password, password_hash)
+
+
 def _build_token(subject: str, token_type: str, expires_delta: timedelta, secret: str) -> str:
     now = datetime.now(UTC)
     payload = {
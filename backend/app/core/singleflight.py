@@ -0,0 +1,44 @@
+"""Single-flight: chamadas concorrentes com a mesma chave compartilham uma única execução."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from app.core.metrics import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesce chamadas idênticas em andamento.
+
+    A execução roda numa task própria: se quem a iniciou for cancelado (cliente
+    desconectou), os demais continuam aguardando e o resultado ainda é produzido.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: dict[K, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            metrics.incr("singleflight_leader_total", group=self.name)
+        else:
+            metrics.incr("singleflight_shared_total", group=self.name)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: K, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # marca a exceção como consumida (evita warning se ninguém mais aguardar)
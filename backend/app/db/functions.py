@@ -0,0 +1,64 @@
+"""Funções SQL portáveis entre Postgres (produção) e SQLite (testes/desenvolvimento)."""
+
+from sqlalchemy import Date, Integer, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+
+class greatest(GenericFunction):  # noqa: N801 - nome segue a função SQL
+    """Maior valor não nulo entre os argumentos (NULL só se todos forem NULL)."""
+
+    name = "greatest"
+    inherit_cache = True
+
+
+@compiles(greatest)
+def _compile_greatest(element, compiler, **kw):
+    return "greatest(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(greatest, "sqlite")
+def _compile_greatest_sqlite(element, compiler, **kw):
+    # max(a, b, ...) do SQLite devolve NULL se qualquer argumento for NULL; coalesce(x_i, outros)
+    # troca cada NULL por algum valor presente, sem alterar o máximo.
+    args = list(element.clauses)
+    if len(args) == 1:
+        return compiler.process(args[0], **kw)
+    fallbacks = [func.coalesce(arg, *(other for other in args if other is not arg)) for arg in args]
+    return "max(%s)" % ", ".join(compiler.process(expr, **kw) for expr in fallbacks)
+
+
+class utc_date(GenericFunction):  # noqa: N801
+    """Dia (UTC) de um timestamp, independente do fuso da sessão."""
+
+    name = "utc_date"
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(utc_date)
+def _compile_utc_date(element, compiler, **kw):
+    return "CAST(timezone('UTC', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(utc_date, "sqlite")
+def _compile_utc_date_sqlite(element, compiler, **kw):
+    return "date(%s)" % compiler.process(element.clauses, **kw)
+
+
+class day_number(GenericFunction):  # noqa: N801
+    """Dias desde 1970-01-01 de uma data (inteiro), para aritmética de dias consecutivos."""
+
+    name = "day_number"
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(day_number)
+def _compile_day_number(element, compiler, **kw):
+    return "(%s - DATE '1970-01-01')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(day_number, "sqlite")
+def _compile_day_number_sqlite(element, compiler, **kw):
+    return "CAST(julianday(%s) - 2440587.5 AS INTEGER)" % compiler.process(element.clauses, **kw)
@@ -5,7 +5,7 @@ from sqlalchemy.exc import DBAPIError, OperationalError
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.core.security import hash_password
+from app.core.security import hash_password_async
 from app.db.models import TierLimits, User
 
 logger = get_logger(__name__)
@@ -31,7 +31,7 @@ async def _ensure_admin_user() -> None:
         admin = User(
             full_name="Admin",
             email=settings.admin_email,
-            password_hash=hash_password(settings.admin_password),
+            password_hash=await hash_password_async(settings.admin_password),
             edge_tts_voice=settings.edge_tts_default_voice,
             tier="pro",
             is_admin=True,
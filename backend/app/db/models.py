@@ -1,8 +1,8 @@
 import hashlib
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from uuid import uuid4
 
-from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import JSON, BigInteger, Boolean, Date, DateTime, Float, ForeignKey, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -146,4 +146,83 @@ class TierLimits(Base):
     tier: Mapped[str] = mapped_column(String(16), primary_key=True)
     daily_chat_limit: Mapped[int] = mapped_column(Integer, default=20)
     daily_analysis_limit: Mapped[int] = mapped_column(Integer, default=10)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utc_now, onupdate=_utc_now)
\ No newline at end of file
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utc_now, onupdate=_utc_now)
+
+
+class DictionaryEntry(Base):
+    __tablename__ = "dictionary_entries"
+
+    word: Mapped[str] = mapped_column(String(80), primary_key=True)
+    lemma: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    pos: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    translation: Mapped[str | None] = mapped_column(Text, nullable=True)
+    definition: Mapped[str | None] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utc_now, onupdate=_utc_now, index=True)
+
+
+class RateLimitCounter(Base):
+    """Contador por chave e janela, compartilhado entre workers (ver app.middleware.rate_limit)."""
+
+    __tablename__ = "rate_limit_counters"
+
+    key: Mapped[str] = mapped_column(String(200), primary_key=True)
+    window_start: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+    expires_at: Mapped[int] = mapped_column(BigInteger, index=True)
+
+
+class DailyActivityRollup(Base):
+    """Contadores diários (UTC) por usuário, mantidos na mesma transação dos eventos
+    (ver app.services.activity_rollup). ``messages`` conta só mensagens do aluno."""
+
+    __tablename__ = "daily_activity_rollup"
+
+    day: Mapped[date] = mapped_column("date", Date, primary_key=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
+    messages: Mapped[int] = mapped_column(Integer, default=0)
+    sessions: Mapped[int] = mapped_column(Integer, default=0)
+    reviews: Mapped[int] = mapped_column(Integer, default=0)
+    good_reviews: Mapped[int] = mapped_column(Integer, default=0)
+    reading_activities: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class UserLearningStats(Base):
+    """Agregados de revisão por usuário, atualizados junto com cada ReviewLog
+    (ver app.services.learning_stats). ``current_streak`` termina em ``last_review_date``."""
+
+    __tablename__ = "user_learning_stats"
+
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_reviews: Mapped[int] = mapped_column(Integer, default=0)
+    good_reviews: Mapped[int] = mapped_column(Integer, default=0)
+    current_streak: Mapped[int] = mapped_column(Integer, default=0)
+    last_review_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utc_now, onupdate=_utc_now)
+
+
+class UserActivitySummary(Base):
+    """Totais e última atividade por usuário, mantidos junto com o rollup diário
+    (ver app.services.activity_rollup). ``last_active`` ignora a criação de sessões."""
+
+    __tablename__ = "user_activity_summary"
+
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    messages: Mapped[int] = mapped_column(Integer, default=0)
+    sessions: Mapped[int] = mapped_column(Integer, default=0)
+    reviews: Mapped[int] = mapped_column(Integer, default=0)
+    reading_activities: Mapped[int] = mapped_column(Integer, default=0)
+    reading_questions: Mapped[int] = mapped_column(Integer, default=0)
+    last_active: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+
+
+class UserFSRSParams(Base):
+    """Pesos FSRS ajustados ao histórico do usuário (ver app.cli.optimize_fsrs_weights)."""
+
+    __tablename__ = "user_fsrs_params"
+
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    weights: Mapped[list[float]] = mapped_column(JSON)
+    review_count: Mapped[int] = mapped_column(Integer, default=0)
+    log_loss: Mapped[float] = mapped_column(Float)
+    default_log_loss: Mapped[float] = mapped_column(Float)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utc_now, onupdate=_utc_now)
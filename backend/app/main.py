@@ -3,17 +3,27 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.deps import get_llm_router
+from app.api.v1.dictionary import dictionary_lookup_service
 from app.api.v1.router import api_router
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.db.init_db import init_db
 from app.middleware.request_context import RequestContextMiddleware
+from app.services.tts_prefetch import tts_prefetcher
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     await init_db()
-    yield
+    llm_router = get_llm_router()
+    await llm_router.startup()
+    try:
+        yield
+    finally:
+        await llm_router.aclose()
+        await dictionary_lookup_service.aclose()
+        await tts_prefetcher.aclose()
 
 
 setup_logging()
@@ -1,49 +1,430 @@
-from collections import defaultdict, deque
+import asyncio
+from abc import ABC, abstractmethod
 from collections.abc import Callable
 from threading import Lock
-from time import monotonic
+from time import monotonic, time
+from typing import Literal
 
 from fastapi import HTTPException, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
 
 _SECONDS_PER_DAY = 86_400
 
 SECONDS_PER_DAY = _SECONDS_PER_DAY  # alias exportável
 
+RateLimitAlgorithm = Literal["sliding_window", "token_bucket"]
+
+logger = get_logger(__name__)
+
+
+class _WindowState:
+    """Contador de janela deslizante: só a contagem da janela atual e da anterior."""
+
+    __slots__ = ("window_start", "current", "previous", "window_seconds")
+
+    def __init__(self, window_start: float, window_seconds: float) -> None:
+        self.window_start = window_start
+        self.current = 0
+        self.previous = 0
+        self.window_seconds = window_seconds
+
+
+class _BucketState:
+    __slots__ = ("tokens", "updated_at", "capacity", "window_seconds")
+
+    def __init__(self, capacity: int, now: float, window_seconds: float) -> None:
+        self.tokens = float(capacity)
+        self.updated_at = now
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+
+
+class SlidingWindowCounterEngine:
+    """Estimativa ``previous * (1 - fração decorrida) + current``: memória O(1) por chave,
+    erro pequeno em relação a guardar cada timestamp."""
 
-class InMemoryRateLimiter:
     def __init__(self) -> None:
-        self._buckets: dict[str, deque[float]] = defaultdict(deque)
+        self._states: dict[str, _WindowState] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _roll(self, key: str, window_seconds: float, now: float) -> _WindowState:
+        state = self._states.get(key)
+        if state is None or state.window_seconds != window_seconds:
+            state = _WindowState(now - now % window_seconds, window_seconds)
+            self._states[key] = state
+            return state
+        elapsed_windows = int((now - state.window_start) // window_seconds)
+        if elapsed_windows >= 1:
+            state.previous = state.current if elapsed_windows == 1 else 0
+            state.current = 0
+            state.window_start += elapsed_windows * window_seconds
+        return state
+
+    @staticmethod
+    def _estimate(state: _WindowState, now: float) -> float:
+        weight = 1 - (now - state.window_start) / state.window_seconds
+        return state.previous * weight + state.current
+
+    def check(self, key: str, limit: int, window_seconds: float, now: float) -> bool:
+        state = self._roll(key, window_seconds, now)
+        if self._estimate(state, now) >= limit:
+            return False
+        state.current += 1
+        return True
+
+    def count(self, key: str, window_seconds: float, now: float) -> int:
+        if key not in self._states:
+            return 0
+        return int(round(self._estimate(self._roll(key, window_seconds, now), now)))
+
+    def sweep(self, now: float) -> int:
+        # Sem requisições por duas janelas, a estimativa é zero: a chave pode sair.
+        idle = [
+            key
+            for key, state in self._states.items()
+            if now - state.window_start >= 2 * state.window_seconds
+        ]
+        for key in idle:
+            del self._states[key]
+        return len(idle)
+
+
+class TokenBucketEngine:
+    """Balde com capacidade ``limit`` reabastecido a ``limit / window`` fichas por segundo."""
+
+    def __init__(self) -> None:
+        self._states: dict[str, _BucketState] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _refill(self, key: str, limit: int | None, window_seconds: float, now: float) -> _BucketState | None:
+        state = self._states.get(key)
+        if state is None:
+            if limit is None:
+                return None
+            state = _BucketState(limit, now, window_seconds)
+            self._states[key] = state
+            return state
+        if limit is not None and limit != state.capacity:
+            state.tokens = min(state.tokens + (limit - state.capacity), float(limit))
+            state.capacity = limit
+        state.window_seconds = window_seconds
+        rate = state.capacity / window_seconds
+        state.tokens = min(float(state.capacity), state.tokens + (now - state.updated_at) * rate)
+        state.updated_at = now
+        return state
+
+    def check(self, key: str, limit: int, window_seconds: float, now: float) -> bool:
+        state = self._refill(key, limit, window_seconds, now)
+        if state.tokens < 1:
+            return False
+        state.tokens -= 1
+        return True
+
+    def count(self, key: str, window_seconds: float, now: float) -> int:
+        state = self._refill(key, None, window_seconds, now)
+        if state is None:
+            return 0
+        return int(round(state.capacity - state.tokens))
+
+    def sweep(self, now: float) -> int:
+        # Balde que já estaria cheio equivale a chave nova.
+        idle = [
+            key
+            for key, state in self._states.items()
+            if state.tokens + (now - state.updated_at) * state.capacity / state.window_seconds >= state.capacity
+        ]
+        for key in idle:
+            del self._states[key]
+        return len(idle)
+
+
+def build_engine(algorithm: RateLimitAlgorithm) -> SlidingWindowCounterEngine | TokenBucketEngine:
+    if algorithm == "token_bucket":
+        return TokenBucketEngine()
+    return SlidingWindowCounterEngine()
+
+
+class InMemoryRateLimiter:
+    """Limitador por chave com memória constante por chave e varredura periódica de chaves ociosas."""
+
+    def __init__(
+        self,
+        name: str = "default",
+        *,
+        algorithm: RateLimitAlgorithm | None = None,
+        sweep_interval_seconds: float | None = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.name = name
+        self._engine = build_engine(algorithm or settings.rate_limit_algorithm)
+        self._sweep_interval = (
+            sweep_interval_seconds if sweep_interval_seconds is not None else settings.rate_limit_sweep_interval_seconds
+        )
+        self._clock = clock
+        self._last_sweep = clock()
         self._lock = Lock()
 
-    def check(self, key: str, limit: int, window_seconds: int) -> bool:
-        now = monotonic()
-        with self._lock:
-            bucket = self._buckets[key]
-            while bucket and now - bucket[0] > window_seconds:
-                bucket.popleft()
+    def __len__(self) -> int:
+        return len(self._engine)
 
-            if len(bucket) >= limit:
-                return False
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep < self._sweep_interval:
+            return
+        self._last_sweep = now
+        removed = self._engine.sweep(now)
+        if removed:
+            metrics.incr("rate_limit_keys_swept_total", removed, limiter=self.name)
+        metrics.set_gauge("rate_limit_keys", len(self._engine), limiter=self.name)
 
-            bucket.append(now)
-            return True
+    def check(self, key: str, limit: int, window_seconds: int) -> bool:
+        now = self._clock()
+        with self._lock:
+            self._maybe_sweep(now)
+            return self._engine.check(key, limit, window_seconds, now)
 
     def count(self, key: str, window_seconds: int) -> int:
         """Retorna quantas requisições estão registradas na janela (sem adicionar nova)."""
-        now = monotonic()
+        now = self._clock()
+        with self._lock:
+            return self._engine.count(key, window_seconds, now)
+
+    def sweep(self) -> int:
         with self._lock:
-            bucket = self._buckets[key]
-            while bucket and now - bucket[0] > window_seconds:
-                bucket.popleft()
-            return len(bucket)
+            return self._engine.sweep(self._clock())
+
+
+class RateLimitBackend(ABC):
+    """Interface assíncrona usada pelas dependências de rate limit e cota diária."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    @abstractmethod
+    async def check(self, key: str, limit: int, window_seconds: int) -> bool:
+        """Registra a requisição se couber no limite; retorna False se deve ser bloqueada."""
+
+    @abstractmethod
+    async def count(self, key: str, window_seconds: int) -> int:
+        """Quantas requisições estão contabilizadas na janela (sem adicionar nova)."""
+
+    def _fail_open(self, exc: Exception) -> bool:
+        # Falha no armazenamento compartilhado não deve derrubar a API: libera e registra.
+        metrics.incr("rate_limit_backend_errors_total", limiter=self.name)
+        logger.warning("Rate limit backend '%s' failed; allowing request: %s", self.name, exc)
+        return True
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """Memória do processo (um worker só, testes e desenvolvimento)."""
+
+    def __init__(self, name: str, limiter: InMemoryRateLimiter | None = None) -> None:
+        super().__init__(name)
+        self.limiter = limiter or InMemoryRateLimiter(name)
+
+    async def check(self, key: str, limit: int, window_seconds: int) -> bool:
+        return self.limiter.check(key, limit, window_seconds)
+
+    async def count(self, key: str, window_seconds: int) -> int:
+        return self.limiter.count(key, window_seconds)
+
+
+def _window_bounds(now: float, window_seconds: int) -> tuple[int, int, float]:
+    """(início da janela atual, início da anterior, peso da anterior) do contador deslizante."""
+    window_start = int(now // window_seconds) * window_seconds
+    weight = 1 - (now - window_start) / window_seconds
+    return window_start, window_start - window_seconds, weight
+
+
+# Um único statement: só incrementa se a estimativa deslizante (atual + anterior ponderada)
+# ainda couber no limite. Sem linha retornada = bloqueado. Funciona em Postgres e SQLite.
+_DB_CHECK_SQL = text(
+    """
+    INSERT INTO rate_limit_counters (key, window_start, hits, expires_at)
+    SELECT CAST(:key AS VARCHAR(200)), CAST(:window_start AS BIGINT), 1, CAST(:expires_at AS BIGINT)
+    WHERE COALESCE((
+        SELECT prev.hits FROM rate_limit_counters AS prev
+        WHERE prev.key = :key AND prev.window_start = :previous_start
+    ), 0) * CAST(:weight AS DOUBLE PRECISION) < :limit
+    ON CONFLICT (key, window_start) DO UPDATE SET hits = rate_limit_counters.hits + 1
+    WHERE rate_limit_counters.hits + COALESCE((
+        SELECT prev.hits FROM rate_limit_counters AS prev
+        WHERE prev.key = :key AND prev.window_start = :previous_start
+    ), 0) * CAST(:weight AS DOUBLE PRECISION) < :limit
+    RETURNING hits
+    """
+)
+_DB_COUNT_SQL = text(
+    "SELECT window_start, hits FROM rate_limit_counters "
+    "WHERE key = :key AND window_start IN (:window_start, :previous_start)"
+)
+_DB_PURGE_SQL = text("DELETE FROM rate_limit_counters WHERE expires_at < :now")
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    """Contador de janela deslizante na tabela ``rate_limit_counters``, compartilhado entre workers.
+
+    Conexão em autocommit: cada verificação é um único statement (uma ida ao banco), sem lock
+    Python segurado durante o await.
+    """
 
+    def __init__(
+        self,
+        name: str,
+        engine: AsyncEngine,
+        *,
+        purge_interval_seconds: float | None = None,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        super().__init__(name)
+        self._engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+        self._purge_interval = (
+            purge_interval_seconds
+            if purge_interval_seconds is not None
+            else settings.rate_limit_sweep_interval_seconds
+        )
+        self._clock = clock
+        self._last_purge = clock()
+        self._purge_task: asyncio.Task | None = None
 
-rate_limiter = InMemoryRateLimiter()
+    def _key(self, key: str) -> str:
+        # Mesma tabela para todos os limitadores: o nome separa os contadores (como no Redis).
+        return f"{self.name}:{key}"
+
+    async def check(self, key: str, limit: int, window_seconds: int) -> bool:
+        now = self._clock()
+        window_start, previous_start, weight = _window_bounds(now, window_seconds)
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.execute(
+                    _DB_CHECK_SQL,
+                    {
+                        "key": self._key(key),
+                        "window_start": window_start,
+                        "previous_start": previous_start,
+                        "expires_at": window_start + 2 * window_seconds,
+                        "weight": weight,
+                        "limit": limit,
+                    },
+                )
+                allowed = result.first() is not None
+        except Exception as exc:
+            return self._fail_open(exc)
+        self._maybe_purge(now)
+        return allowed
+
+    async def count(self, key: str, window_seconds: int) -> int:
+        now = self._clock()
+        window_start, previous_start, weight = _window_bounds(now, window_seconds)
+        try:
+            async with self._engine.connect() as conn:
+                rows = (
+                    await conn.execute(
+                        _DB_COUNT_SQL,
+                        {"key": self._key(key), "window_start": window_start, "previous_start": previous_start},
+                    )
+                ).all()
+        except Exception as exc:
+            self._fail_open(exc)
+            return 0
+        hits = {row.window_start: row.hits for row in rows}
+        return int(round(hits.get(window_start, 0) + hits.get(previous_start, 0) * weight))
+
+    def _maybe_purge(self, now: float) -> None:
+        if now - self._last_purge < self._purge_interval:
+            return
+        if self._purge_task is not None and not self._purge_task.done():
+            return
+        self._last_purge = now
+        self._purge_task = asyncio.create_task(self.purge_expired())
+
+    async def purge_expired(self) -> int:
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.execute(_DB_PURGE_SQL, {"now": int(self._clock())})
+        except Exception as exc:
+            logger.warning("Rate limit counter purge failed: %s", exc)
+            return 0
+        removed = result.rowcount or 0
+        if removed:
+            metrics.incr("rate_limit_keys_swept_total", removed, limiter=self.name)
+        return removed
+
+
+# Mesma lógica do SQL acima em um EVAL atômico no Redis (uma ida ao servidor).
+_REDIS_CHECK_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if current + previous * tonumber(ARGV[1]) >= tonumber(ARGV[2]) then
+  return 0
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+  redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return 1
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Contador deslizante em qualquer servidor compatível com Redis (requer o extra ``redis``)."""
+
+    def __init__(self, name: str, url: str, *, clock: Callable[[], float] = time) -> None:
+        super().__init__(name)
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:  # pragma: no cover - depende do extra instalado
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires `pip install .[redis]`") from exc
+        self._redis = redis_asyncio.from_url(url)
+        self._script = self._redis.register_script(_REDIS_CHECK_SCRIPT)
+        self._clock = clock
+
+    def _keys(self, key: str, window_start: int, previous_start: int) -> list[str]:
+        return [f"rl:{self.name}:{key}:{window_start}", f"rl:{self.name}:{key}:{previous_start}"]
+
+    async def check(self, key: str, limit: int, window_seconds: int) -> bool:
+        window_start, previous_start, weight = _window_bounds(self._clock(), window_seconds)
+        try:
+            allowed = await self._script(
+                keys=self._keys(key, window_start, previous_start),
+                args=[weight, limit, 2 * window_seconds],
+            )
+        except Exception as exc:
+            return self._fail_open(exc)
+        return bool(allowed)
+
+    async def count(self, key: str, window_seconds: int) -> int:
+        window_start, previous_start, weight = _window_bounds(self._clock(), window_seconds)
+        try:
+            current, previous = await self._redis.mget(self._keys(key, window_start, previous_start))
+        except Exception as exc:
+            self._fail_open(exc)
+            return 0
+        return int(round(int(current or 0) + int(previous or 0) * weight))
+
+
+def build_rate_limit_backend(name: str) -> RateLimitBackend:
+    if settings.rate_limit_backend == "database":
+        from app.db.session import engine
+
+        return DatabaseRateLimitBackend(name, engine)
+    if settings.rate_limit_backend == "redis":
+        return RedisRateLimitBackend(name, settings.rate_limit_redis_url)
+    return LocalRateLimitBackend(name)
+
+
+rate_limiter = build_rate_limit_backend("requests")
 
 # Instância dedicada ao controle de limite diário por usuário
-daily_user_limiter = InMemoryRateLimiter()
+daily_user_limiter = build_rate_limit_backend("daily_user")
 
 
 def rate_limit_dependency(limit: int) -> Callable:
@@ -55,9 +436,9 @@ def rate_limit_dependency(limit: int) -> Callable:
             client_ip = request.headers.get("x-real-ip")
         else:
             client_ip = request.client.host if request.client else "unknown"
-            
+
         key = f"{client_ip}:{request.url.path}"
-        allowed = rate_limiter.check(key, limit=limit, window_seconds=settings.rate_limit_window_seconds)
+        allowed = await rate_limiter.check(key, limit=limit, window_seconds=settings.rate_limit_window_seconds)
         if not allowed:
             raise HTTPException(status_code=429, detail="rate limit exceeded")
 
@@ -1,11 +1,20 @@
 ﻿from abc import ABC, abstractmethod
 
+import httpx
+
+from app.core.http_client import build_async_client
 from app.services.llm_types import ChatResult, CorrectionResult, ReadingActivity, SentenceAnalysis
 
 
 class BaseLLMProvider(ABC):
     name: str
 
+    async def startup(self) -> None:
+        """Abre recursos de vida longa (ex.: pool HTTP). Padrão: nada a fazer."""
+
+    async def aclose(self) -> None:
+        """Libera recursos abertos em ``startup``. Padrão: nada a fazer."""
+
     @abstractmethod
     def is_available(self) -> bool:
         raise NotImplementedError
@@ -27,3 +36,26 @@ class BaseLLMProvider(ABC):
     @abstractmethod
     async def generate_reading_activity(self, theme: str, context: dict) -> tuple[ReadingActivity, str]:
         raise NotImplementedError
+
+
+class HTTPLLMProvider(BaseLLMProvider):
+    """Provider que fala HTTP reutilizando um único AsyncClient (keep-alive/HTTP2) por instância."""
+
+    http2: bool | None = None
+
+    def __init__(self) -> None:
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Criação preguiçosa para uso fora do lifespan (CLI, testes); o lifespan chama startup().
+        if self._client is None or self._client.is_closed:
+            self._client = build_async_client(http2=self.http2)
+        return self._client
+
+    async def startup(self) -> None:
+        self._get_client()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -4,7 +4,7 @@ import httpx
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.providers.base import BaseLLMProvider
+from app.providers.base import HTTPLLMProvider
 from app.services.errors import ProviderRequestError, ProviderUnavailableError
 from app.services.llm_types import (
     ChatResult,
@@ -19,7 +19,7 @@ from app.services.llm_types import (
 logger = get_logger(__name__)
 
 
-class GeminiProvider(BaseLLMProvider):
+class GeminiProvider(HTTPLLMProvider):
     name = "gemini"
 
     @staticmethod
@@ -64,8 +64,7 @@ class GeminiProvider(BaseLLMProvider):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-                response = await client.post(url, json=payload)
+            response = await self._get_client().post(url, json=payload, timeout=timeout_seconds)
         except httpx.TimeoutException as exc:
             raise ProviderRequestError(f"Gemini timeout after {timeout_seconds}s") from exc
         except httpx.RequestError as exc:
@@ -183,25 +182,25 @@ class GeminiProvider(BaseLLMProvider):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=settings.chat_timeout_seconds) as client:
-                async with client.stream("POST", url, json=payload) as response:
-                    async for line in response.aiter_lines():
-                        if not line.startswith("data:"):
-                            continue
-                        raw = line[5:].strip()
-                        if not raw or raw == "[DONE]":
-                            continue
-                        try:
-                            data = json.loads(raw)
-                            candidates = data.get("candidates") or []
-                            if candidates:
-                                parts = candidates[0].get("content", {}).get("parts", [])
-                                for part in parts:
-                                    token = part.get("text", "")
-                                    if token:
-                                        yield token
-                        except json.JSONDecodeError:
-                            continue
+            client = self._get_client()
+            async with client.stream("POST", url, json=payload, timeout=settings.chat_timeout_seconds) as response:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    raw = line[5:].strip()
+                    if not raw or raw == "[DONE]":
+                        continue
+                    try:
+                        data = json.loads(raw)
+                        candidates = data.get("candidates") or []
+                        if candidates:
+                            parts = candidates[0].get("content", {}).get("parts", [])
+                            for part in parts:
+                                token = part.get("text", "")
+                                if token:
+                                    yield token
+                    except json.JSONDecodeError:
+                        continue
         except httpx.RequestError as exc:
             raise ProviderRequestError(f"Gemini stream error: {exc}") from exc
 
@@ -9,7 +9,7 @@ import httpx
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.providers.base import BaseLLMProvider
+from app.providers.base import HTTPLLMProvider
 from app.services.errors import ProviderRequestError, ProviderUnavailableError
 from app.services.llm_types import (
     ChatResult,
@@ -24,8 +24,9 @@ from app.services.llm_types import (
 logger = get_logger(__name__)
 
 
-class OllamaProvider(BaseLLMProvider):
+class OllamaProvider(HTTPLLMProvider):
     name = "ollama"
+    http2 = False  # Ollama local fala HTTP/1.1 em texto puro
 
     @staticmethod
     def _analysis_prompt(source_text: str, context: dict) -> str:
@@ -67,8 +68,7 @@ class OllamaProvider(BaseLLMProvider):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-                response = await client.post(url, json=payload)
+            response = await self._get_client().post(url, json=payload, timeout=timeout_seconds)
         except httpx.TimeoutException as exc:
             raise ProviderRequestError(f"Ollama timeout após {timeout_seconds}s") from exc
         except httpx.RequestError as exc:
@@ -118,20 +118,20 @@ class OllamaProvider(BaseLLMProvider):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-                async with client.stream("POST", url, json=payload) as response:
-                    async for line in response.aiter_lines():
-                        if not line:
-                            continue
-                        try:
-                            chunk = json.loads(line)
-                            token = chunk.get("response", "")
-                            if token:
-                                yield token
-                            if chunk.get("done"):
-                                break
-                        except json.JSONDecodeError:
-                            continue
+            client = self._get_client()
+            async with client.stream("POST", url, json=payload, timeout=timeout_seconds) as response:
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                        token = chunk.get("response", "")
+                        if token:
+                            yield token
+                        if chunk.get("done"):
+                            break
+                    except json.JSONDecodeError:
+                        continue
         except httpx.RequestError as exc:
             raise ProviderRequestError(f"Ollama stream error: {exc}") from exc
 
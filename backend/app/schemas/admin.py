@@ -80,4 +80,12 @@ class AdminMetricsResponse(BaseModel):
     reading_questions_answered_period: int
     reading_correct_answers_period: int
     daily_activity: list[DailyActivity]
-    user_metrics: list[UserMetric]
\ No newline at end of file
+    # Página de usuários ordenada no servidor (total_users dá o tamanho da lista completa)
+    user_metrics: list[UserMetric]
+    user_metrics_offset: int = 0
+    user_metrics_limit: int = 0
+
+
+class RuntimeMetricsResponse(BaseModel):
+    counters: dict[str, float]
+    gauges: dict[str, float]
@@ -5,6 +5,8 @@ class ChatSendRequest(BaseModel):
     session_id: str
     text_raw: str = Field(min_length=1, max_length=4000)
     provider_override: str | None = None
+    # Velocidade do áudio no cliente: a resposta é pré-sintetizada com ela (cache por taxa)
+    speech_rate: float | None = Field(default=None, ge=0.5, le=1.5)
 
 
 class CorrectionMeta(BaseModel):
@@ -0,0 +1,20 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field, StringConstraints
+
+from app.schemas.analysis import TokenInfo
+
+DICTIONARY_BATCH_MAX_WORDS = 300
+
+
+class DictionaryBatchRequest(BaseModel):
+    words: list[Annotated[str, StringConstraints(min_length=1, max_length=80)]] = Field(
+        min_length=1, max_length=DICTIONARY_BATCH_MAX_WORDS
+    )
+
+
+class DictionaryBatchResponse(BaseModel):
+    """Mapa palavra normalizada → informação. Omite palavras que não normalizam e as que
+    passaram do limite de buscas remotas da requisição."""
+
+    entries: dict[str, TokenInfo]
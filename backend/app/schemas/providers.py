@@ -1,9 +1,23 @@
 from pydantic import BaseModel
 
 
+class CircuitBreakerStatus(BaseModel):
+    provider: str
+    method: str
+    state: str  # closed | open | half_open
+    samples: int
+    error_rate: float
+    p50_ms: float | None = None
+    p90_ms: float | None = None
+    p99_ms: float | None = None
+    health_score: float
+    retry_in_seconds: float | None = None
+
+
 class ProviderStatusResponse(BaseModel):
     default_provider: str
     available_providers: list[str]
+    circuit_breakers: list[CircuitBreakerStatus] = []
 
 
 class ProviderPreferenceUpdate(BaseModel):
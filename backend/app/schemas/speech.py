@@ -3,4 +3,6 @@ from pydantic import BaseModel, Field
 
 class SpeechSynthesizeRequest(BaseModel):
     text: str = Field(min_length=1, max_length=4000)
-    rate: float = Field(default=1.0, ge=0.5, le=1.5)
\ No newline at end of file
+    rate: float = Field(default=1.0, ge=0.5, le=1.5)
+    # Envia o áudio à medida que é sintetizado (menor tempo até o primeiro som)
+    stream: bool = False
@@ -38,6 +38,16 @@ class ReviewRequest(BaseModel):
     rating: Literal["again", "hard", "good", "easy"]
 
 
+class ReviewBatchItem(BaseModel):
+    flashcard_id: str
+    rating: Literal["again", "hard", "good", "easy"]
+    reviewed_at: datetime  # horário do cliente; sem fuso = UTC
+
+
+class ReviewBatchRequest(BaseModel):
+    reviews: list[ReviewBatchItem] = Field(min_length=1, max_length=500)
+
+
 class ReviewResponse(BaseModel):
     flashcard_id: str
     rating: str
@@ -49,6 +59,10 @@ class ReviewResponse(BaseModel):
     difficulty: float = 5.0
 
 
+class ReviewBatchResponse(BaseModel):
+    results: list[ReviewResponse]  # mesma ordem do pedido
+
+
 class ReviewStatsResponse(BaseModel):
     total_cards: int
     due_now: int
@@ -0,0 +1,323 @@
+"""Rollup diário de atividade por usuário (tabela ``daily_activity_rollup``).
+
+Os contadores são incrementados na mesma transação que grava o evento (mensagem do aluno,
+sessão, revisão, leitura), então o painel admin lê no máximo dias × usuários linhas pequenas
+em vez de varrer as tabelas de eventos. ``rebuild_daily_activity`` recalcula a partir dos
+eventos brutos: serve de backfill após a migration e de compactação periódica.
+
+Junto com o rollup, ``user_activity_summary`` guarda os totais de cada usuário e a última
+atividade (mensagem, revisão ou leitura), para a lista paginada do admin ordenar e paginar
+sem reagregar os eventos de todos os usuários.
+
+Os contadores refletem os eventos que existem, como a reconstrução: apagar uma sessão
+(``remove_session_activity``) desconta a sessão e as mensagens dela.
+
+Escritas incrementais e rebuilds se excluem por um advisory lock do Postgres
+(``lock_activity_writes``/``lock_activity_rebuild``): sem ele, um evento confirmado depois do
+snapshot do INSERT ... SELECT de um rebuild seria sobrescrito pelo valor recalculado, mais
+antigo. No SQLite a transação de escrita já é exclusiva e os locks não fazem nada.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime
+
+from sqlalchemy import DateTime, delete, exists, func, literal, select, text, true, union_all, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.functions import greatest, utc_date
+from app.db.models import (
+    DailyActivityRollup,
+    Flashcard,
+    Message,
+    ReadingAttempt,
+    ReviewLog,
+    Session,
+    User,
+    UserActivitySummary,
+)
+
+ACTIVITY_COUNTERS = ("messages", "sessions", "reviews", "good_reviews", "reading_activities")
+SUMMARY_COUNTERS = ("messages", "sessions", "reviews", "reading_activities", "reading_questions")
+GOOD_RATINGS = ("good", "easy")
+# Chave arbitrária do advisory lock que serializa rebuilds com as escritas incrementais.
+ACTIVITY_LOCK_KEY = 7_210_021
+
+
+def _insert(db: AsyncSession):
+    return postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+async def lock_activity_writes(db: AsyncSession) -> None:
+    """Lock compartilhado até o fim da transação: escritas incrementais rodam em paralelo entre
+    si, mas não durante um rebuild. Chamar antes de tocar nas linhas de rollup/estatísticas."""
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": ACTIVITY_LOCK_KEY})
+
+
+async def lock_activity_rebuild(db: AsyncSession) -> None:
+    """Lock exclusivo até o fim da transação: espera as escritas em andamento e bloqueia as novas."""
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ACTIVITY_LOCK_KEY})
+
+
+def _upsert(db: AsyncSession, rows: list[dict]):
+    """INSERT ... ON CONFLICT (date, user_id) DO UPDATE somando os contadores."""
+    table = DailyActivityRollup.__table__
+    stmt = _insert(db)(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.date, table.c.user_id],
+        set_={name: table.c[name] + stmt.excluded[name] for name in ACTIVITY_COUNTERS},
+    )
+
+
+def _upsert_summary(db: AsyncSession, row: dict):
+    """INSERT ... ON CONFLICT (user_id) DO UPDATE somando os totais e avançando last_active."""
+    table = UserActivitySummary.__table__
+    stmt = _insert(db)(table).values(row)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in SUMMARY_COUNTERS},
+            "last_active": greatest(
+                table.c.last_active, stmt.excluded.last_active, type_=DateTime(timezone=True)
+            ),
+        },
+    )
+
+
+async def record_activity(
+    db: AsyncSession,
+    user_id: str,
+    *,
+    at: datetime | None = None,
+    messages: int = 0,
+    sessions: int = 0,
+    reviews: int = 0,
+    good_reviews: int = 0,
+    reading_activities: int = 0,
+    reading_questions: int = 0,
+) -> None:
+    """Soma os contadores no dia (UTC) de ``at`` e nos totais do usuário. Não faz commit:
+    vai junto com o evento. ``reading_questions`` só entra nos totais."""
+    await lock_activity_writes(db)
+    at = at or datetime.now(UTC)
+    day = at.astimezone(UTC).date()
+    row = {
+        "date": day,
+        "user_id": user_id,
+        "messages": messages,
+        "sessions": sessions,
+        "reviews": reviews,
+        "good_reviews": good_reviews,
+        "reading_activities": reading_activities,
+    }
+    await db.execute(_upsert(db, [row]))
+    await db.execute(
+        _upsert_summary(
+            db,
+            {
+                "user_id": user_id,
+                "messages": messages,
+                "sessions": sessions,
+                "reviews": reviews,
+                "reading_activities": reading_activities,
+                "reading_questions": reading_questions,
+                # Criar sessão não conta como atividade (mesmo critério da listagem antiga).
+                "last_active": at if messages or reviews or reading_activities else None,
+            },
+        )
+    )
+
+
+async def remove_session_activity(db: AsyncSession, session: Session) -> None:
+    """Desconta do rollup e dos totais a sessão e as mensagens de aluno dela. Chamar antes de
+    apagá-la (na mesma transação); não faz commit. ``last_active`` é recalculado sem ela."""
+    await lock_activity_writes(db)
+    message_day = utc_date(Message.created_at)
+    per_day = dict(
+        (
+            await db.execute(
+                select(message_day, func.count())
+                .where(Message.session_id == session.id, Message.role == "user")
+                .group_by(message_day)
+            )
+        ).all()
+    )
+    created_at = session.created_at if session.created_at.tzinfo else session.created_at.replace(tzinfo=UTC)
+    session_day = created_at.astimezone(UTC).date()
+
+    rollup = DailyActivityRollup
+    days = set(per_day) | {session_day}
+    for day in days:
+        messages = per_day.get(day, 0)
+        sessions = 1 if day == session_day else 0
+        await db.execute(
+            update(rollup)
+            .where(rollup.day == day, rollup.user_id == session.user_id)
+            .values(
+                messages=greatest(rollup.messages - messages, 0),
+                sessions=greatest(rollup.sessions - sessions, 0),
+            )
+        )
+    # Dias que ficaram sem nenhum evento somem, como na reconstrução.
+    await db.execute(
+        delete(rollup).where(
+            rollup.user_id == session.user_id,
+            rollup.day.in_(days),
+            *(rollup.__table__.c[name] == 0 for name in ACTIVITY_COUNTERS),
+        )
+    )
+
+    summary = UserActivitySummary
+    last_message = (
+        select(func.max(Message.created_at))
+        .join(Session, Session.id == Message.session_id)
+        .where(Session.user_id == session.user_id, Session.id != session.id, Message.role == "user")
+        .scalar_subquery()
+    )
+    last_review = (
+        select(func.max(ReviewLog.reviewed_at))
+        .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
+        .where(Flashcard.user_id == session.user_id)
+        .scalar_subquery()
+    )
+    last_reading = (
+        select(func.max(ReadingAttempt.completed_at)).where(ReadingAttempt.user_id == session.user_id).scalar_subquery()
+    )
+    await db.execute(
+        update(summary)
+        .where(summary.user_id == session.user_id)
+        .values(
+            messages=greatest(summary.messages - sum(per_day.values()), 0),
+            sessions=greatest(summary.sessions - 1, 0),
+            last_active=greatest(last_message, last_review, last_reading, type_=DateTime(timezone=True)),
+        )
+    )
+
+
+def _daily_counts(counter: str, user_id, timestamp, start: datetime | None):
+    """SELECT dia, user_id e um contador por coluna (só ``counter`` não nulo) ... GROUP BY
+    dia, user_id. FROM/JOIN completados por quem chama."""
+    day = utc_date(timestamp)
+    counters = [func.count() if name == counter else literal(0) for name in ACTIVITY_COUNTERS]
+    stmt = select(day.label("day"), user_id.label("user_id"), *(
+        value.label(name) for name, value in zip(ACTIVITY_COUNTERS, counters)
+    )).group_by(day, user_id)
+    return stmt.where(timestamp >= start) if start is not None else stmt
+
+
+async def rebuild_daily_activity(db: AsyncSession, since: date | None = None) -> int:
+    """Recalcula o rollup a partir dos eventos (todos ou a partir de ``since``) e faz commit.
+
+    Um INSERT ... SELECT ... ON CONFLICT DO UPDATE grava os valores recalculados e um DELETE
+    remove as linhas do período sem nenhum evento. O lock exclusivo segura as escritas
+    incrementais até o commit (no histórico completo, alguns segundos), para que nenhum evento
+    confirmado depois do snapshot seja sobrescrito. Retorna quantas linhas (dia, usuário) foram
+    gravadas.
+    """
+    await lock_activity_rebuild(db)
+    start = datetime.combine(since, datetime.min.time(), tzinfo=UTC) if since else None
+    sources = union_all(
+        _daily_counts("messages", Session.user_id, Message.created_at, start)
+        .select_from(Message)
+        .join(Session, Session.id == Message.session_id)
+        .where(Message.role == "user"),
+        _daily_counts("sessions", Session.user_id, Session.created_at, start),
+        _daily_counts("reviews", Flashcard.user_id, ReviewLog.reviewed_at, start)
+        .select_from(ReviewLog)
+        .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id),
+        _daily_counts("good_reviews", Flashcard.user_id, ReviewLog.reviewed_at, start)
+        .select_from(ReviewLog)
+        .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
+        .where(ReviewLog.rating.in_(GOOD_RATINGS)),
+        _daily_counts("reading_activities", ReadingAttempt.user_id, ReadingAttempt.completed_at, start),
+    ).subquery()
+    totals = (
+        select(sources.c.day, sources.c.user_id, *(func.sum(sources.c[name]) for name in ACTIVITY_COUNTERS))
+        # WHERE explícito: no SQLite, INSERT ... SELECT ... ON CONFLICT é ambíguo sem ele.
+        .where(true())
+        .group_by(sources.c.day, sources.c.user_id)
+    )
+
+    table = DailyActivityRollup.__table__
+    stmt = _insert(db)(table).from_select(["date", "user_id", *ACTIVITY_COUNTERS], totals)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.date, table.c.user_id],
+        set_={name: stmt.excluded[name] for name in ACTIVITY_COUNTERS},
+    )
+    written = (await db.execute(stmt)).rowcount
+
+    stale = delete(DailyActivityRollup).where(
+        ~exists().where(sources.c.day == DailyActivityRollup.day, sources.c.user_id == DailyActivityRollup.user_id)
+    )
+    if since:
+        stale = stale.where(DailyActivityRollup.day >= since)
+    await db.execute(stale)
+    await db.commit()
+    return written
+
+
+def _summary_source():
+    """SELECT por usuário com os totais e a última atividade, calculados dos eventos."""
+    sessions_sq = select(Session.user_id, func.count(Session.id).label("total")).group_by(Session.user_id).subquery()
+    messages_sq = (
+        select(Session.user_id, func.count(Message.id).label("total"), func.max(Message.created_at).label("last_at"))
+        .join(Session, Session.id == Message.session_id)
+        .where(Message.role == "user")
+        .group_by(Session.user_id)
+        .subquery()
+    )
+    reviews_sq = (
+        select(
+            Flashcard.user_id, func.count(ReviewLog.id).label("total"), func.max(ReviewLog.reviewed_at).label("last_at")
+        )
+        .join(Flashcard, Flashcard.id == ReviewLog.flashcard_id)
+        .group_by(Flashcard.user_id)
+        .subquery()
+    )
+    reading_sq = (
+        select(
+            ReadingAttempt.user_id,
+            func.count(ReadingAttempt.id).label("total"),
+            func.coalesce(func.sum(ReadingAttempt.total_questions), 0).label("questions"),
+            func.max(ReadingAttempt.completed_at).label("last_at"),
+        )
+        .group_by(ReadingAttempt.user_id)
+        .subquery()
+    )
+    return (
+        select(
+            User.id,
+            func.coalesce(messages_sq.c.total, 0),
+            func.coalesce(sessions_sq.c.total, 0),
+            func.coalesce(reviews_sq.c.total, 0),
+            func.coalesce(reading_sq.c.total, 0),
+            func.coalesce(reading_sq.c.questions, 0),
+            greatest(messages_sq.c.last_at, reviews_sq.c.last_at, reading_sq.c.last_at, type_=DateTime(timezone=True)),
+        )
+        .outerjoin(sessions_sq, sessions_sq.c.user_id == User.id)
+        .outerjoin(messages_sq, messages_sq.c.user_id == User.id)
+        .outerjoin(reviews_sq, reviews_sq.c.user_id == User.id)
+        .outerjoin(reading_sq, reading_sq.c.user_id == User.id)
+        # WHERE explícito: no SQLite, INSERT ... SELECT ... JOIN ... ON CONFLICT é ambíguo sem ele.
+        .where(true())
+    )
+
+
+async def rebuild_activity_summary(db: AsyncSession) -> None:
+    """Recalcula ``user_activity_summary`` dos eventos num único INSERT ... SELECT ... ON CONFLICT
+    (uma linha por usuário, inclusive os sem atividade) e faz commit, sob o mesmo lock exclusivo
+    de ``rebuild_daily_activity``."""
+    await lock_activity_rebuild(db)
+    table = UserActivitySummary.__table__
+    columns = ["user_id", *SUMMARY_COUNTERS, "last_active"]
+    stmt = _insert(db)(table).from_select(columns, _summary_source())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={name: stmt.excluded[name] for name in columns[1:]},
+    )
+    await db.execute(stmt)
+    await db.commit()
@@ -0,0 +1,103 @@
+"""Controle de admissão por provider: limite de concorrência + fila de espera limitada com prazo.
+
+Quando a fila está cheia (ou o prazo de espera expira) a chamada falha rápido com
+``ProviderOverloadedError``, e o ``LLMRouter`` tenta o próximo provider em vez de empilhar.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from time import perf_counter
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.errors import ProviderOverloadedError
+
+
+class AdmissionQueue:
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout_seconds: float) -> None:
+        self.name = name
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._in_flight = 0
+        # Futures criados no loop corrente de cada chamada; não prende a fila a um event loop.
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @classmethod
+    def for_provider(cls, name: str) -> AdmissionQueue:
+        return cls(
+            name,
+            max_concurrency=getattr(settings, f"{name}_max_concurrency", settings.llm_default_max_concurrency),
+            max_queue=getattr(settings, f"{name}_max_queue", settings.llm_default_max_queue),
+            queue_timeout_seconds=settings.llm_queue_timeout_seconds,
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def depth(self) -> int:
+        return len(self._waiters)
+
+    def _publish(self) -> None:
+        metrics.set_gauge("llm_in_flight", self._in_flight, provider=self.name)
+        metrics.set_gauge("llm_queue_depth", len(self._waiters), provider=self.name)
+
+    def _shed(self, reason: str) -> ProviderOverloadedError:
+        metrics.incr("llm_queue_shed_total", provider=self.name, reason=reason)
+        return ProviderOverloadedError(f"{self.name} overloaded ({reason})")
+
+    async def acquire(self) -> None:
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            self._in_flight += 1
+            self._publish()
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        started = perf_counter()
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout_seconds)
+        except BaseException:
+            # Cancelado enquanto esperava: devolve a vaga caso ela já tenha sido entregue.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            metrics.observe("llm_queue_wait_ms", (perf_counter() - started) * 1000, provider=self.name)
+            self._publish()
+
+        if not waiter.done():
+            waiter.cancel()
+            raise self._shed("deadline")
+
+    def release(self) -> None:
+        # Entrega a vaga diretamente ao próximo da fila (FIFO) sem liberar o contador.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._publish()
+                return
+        self._in_flight = max(self._in_flight - 1, 0)
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
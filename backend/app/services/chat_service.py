@@ -1,19 +1,63 @@
 """Serviço de chat com suporte a SSE streaming e correção estruturada."""
 
+import asyncio
 import json
+import re
 import time
 from collections.abc import AsyncGenerator
+from contextlib import suppress
+from difflib import SequenceMatcher
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import metrics
 from app.db.models import Message, Session, User
 from app.schemas.chat import ChatSendRequest
+from app.services.activity_rollup import record_activity
+from app.services.errors import ProviderError
 from app.services.llm_router import LLMRouter
+from app.services.llm_types import ChatResult
+from app.services.tts_prefetch import prefetch_speech
 
 logger = get_logger(__name__)
 
+_SPECULATION_STRIP_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_STREAM_END = object()
+
+
+def _normalize_for_speculation(text: str) -> str:
+    text = _SPECULATION_STRIP_RE.sub("", text.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def is_trivial_correction(raw_text: str, corrected_text: str) -> bool:
+    """True quando a correção não muda o sentido do turno (caixa, pontuação ou poucos caracteres).
+
+    Nesses casos a resposta gerada sobre o texto cru pode ser reaproveitada.
+    """
+    raw = _normalize_for_speculation(raw_text)
+    corrected = _normalize_for_speculation(corrected_text)
+    if raw == corrected:
+        return True
+    threshold = settings.chat_speculation_similarity_threshold
+    if threshold >= 1.0:
+        return False
+    return SequenceMatcher(None, raw, corrected).ratio() >= threshold
+
+
+def _record_speculation(outcome: str) -> None:
+    metrics.incr("chat_speculation_total", outcome=outcome)
+
+
+async def _cancel_task(task: asyncio.Task) -> None:
+    task.cancel()
+    with suppress(asyncio.CancelledError, Exception):
+        await task
+
 
 class ChatService:
     def __init__(self, db: AsyncSession, llm_router: LLMRouter) -> None:
@@ -46,10 +90,58 @@ class ChatService:
         }
         return session, history, context
 
+    def _start_speculative_reply(
+        self, user: User, payload: ChatSendRequest, history: list[dict], context: dict
+    ) -> asyncio.Task | None:
+        """Dispara a resposta sobre o texto cru em paralelo à correção (opt-in)."""
+        if not settings.chat_speculative_reply:
+            return None
+        return asyncio.create_task(
+            self.llm_router.generate_reply(
+                corrected_text=payload.text_raw,
+                history=history + [{"role": "user", "content": payload.text_raw}],
+                context=context,
+                provider_override=payload.provider_override,
+                user_preference=user.preferred_ai_provider,
+            )
+        )
+
+    async def _resolve_speculative_reply(
+        self, task: asyncio.Task | None, raw_text: str, corrected_text: str
+    ) -> tuple[tuple[ChatResult, str, str] | None, str]:
+        """Decide se a resposta especulativa vale; senão cancela e sinaliza regeneração."""
+        if task is None:
+            return None, "disabled"
+        if not is_trivial_correction(raw_text, corrected_text):
+            await _cancel_task(task)
+            return None, "miss"
+        try:
+            return await task, "hit"
+        except ProviderError as exc:
+            logger.warning("Speculative reply failed, regenerating: %s", exc)
+            return None, "error"
+
     async def send_message(self, user: User, payload: ChatSendRequest) -> dict:
         session, history, context = await self._get_session_and_history(user, payload.session_id)
 
         start = time.perf_counter()
+        speculative_task = self._start_speculative_reply(user, payload, history, context)
+        try:
+            return await self._send_message(user, payload, session, history, context, start, speculative_task)
+        finally:
+            if speculative_task is not None and not speculative_task.done():
+                await _cancel_task(speculative_task)
+
+    async def _send_message(
+        self,
+        user: User,
+        payload: ChatSendRequest,
+        session: Session,
+        history: list[dict],
+        context: dict,
+        start: float,
+        speculative_task: asyncio.Task | None,
+    ) -> dict:
         correction, correction_provider, correction_model = await self.llm_router.correct_input(
             raw_text=payload.text_raw,
             context=context,
@@ -72,17 +164,24 @@ class ChatService:
             },
         )
         self.db.add(user_message)
+        await record_activity(self.db, user.id, messages=1)
         await self.db.commit()  # persiste user_message antes de chamar a IA
 
         history_with_new = history + [{"role": "user", "content": correction.corrected_text}]
 
-        reply, reply_provider, reply_model = await self.llm_router.generate_reply(
-            corrected_text=correction.corrected_text,
-            history=history_with_new,
-            context=context,
-            provider_override=payload.provider_override,
-            user_preference=user.preferred_ai_provider,
+        speculative_reply, speculation = await self._resolve_speculative_reply(
+            speculative_task, payload.text_raw, correction.corrected_text
         )
+        if speculative_reply is not None:
+            reply, reply_provider, reply_model = speculative_reply
+        else:
+            reply, reply_provider, reply_model = await self.llm_router.generate_reply(
+                corrected_text=correction.corrected_text,
+                history=history_with_new,
+                context=context,
+                provider_override=payload.provider_override,
+                user_preference=user.preferred_ai_provider,
+            )
 
         assistant_message = Message(
             session_id=session.id,
@@ -96,8 +195,11 @@ class ChatService:
         )
         self.db.add(assistant_message)
         await self.db.commit()
+        prefetch_speech(user, assistant_message.content_final, rate=payload.speech_rate)
 
         latency_ms = int((time.perf_counter() - start) * 1000)
+        _record_speculation(speculation)
+        metrics.observe("chat_turn_latency_ms", latency_ms, speculation=speculation)
         logger.info(
             "chat.completed",
             extra={
@@ -109,6 +211,7 @@ class ChatService:
                 "correction_model": correction_model,
                 "reply_provider": reply_provider,
                 "reply_model": reply_model,
+                "speculation": speculation,
                 "latency_ms": latency_ms,
             },
         )
@@ -130,12 +233,98 @@ class ChatService:
             "latency_ms": latency_ms,
         }
 
+    def _start_speculative_stream(
+        self, user: User, payload: ChatSendRequest, history: list[dict], context: dict
+    ) -> tuple[asyncio.Task, asyncio.Queue] | None:
+        """Começa o stream sobre o texto cru, acumulando chunks numa fila até a correção chegar."""
+        if not settings.chat_speculative_reply:
+            return None
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            try:
+                async for chunk in self.llm_router.stream_reply(
+                    corrected_text=payload.text_raw,
+                    history=history + [{"role": "user", "content": payload.text_raw}],
+                    context=context,
+                    provider_override=payload.provider_override,
+                    user_preference=user.preferred_ai_provider,
+                ):
+                    await queue.put(chunk)
+            except Exception as exc:
+                await queue.put(exc)
+                return
+            await queue.put(_STREAM_END)
+
+        return asyncio.create_task(produce()), queue
+
+    async def _stream_reply_chunks(
+        self,
+        user: User,
+        payload: ChatSendRequest,
+        corrected_text: str,
+        history_with_new: list[dict],
+        context: dict,
+        speculative: tuple[asyncio.Task, asyncio.Queue] | None,
+    ) -> AsyncGenerator[str, None]:
+        """Entrega os chunks do reply, reaproveitando o stream especulativo quando a correção é trivial."""
+        if speculative is None:
+            speculation = "disabled"
+        elif not is_trivial_correction(payload.text_raw, corrected_text):
+            await _cancel_task(speculative[0])
+            speculation = "miss"
+        else:
+            _, queue = speculative
+            emitted = False
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    _record_speculation("hit")
+                    return
+                if isinstance(item, Exception):
+                    if emitted:
+                        _record_speculation("error")
+                        raise item
+                    logger.warning("Speculative stream failed, regenerating: %s", item)
+                    break
+                emitted = True
+                yield item
+            speculation = "error"
+
+        _record_speculation(speculation)
+        async for chunk in self.llm_router.stream_reply(
+            corrected_text=corrected_text,
+            history=history_with_new,
+            context=context,
+            provider_override=payload.provider_override,
+            user_preference=user.preferred_ai_provider,
+        ):
+            yield chunk
+
     async def stream_message(
         self, user: User, payload: ChatSendRequest
     ) -> AsyncGenerator[str, None]:
         """Versão SSE do send_message — envia correction primeiro, depois chunks do reply."""
         session, history, context = await self._get_session_and_history(user, payload.session_id)
 
+        speculative = self._start_speculative_stream(user, payload, history, context)
+        try:
+            async for event in self._stream_message(user, payload, session, history, context, speculative):
+                yield event
+        finally:
+            if speculative is not None and not speculative[0].done():
+                await _cancel_task(speculative[0])
+
+    async def _stream_message(
+        self,
+        user: User,
+        payload: ChatSendRequest,
+        session: Session,
+        history: list[dict],
+        context: dict,
+        speculative: tuple[asyncio.Task, asyncio.Queue] | None,
+    ) -> AsyncGenerator[str, None]:
         # 1. Correção (síncrona — antes do stream)
         correction, correction_provider, correction_model = await self.llm_router.correct_input(
             raw_text=payload.text_raw,
@@ -159,6 +348,7 @@ class ChatService:
             },
         )
         self.db.add(user_message)
+        await record_activity(self.db, user.id, messages=1)
         await self.db.commit()  # persiste user_message antes de chamar a IA
 
         # 2. Envia evento de correção imediatamente
@@ -178,12 +368,8 @@ class ChatService:
         history_with_new = history + [{"role": "user", "content": correction.corrected_text}]
         full_reply = ""
 
-        async for chunk in self.llm_router.stream_reply(
-            corrected_text=correction.corrected_text,
-            history=history_with_new,
-            context=context,
-            provider_override=payload.provider_override,
-            user_preference=user.preferred_ai_provider,
+        async for chunk in self._stream_reply_chunks(
+            user, payload, correction.corrected_text, history_with_new, context, speculative
         ):
             full_reply += chunk
             yield f"data: {json.dumps({'type': 'chunk', 'text': chunk}, ensure_ascii=False)}\n\n"
@@ -201,6 +387,7 @@ class ChatService:
         )
         self.db.add(assistant_message)
         await self.db.commit()
+        prefetch_speech(user, full_reply, rate=payload.speech_rate)
 
         # 5. Evento final com IDs para atualização da UI
         done_event = {
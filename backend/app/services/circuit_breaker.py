@@ -0,0 +1,222 @@
+"""Circuit breaker por provider/método com janela deslizante de erros e latências.
+
+Estados:
+- ``closed``: tráfego normal; abre quando a taxa de erro (ou o p90 de latência) da janela passa do limite.
+- ``open``: o provider é pulado até ``open_seconds`` expirar.
+- ``half_open``: deixa passar uma chamada de teste; sucesso fecha, falha reabre.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class BreakerSnapshot:
+    provider: str
+    method: str
+    state: str
+    samples: int
+    error_rate: float
+    p50_ms: float | None
+    p90_ms: float | None
+    p99_ms: float | None
+    health_score: float
+    retry_in_seconds: float | None
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Percentil por nearest-rank; ``None`` quando não há amostras."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        provider: str,
+        method: str,
+        *,
+        window_seconds: float | None = None,
+        window_size: int | None = None,
+        min_samples: int | None = None,
+        error_rate_threshold: float | None = None,
+        slow_call_seconds: float | None = None,
+        open_seconds: float | None = None,
+        clock=monotonic,
+    ) -> None:
+        self.provider = provider
+        self.method = method
+        self.window_seconds = window_seconds if window_seconds is not None else settings.circuit_breaker_window_seconds
+        self.min_samples = min_samples if min_samples is not None else settings.circuit_breaker_min_samples
+        self.error_rate_threshold = (
+            error_rate_threshold
+            if error_rate_threshold is not None
+            else settings.circuit_breaker_error_rate_threshold
+        )
+        self.slow_call_seconds = (
+            slow_call_seconds if slow_call_seconds is not None else settings.circuit_breaker_slow_call_seconds
+        )
+        self.open_seconds = open_seconds if open_seconds is not None else settings.circuit_breaker_open_seconds
+        self._clock = clock
+        # (timestamp, sucesso, latência em segundos)
+        self._samples: deque[tuple[float, bool, float]] = deque(
+            maxlen=window_size if window_size is not None else settings.circuit_breaker_window_size
+        )
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        self._lock = Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        elif self._state == HALF_OPEN and self._probe_in_flight and now - self._probe_started_at >= self.open_seconds:
+            # Sonda cancelada sem registrar resultado: libera a vaga para outra tentativa.
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def allow_request(self) -> bool:
+        """Reserva a passagem de uma chamada. No half-open só uma sonda por vez."""
+        now = self._clock()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_started_at = now
+                return True
+            return False
+
+    def is_available(self) -> bool:
+        """Como ``allow_request`` mas sem reservar a sonda (usado para ordenar providers)."""
+        with self._lock:
+            state = self._current_state(self._clock())
+            return state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight)
+
+    def _trip(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+
+    def _should_trip(self) -> bool:
+        if len(self._samples) < self.min_samples:
+            return False
+        failures = sum(1 for _, ok, _ in self._samples if not ok)
+        if failures / len(self._samples) >= self.error_rate_threshold:
+            return True
+        if self.slow_call_seconds > 0:
+            p90 = percentile([latency for _, _, latency in self._samples], 90)
+            return p90 is not None and p90 >= self.slow_call_seconds
+        return False
+
+    def record_success(self, latency_seconds: float) -> None:
+        now = self._clock()
+        with self._lock:
+            self._prune(now)
+            self._samples.append((now, True, latency_seconds))
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._samples.clear()
+                self._samples.append((now, True, latency_seconds))
+            elif state == CLOSED and self._should_trip():
+                self._trip(now)
+
+    def record_failure(self, latency_seconds: float) -> None:
+        now = self._clock()
+        with self._lock:
+            self._prune(now)
+            self._samples.append((now, False, latency_seconds))
+            state = self._current_state(now)
+            if state == HALF_OPEN or (state == CLOSED and self._should_trip()):
+                self._trip(now)
+
+    def latency_percentile(self, pct: float) -> float | None:
+        """Percentil de latência (segundos) das chamadas bem-sucedidas da janela."""
+        with self._lock:
+            self._prune(self._clock())
+            return percentile([latency for _, ok, latency in self._samples if ok], pct)
+
+    def snapshot(self) -> BreakerSnapshot:
+        now = self._clock()
+        with self._lock:
+            self._prune(now)
+            state = self._current_state(now)
+            samples = len(self._samples)
+            failures = sum(1 for _, ok, _ in self._samples if not ok)
+            error_rate = failures / samples if samples else 0.0
+            latencies = [latency for _, ok, latency in self._samples if ok]
+            p50 = percentile(latencies, 50)
+            p90 = percentile(latencies, 90)
+            p99 = percentile(latencies, 99)
+
+        health = 1.0 - error_rate
+        if p90 is not None and self.slow_call_seconds > 0:
+            health *= max(0.0, 1.0 - p90 / (2 * self.slow_call_seconds))
+        if state == OPEN:
+            health = 0.0
+
+        return BreakerSnapshot(
+            provider=self.provider,
+            method=self.method,
+            state=state,
+            samples=samples,
+            error_rate=round(error_rate, 3),
+            p50_ms=round(p50 * 1000, 1) if p50 is not None else None,
+            p90_ms=round(p90 * 1000, 1) if p90 is not None else None,
+            p99_ms=round(p99 * 1000, 1) if p99 is not None else None,
+            health_score=round(health, 3),
+            retry_in_seconds=(
+                round(max(0.0, self._opened_at + self.open_seconds - now), 1) if state == OPEN else None
+            ),
+        )
+
+
+class CircuitBreakerRegistry:
+    """Um breaker por par (provider, método), criado sob demanda."""
+
+    def __init__(self, **breaker_kwargs) -> None:
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+        self._breaker_kwargs = breaker_kwargs
+        self._lock = Lock()
+
+    def get(self, provider: str, method: str) -> CircuitBreaker:
+        key = (provider, method)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(provider, method, **self._breaker_kwargs)
+                self._breakers[key] = breaker
+            return breaker
+
+    def snapshots(self) -> list[BreakerSnapshot]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.snapshot() for breaker in breakers]
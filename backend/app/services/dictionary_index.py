@@ -0,0 +1,63 @@
+"""Índice offline de dicionário (SQLite somente leitura, mapeado em memória).
+
+O arquivo é gerado por ``python -m app.cli.build_dictionary_index`` e consultado antes das
+APIs remotas pelo ``DictionaryLookupService``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from app.core.logging import get_logger
+from app.schemas.analysis import TokenInfo
+
+logger = get_logger(__name__)
+
+INDEX_SCHEMA_VERSION = 1
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
+
+class OfflineDictionaryIndex:
+    """Consulta por chave primária numa tabela ``WITHOUT ROWID``: microssegundos, sem rede."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        uri = f"file:{self.path.resolve().as_posix()}?mode=ro&immutable=1"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_SCHEMA_VERSION:
+            self._conn.close()
+            raise ValueError(f"Unsupported dictionary index version {version} in {self.path}")
+
+    @classmethod
+    def open_if_available(cls, path: str | None) -> OfflineDictionaryIndex | None:
+        if not path:
+            return None
+        if not Path(path).is_file():
+            logger.info("Offline dictionary index not found at '%s'; using remote lookups only", path)
+            return None
+        try:
+            index = cls(path)
+        except (sqlite3.Error, ValueError) as exc:
+            logger.warning("Offline dictionary index at '%s' could not be opened: %s", path, exc)
+            return None
+        logger.info("Offline dictionary index loaded", extra={"path": path, "entries": len(index)})
+        return index
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def lookup(self, word: str) -> TokenInfo | None:
+        row = self._conn.execute(
+            "SELECT lemma, pos, translation, definition FROM entries WHERE word = ?",
+            (word,),
+        ).fetchone()
+        if row is None:
+            return None
+        lemma, pos, translation, definition = row
+        return TokenInfo(token=word, lemma=lemma, pos=pos, translation=translation, definition=definition)
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,10 +1,22 @@
+import asyncio
 import re
+from datetime import UTC, datetime, timedelta
 from urllib.parse import quote
 
 import httpx
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.http_client import build_async_client
 from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
+from app.db.models import DictionaryEntry
+from app.db.session import AsyncSessionLocal
 from app.schemas.analysis import TokenInfo
+from app.services.dictionary_index import OfflineDictionaryIndex
 
 logger = get_logger(__name__)
 
@@ -17,14 +29,32 @@ def _normalize_word(word: str) -> str:
 
 
 class DictionaryLookupService:
-    def __init__(self) -> None:
-        self._cache: dict[str, TokenInfo] = {}
+    """Consulta de palavras em camadas: LRU em memória → índice offline → tabela dictionary_entries → APIs remotas."""
+
+    def __init__(self, index: OfflineDictionaryIndex | None = None) -> None:
+        self._index = index
+        self._cache: LRUCache[str, TokenInfo] = LRUCache(
+            "dictionary",
+            settings.dictionary_cache_max_entries,
+            ttl_seconds=settings.dictionary_cache_ttl_seconds,
+        )
+        self._flights: SingleFlight[str, TokenInfo] = SingleFlight("dictionary")
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = build_async_client(timeout=settings.dictionary_http_timeout_seconds)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def _lookup_definition(self, word: str) -> tuple[str | None, str | None, str | None]:
         url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{quote(word)}"
         try:
-            async with httpx.AsyncClient(timeout=6) as client:
-                response = await client.get(url)
+            response = await self._get_client().get(url)
             if response.status_code != 200:
                 return None, None, None
 
@@ -55,8 +85,7 @@ class DictionaryLookupService:
     async def _lookup_translation_pt(self, word: str) -> str | None:
         url = "https://api.mymemory.translated.net/get"
         try:
-            async with httpx.AsyncClient(timeout=6) as client:
-                response = await client.get(url, params={"q": word, "langpair": "en|pt-BR"})
+            response = await self._get_client().get(url, params={"q": word, "langpair": "en|pt-BR"})
             if response.status_code != 200:
                 return None
 
@@ -74,16 +103,79 @@ class DictionaryLookupService:
             logger.warning("Dictionary translation lookup failed for '%s': %s", word, exc)
             return None
 
-    async def lookup(self, word: str) -> TokenInfo:
-        normalized = _normalize_word(word)
-        if not normalized:
-            return TokenInfo(token=word)
+    @staticmethod
+    def _persisted_cutoff() -> datetime:
+        return datetime.now(UTC) - timedelta(days=settings.dictionary_persist_ttl_days)
+
+    @staticmethod
+    def _entry_to_token(row: DictionaryEntry, cutoff: datetime) -> TokenInfo | None:
+        updated_at = row.updated_at if row.updated_at.tzinfo else row.updated_at.replace(tzinfo=UTC)
+        if updated_at < cutoff:
+            return None
+        return TokenInfo(
+            token=row.word,
+            lemma=row.lemma,
+            pos=row.pos,
+            translation=row.translation,
+            definition=row.definition,
+        )
+
+    async def _load_persisted(self, word: str) -> TokenInfo | None:
+        try:
+            async with AsyncSessionLocal() as db:
+                row = await db.get(DictionaryEntry, word)
+        except SQLAlchemyError as exc:
+            logger.warning("Dictionary cache read failed for '%s': %s", word, exc)
+            return None
+        if row is None:
+            return None
+        return self._entry_to_token(row, self._persisted_cutoff())
+
+    async def _load_persisted_many(self, words: list[str]) -> dict[str, TokenInfo]:
+        """Uma única consulta à tabela dictionary_entries para todas as palavras do lote."""
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(select(DictionaryEntry).where(DictionaryEntry.word.in_(words)))).scalars()
+                rows = list(rows)
+        except SQLAlchemyError as exc:
+            logger.warning("Dictionary cache batch read failed (%d words): %s", len(words), exc)
+            return {}
+        cutoff = self._persisted_cutoff()
+        found: dict[str, TokenInfo] = {}
+        for row in rows:
+            token_info = self._entry_to_token(row, cutoff)
+            if token_info is not None:
+                found[row.word] = token_info
+        return found
+
+    async def _persist(self, token_info: TokenInfo) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.merge(
+                    DictionaryEntry(
+                        word=token_info.token,
+                        lemma=token_info.lemma,
+                        pos=token_info.pos,
+                        translation=token_info.translation,
+                        definition=token_info.definition,
+                        updated_at=datetime.now(UTC),
+                    )
+                )
+                await db.commit()
+        except SQLAlchemyError as exc:
+            logger.warning("Dictionary cache write failed for '%s': %s", token_info.token, exc)
 
-        if normalized in self._cache:
-            return self._cache[normalized]
+    async def _lookup_uncached(self, normalized: str, *, check_persisted: bool = True) -> TokenInfo:
+        if check_persisted:
+            persisted = await self._load_persisted(normalized)
+            if persisted is not None:
+                self._cache.set(normalized, persisted)
+                return persisted
 
-        lemma, pos, definition = await self._lookup_definition(normalized)
-        translation = await self._lookup_translation_pt(normalized)
+        (lemma, pos, definition), translation = await asyncio.gather(
+            self._lookup_definition(normalized),
+            self._lookup_translation_pt(normalized),
+        )
 
         token_info = TokenInfo(
             token=normalized,
@@ -92,5 +184,86 @@ class DictionaryLookupService:
             translation=translation,
             definition=definition,
         )
-        self._cache[normalized] = token_info
+        if not any((lemma, pos, translation, definition)):
+            # Cache negativo curto: evita martelar as APIs por palavras inexistentes ou durante falhas.
+            self._cache.set(normalized, token_info, ttl_seconds=settings.dictionary_negative_ttl_seconds)
+            return token_info
+
+        self._cache.set(normalized, token_info)
+        await self._persist(token_info)
         return token_info
+
+    def _lookup_local(self, normalized: str) -> TokenInfo | None:
+        cached = self._cache.get(normalized)
+        if cached is not None:
+            return cached
+
+        if self._index is not None:
+            indexed = self._index.lookup(normalized)
+            if indexed is not None:
+                metrics.incr("dictionary_index_hits_total")
+                self._cache.set(normalized, indexed)
+                return indexed
+        return None
+
+    async def _lookup_remote(self, normalized: str, *, check_persisted: bool = True) -> TokenInfo:
+        return await self._flights.do(
+            normalized, lambda: self._lookup_uncached(normalized, check_persisted=check_persisted)
+        )
+
+    async def lookup(self, word: str) -> TokenInfo:
+        normalized = _normalize_word(word)
+        if not normalized:
+            return TokenInfo(token=word)
+
+        local = self._lookup_local(normalized)
+        if local is not None:
+            return local
+        return await self._lookup_remote(normalized)
+
+    async def lookup_many(self, words: list[str]) -> dict[str, TokenInfo]:
+        """Resolve várias palavras de uma vez: normaliza, remove duplicatas, responde o que
+        estiver em cache/índice, lê o restante da tabela numa só consulta e busca o que
+        faltar nas APIs em paralelo, com concorrência limitada.
+
+        No máximo ``dictionary_batch_max_remote_lookups`` palavras vão às APIs; as demais ficam
+        fora do resultado (o cliente pode pedi-las de novo depois)."""
+        results: dict[str, TokenInfo] = {}
+        missing: list[str] = []
+        seen: set[str] = set()
+        seen_order: list[str] = []
+        for word in words:
+            normalized = _normalize_word(word)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            seen_order.append(normalized)
+            local = self._lookup_local(normalized)
+            if local is not None:
+                results[normalized] = local
+            else:
+                missing.append(normalized)
+
+        if missing:
+            persisted = await self._load_persisted_many(missing)
+            for normalized, token_info in persisted.items():
+                self._cache.set(normalized, token_info)
+            results.update(persisted)
+            missing = [normalized for normalized in missing if normalized not in persisted]
+
+        limit = max(settings.dictionary_batch_max_remote_lookups, 0)
+        if len(missing) > limit:
+            metrics.incr("dictionary_batch_remote_skipped_total", len(missing) - limit)
+            missing = missing[:limit]
+
+        if missing:
+            semaphore = asyncio.Semaphore(max(settings.dictionary_batch_concurrency, 1))
+
+            async def fetch(normalized: str) -> TokenInfo:
+                async with semaphore:
+                    # A tabela já foi consultada em lote acima.
+                    return await self._lookup_remote(normalized, check_persisted=False)
+
+            fetched = await asyncio.gather(*(fetch(normalized) for normalized in missing))
+            results.update(zip(missing, fetched))
+        return {normalized: results[normalized] for normalized in seen_order if normalized in results}
@@ -1,8 +1,10 @@
-from collections.abc import Iterable
+import re
+from collections.abc import AsyncIterator, Iterable
 
 from app.core.config import settings
 
 DEFAULT_EDGE_TTS_VOICE = settings.edge_tts_default_voice
+_SENTENCE_END_RE = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"”’')\]]))\s+")
 SUPPORTED_EDGE_TTS_VOICES = (
     "en-US-AriaNeural",
     "en-US-DavisNeural",
@@ -23,6 +25,12 @@ def is_supported_edge_tts_voice(voice: str) -> bool:
     return voice in SUPPORTED_EDGE_TTS_VOICES
 
 
+def resolve_edge_tts_voice(voice: str | None) -> str:
+    """Voz preferida do usuário, ou a padrão se vazia/não suportada."""
+    candidate = (voice or DEFAULT_EDGE_TTS_VOICE).strip()
+    return candidate if is_supported_edge_tts_voice(candidate) else DEFAULT_EDGE_TTS_VOICE
+
+
 def normalize_edge_tts_rate(rate: float) -> str:
     clamped = min(max(rate, 0.5), 1.5)
     percent = int(round((clamped - 1.0) * 100))
@@ -30,7 +38,27 @@ def normalize_edge_tts_rate(rate: float) -> str:
     return f"{sign}{percent}%"
 
 
-async def synthesize_with_edge_tts(text: str, voice: str, rate: float) -> bytes:
+def split_tts_chunks(text: str, max_chars: int) -> list[str]:
+    """Quebra o texto em blocos de sentenças inteiras com até ``max_chars`` (uma sentença
+    maior que o limite vira um bloco sozinha). Determinístico, para que blocos repetidos
+    caiam na mesma chave de cache."""
+    sentences = [part.strip() for part in _SENTENCE_END_RE.split(text) if part.strip()]
+    chunks: list[str] = []
+    current = ""
+    for sentence in sentences:
+        candidate = f"{current} {sentence}" if current else sentence
+        if current and len(candidate) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def stream_edge_tts(text: str, voice: str, rate: float) -> AsyncIterator[bytes]:
+    """Repassa os blocos de áudio à medida que o Edge TTS os produz."""
     import edge_tts
 
     communicate = edge_tts.Communicate(
@@ -38,8 +66,13 @@ async def synthesize_with_edge_tts(text: str, voice: str, rate: float) -> bytes:
         voice=voice,
         rate=normalize_edge_tts_rate(rate),
     )
-    chunks: list[bytes] = []
     async for chunk in communicate.stream():
-        if chunk["type"] == "audio":
-            chunks.append(chunk["data"])
-    return b"".join(chunks)
\ No newline at end of file
+        if chunk["type"] == "audio" and chunk["data"]:
+            yield chunk["data"]
+
+
+async def synthesize_with_edge_tts(text: str, voice: str, rate: float) -> bytes:
+    chunks: list[bytes] = []
+    async for chunk in stream_edge_tts(text=text, voice=voice, rate=rate):
+        chunks.append(chunk)
+    return b"".join(chunks)
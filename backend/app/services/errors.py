@@ -8,3 +8,7 @@ class ProviderUnavailableError(ProviderError):
 
 class ProviderRequestError(ProviderError):
     """Provider request failed."""
+
+
+class ProviderOverloadedError(ProviderError):
+    """Provider admission queue is full or the wait deadline expired."""
@@ -9,6 +9,7 @@ Referência: https://github.com/open-spaced-repetition/fsrs4anki/wiki/Algorithm
 from __future__ import annotations
 
 import math
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
@@ -38,6 +39,7 @@ W = [
 
 DECAY = -0.5
 FACTOR = (0.9 ** (1.0 / DECAY)) - 1.0  # ≈ 19.0
+DEFAULT_RETENTION = 0.90
 
 RATING_MAP = {
     "again": 1,
@@ -62,40 +64,42 @@ def _clamp(value: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, value))
 
 
-def _initial_stability(rating: int) -> float:
+def _initial_stability(rating: int, w: Sequence[float] = W) -> float:
     """Estabilidade inicial para a primeira revisão (sem histórico)."""
-    return W[rating - 1]  # w0=again, w1=hard, w2=good, w3=easy
+    return w[rating - 1]  # w0=again, w1=hard, w2=good, w3=easy
 
 
-def _initial_difficulty(rating: int) -> float:
+def _initial_difficulty(rating: int, w: Sequence[float] = W) -> float:
     """Dificuldade inicial baseada no rating da primeira revisão."""
-    d = W[4] - (rating - 3) * W[5]
+    d = w[4] - (rating - 3) * w[5]
     return _clamp(d, 1.0, 10.0)
 
 
-def _next_difficulty(difficulty: float, rating: int) -> float:
+def _next_difficulty(difficulty: float, rating: int, w: Sequence[float] = W) -> float:
     """Ajusta a dificuldade com base no desempenho atual."""
-    delta = -W[6] * (rating - 3)
+    delta = -w[6] * (rating - 3)
     d = difficulty + delta * ((10.0 - difficulty) / 9.0)
     # mean-reversion para 5
-    d = W[7] * 5.0 + (1.0 - W[7]) * d
+    d = w[7] * 5.0 + (1.0 - w[7]) * d
     return _clamp(d, 1.0, 10.0)
 
 
-def _short_term_stability(stability: float, rating: int) -> float:
+def _short_term_stability(stability: float, rating: int, w: Sequence[float] = W) -> float:
     """Atualização de estabilidade para revisões de reaprendizado (lapso)."""
-    return stability * math.exp(W[17] * (rating - 3 + W[16]))
+    return stability * math.exp(w[17] * (rating - 3 + w[16]))
 
 
-def _next_stability_recall(difficulty: float, stability: float, retrievability: float, rating: int) -> float:
+def _next_stability_recall(
+    difficulty: float, stability: float, retrievability: float, rating: int, w: Sequence[float] = W
+) -> float:
     """Calcula nova estabilidade após revisão bem-sucedida."""
-    hard_penalty = W[15] if rating == 2 else 1.0
-    easy_bonus = W[16] if rating == 4 else 1.0
+    hard_penalty = w[15] if rating == 2 else 1.0
+    easy_bonus = w[16] if rating == 4 else 1.0
     s = stability * (
-        math.exp(W[8])
+        math.exp(w[8])
         * (11.0 - difficulty)
-        * (stability ** (-W[9]))
-        * (math.exp(W[10] * (1.0 - retrievability)) - 1.0)
+        * (stability ** (-w[9]))
+        * (math.exp(w[10] * (1.0 - retrievability)) - 1.0)
         * hard_penalty
         * easy_bonus
     )
@@ -107,7 +111,7 @@ def _retrievability(stability: float, elapsed_days: int) -> float:
     return (1.0 + FACTOR * elapsed_days / stability) ** DECAY
 
 
-def _interval_from_stability(stability: float, desired_retention: float = 0.90) -> int:
+def _interval_from_stability(stability: float, desired_retention: float = DEFAULT_RETENTION) -> int:
     """Calcula o intervalo em dias para atingir a retenção desejada."""
     interval = stability / FACTOR * (desired_retention ** (1.0 / DECAY) - 1.0)
     return max(1, round(interval))
@@ -120,6 +124,9 @@ def apply_fsrs(
     current_ef: float,
     stability: float = 0.0,
     difficulty: float = 5.0,
+    reviewed_at: datetime | None = None,
+    weights: Sequence[float] | None = None,
+    desired_retention: float = DEFAULT_RETENTION,
 ) -> FSRSResult:
     """Aplica o algoritmo FSRS v4 e retorna o próximo estado do flashcard.
 
@@ -130,23 +137,27 @@ def apply_fsrs(
         current_ef: ease factor do SM-2 (mantido por retrocompatibilidade)
         stability: parâmetro FSRS — dias para 90% retenção
         difficulty: parâmetro FSRS — 1.0 (fácil) a 10.0 (difícil)
+        reviewed_at: momento da revisão (padrão: agora); base do next_review
+        weights: 18 pesos FSRS (padrão: ``W``)
+        desired_retention: retenção alvo usada para converter estabilidade em intervalo
     """
     if rating not in RATING_MAP:
         raise ValueError("rating inválido")
 
     r = RATING_MAP[rating]
+    w = W if weights is None else weights
     lapses_increment = 0
 
     # -- Primeiro review (sem histórico FSRS) --
     if stability < 0.1 or current_repetitions == 0:
-        new_stability = _initial_stability(r)
-        new_difficulty = _initial_difficulty(r)
+        new_stability = _initial_stability(r, w)
+        new_difficulty = _initial_difficulty(r, w)
         new_repetitions = 0 if r == 1 else 1
         if r == 1:
             lapses_increment = 1
-        new_interval = _interval_from_stability(new_stability)
+        new_interval = _interval_from_stability(new_stability, desired_retention)
     else:
-        new_difficulty = _next_difficulty(difficulty, r)
+        new_difficulty = _next_difficulty(difficulty, r, w)
         elapsed = max(current_interval, 1)
         ret = _retrievability(stability, elapsed)
 
@@ -154,18 +165,18 @@ def apply_fsrs(
             # Lapso: reaprendizado
             lapses_increment = 1
             new_repetitions = 0
-            new_stability = _short_term_stability(stability, r)
+            new_stability = _short_term_stability(stability, r, w)
             new_interval = 1
         else:
             # Revisão bem-sucedida
             new_repetitions = current_repetitions + 1
-            new_stability = _next_stability_recall(new_difficulty, stability, ret, r)
-            new_interval = _interval_from_stability(new_stability)
+            new_stability = _next_stability_recall(new_difficulty, stability, ret, r, w)
+            new_interval = _interval_from_stability(new_stability, desired_retention)
 
     # ease_factor mantido para compatibilidade com campo existente no banco
     new_ef = _clamp(current_ef + (0.1 - (4 - r) * (0.08 + (4 - r) * 0.02)), 1.3, 3.0)
 
-    next_review = datetime.now(UTC) + timedelta(days=new_interval)
+    next_review = (reviewed_at or datetime.now(UTC)) + timedelta(days=new_interval)
 
     return FSRSResult(
         interval_days=new_interval,
@@ -0,0 +1,230 @@
+"""FSRS v4 vetorizado (NumPy) para reagendar muitos cards de uma vez.
+
+Mesmas fórmulas e mesma ordem de operações de ``app.services.fsrs.apply_fsrs``, aplicadas
+sobre arrays. ``exp`` do NumPy pode diferir do ``math.exp`` no último bit e ``np.rint`` sobre
+``x * 10**n`` pode errar o lado de um empate decimal; por isso as posições cujo arredondamento
+final cai perto de um empate são recalculadas com ``apply_fsrs`` (fração ínfima dos cards).
+O resultado é idêntico ao escalar.
+
+NumPy é opcional: ``pip install .[fsrs]``.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.services.fsrs import DECAY, DEFAULT_RETENTION, FACTOR, RATING_MAP, W, apply_fsrs
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do extra instalado
+    np = None
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike, NDArray
+
+RATING_NAMES = {value: name for name, value in RATING_MAP.items()}
+# Distância máxima de um empate (em unidades da última casa) que dispara o recálculo escalar.
+_TIE_TOLERANCE = 1e-6
+_TIE_RELATIVE_TOLERANCE = 1e-12
+
+# Estado de um card novo (defaults do modelo Flashcard).
+INITIAL_INTERVAL = 1
+INITIAL_EF = 2.5
+INITIAL_STABILITY = 0.0
+INITIAL_DIFFICULTY = 5.0
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Vectorized FSRS requires NumPy: `pip install .[fsrs]`")
+    return np
+
+
+@dataclass(slots=True)
+class FSRSBatchResult:
+    """Próximo estado de cada card (arrays alinhados à entrada). next_review = revisão + interval_days."""
+
+    interval_days: NDArray
+    repetitions: NDArray
+    stability: NDArray
+    difficulty: NDArray
+    ease_factor: NDArray
+    lapses_increment: NDArray
+
+    def __len__(self) -> int:
+        return len(self.interval_days)
+
+
+def encode_ratings(ratings: Sequence[str]) -> NDArray:
+    """Converte "again".."easy" em 1..4 (ValueError para rating inválido)."""
+    _require_numpy()
+    try:
+        return np.fromiter((RATING_MAP[rating] for rating in ratings), dtype=np.int64, count=len(ratings))
+    except KeyError as exc:
+        raise ValueError("rating inválido") from exc
+
+
+def _near_tie(scaled: NDArray) -> NDArray:
+    """True onde ``scaled`` está tão perto de ``k + 0.5`` que o arredondamento pode divergir."""
+    distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    return distance < _TIE_TOLERANCE + np.abs(scaled) * _TIE_RELATIVE_TOLERANCE
+
+
+def _round_decimals(values: NDArray, decimals: int) -> tuple[NDArray, NDArray]:
+    scale = 10.0**decimals
+    scaled = values * scale
+    return np.rint(scaled) / scale, _near_tie(scaled)
+
+
+def interval_from_stability(stability: ArrayLike, desired_retention: float = DEFAULT_RETENTION) -> tuple[NDArray, NDArray]:
+    """Intervalo (dias, >= 1) para a retenção alvo, e máscara de empates a conferir no escalar."""
+    _require_numpy()
+    raw = np.asarray(stability, dtype=np.float64) / FACTOR * (desired_retention ** (1.0 / DECAY) - 1.0)
+    return np.maximum(np.rint(raw), 1).astype(np.int64), _near_tie(raw)
+
+
+def apply_fsrs_batch(
+    ratings: ArrayLike,
+    current_interval: ArrayLike,
+    current_repetitions: ArrayLike,
+    current_ef: ArrayLike,
+    stability: ArrayLike,
+    difficulty: ArrayLike,
+    *,
+    weights: Sequence[float] | None = None,
+    desired_retention: float = DEFAULT_RETENTION,
+) -> FSRSBatchResult:
+    """Versão vetorizada de ``apply_fsrs``: ``ratings`` em 1..4 (ver ``encode_ratings``).
+
+    Como no escalar, o tempo decorrido considerado é ``max(current_interval, 1)``.
+    """
+    _require_numpy()
+    w = [float(value) for value in (W if weights is None else weights)]
+    r = np.asarray(ratings, dtype=np.int64)
+    if r.size and (r.min() < 1 or r.max() > 4):
+        raise ValueError("rating inválido")
+    interval = np.asarray(current_interval, dtype=np.int64)
+    reps = np.asarray(current_repetitions, dtype=np.int64)
+    ef = np.asarray(current_ef, dtype=np.float64)
+    s = np.asarray(stability, dtype=np.float64)
+    d = np.asarray(difficulty, dtype=np.float64)
+    r, interval, reps, ef, s, d = np.broadcast_arrays(r, interval, reps, ef, s, d)
+
+    first = (s < 0.1) | (reps == 0)
+    lapse = r == 1
+    grade = r - 3
+
+    # -- Primeiro review (sem histórico FSRS) --
+    first_stability = np.asarray(w[:4])[r - 1]
+    first_difficulty = np.clip(w[4] - grade * w[5], 1.0, 10.0)
+
+    # -- Revisões seguintes --
+    next_difficulty = d + (-w[6] * grade) * ((10.0 - d) / 9.0)
+    next_difficulty = np.clip(w[7] * 5.0 + (1.0 - w[7]) * next_difficulty, 1.0, 10.0)
+    safe_s = np.where(first, 1.0, s)  # evita divisão por zero nas posições de primeiro review
+    elapsed = np.maximum(interval, 1)
+    retrievability = (1.0 + FACTOR * elapsed / safe_s) ** DECAY
+    lapse_stability = safe_s * np.exp(w[17] * (grade + w[16]))
+    hard_penalty = np.where(r == 2, w[15], 1.0)
+    easy_bonus = np.where(r == 4, w[16], 1.0)
+    recall_stability = safe_s * (
+        math.exp(w[8])
+        * (11.0 - next_difficulty)
+        * (safe_s ** (-w[9]))
+        * (np.exp(w[10] * (1.0 - retrievability)) - 1.0)
+        * hard_penalty
+        * easy_bonus
+    )
+    recall_stability = np.maximum(recall_stability, 0.01)
+
+    new_stability = np.where(first, first_stability, np.where(lapse, lapse_stability, recall_stability))
+    new_difficulty = np.where(first, first_difficulty, next_difficulty)
+    new_repetitions = np.where(lapse, 0, np.where(first, 1, reps + 1))
+    lapses_increment = lapse.astype(np.int64)
+    new_interval, interval_tie = interval_from_stability(new_stability, desired_retention)
+    new_interval = np.where(lapse & ~first, 1, new_interval)
+    interval_tie &= ~(lapse & ~first)
+
+    new_ef = np.clip(ef + (0.1 - (4 - r) * (0.08 + (4 - r) * 0.02)), 1.3, 3.0)
+
+    rounded_stability, stability_tie = _round_decimals(new_stability, 4)
+    rounded_difficulty, difficulty_tie = _round_decimals(new_difficulty, 4)
+    rounded_ef, ef_tie = _round_decimals(new_ef, 3)
+
+    result = FSRSBatchResult(
+        interval_days=new_interval.astype(np.int64),
+        repetitions=new_repetitions.astype(np.int64),
+        stability=rounded_stability,
+        difficulty=rounded_difficulty,
+        ease_factor=rounded_ef,
+        lapses_increment=lapses_increment,
+    )
+
+    # Quase-empates: recalcula no escalar para garantir paridade bit a bit.
+    for index in np.flatnonzero(interval_tie | stability_tie | difficulty_tie | ef_tie):
+        scalar = apply_fsrs(
+            RATING_NAMES[int(r[index])],
+            int(interval[index]),
+            int(reps[index]),
+            float(ef[index]),
+            stability=float(s[index]),
+            difficulty=float(d[index]),
+            weights=w,
+            desired_retention=desired_retention,
+        )
+        result.interval_days[index] = scalar.interval_days
+        result.repetitions[index] = scalar.repetitions
+        result.stability[index] = scalar.stability
+        result.difficulty[index] = scalar.difficulty
+        result.ease_factor[index] = scalar.ease_factor
+    return result
+
+
+def replay_fsrs_batch(
+    ratings: ArrayLike,
+    *,
+    weights: Sequence[float] | None = None,
+    desired_retention: float = DEFAULT_RETENTION,
+) -> tuple[FSRSBatchResult, NDArray]:
+    """Reproduz o histórico de vários cards a partir do estado inicial.
+
+    ``ratings`` é uma matriz (cards × revisões) em 1..4, completada com 0 após a última
+    revisão de cada card. Retorna o estado final (``lapses_increment`` = total de lapsos)
+    e o número de revisões de cada card. Serve para reagendar cards quando os pesos mudam.
+    """
+    _require_numpy()
+    matrix = np.atleast_2d(np.asarray(ratings, dtype=np.int64))
+    cards = matrix.shape[0]
+    state = FSRSBatchResult(
+        interval_days=np.full(cards, INITIAL_INTERVAL, dtype=np.int64),
+        repetitions=np.zeros(cards, dtype=np.int64),
+        stability=np.full(cards, INITIAL_STABILITY),
+        difficulty=np.full(cards, INITIAL_DIFFICULTY),
+        ease_factor=np.full(cards, INITIAL_EF),
+        lapses_increment=np.zeros(cards, dtype=np.int64),
+    )
+    for column in matrix.T:
+        active = column > 0
+        if not active.any():
+            break
+        step = apply_fsrs_batch(
+            np.where(active, column, 3),
+            state.interval_days,
+            state.repetitions,
+            state.ease_factor,
+            state.stability,
+            state.difficulty,
+            weights=weights,
+            desired_retention=desired_retention,
+        )
+        state.interval_days = np.where(active, step.interval_days, state.interval_days)
+        state.repetitions = np.where(active, step.repetitions, state.repetitions)
+        state.stability = np.where(active, step.stability, state.stability)
+        state.difficulty = np.where(active, step.difficulty, state.difficulty)
+        state.ease_factor = np.where(active, step.ease_factor, state.ease_factor)
+        state.lapses_increment = state.lapses_increment + np.where(active, step.lapses_increment, 0)
+    return state, (matrix > 0).sum(axis=1)
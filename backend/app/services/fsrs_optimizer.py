@@ -0,0 +1,287 @@
+"""Ajuste dos pesos FSRS de um usuário ao seu histórico de revisões.
+
+Cada revisão (exceto a primeira de cada card) é uma previsão: antes dela o modelo estima a
+retrievability ``R = (1 + FACTOR * dias_decorridos / S) ** DECAY`` e o rótulo é "lembrou"
+(rating > again). Minimiza-se o log-loss médio dessas previsões.
+
+As revisões mais recentes de cada usuário (``holdout_fraction``) ficam fora do ajuste: os pesos
+são ajustados nas anteriores e comparados com o ``W`` padrão só nas reservadas, então
+"melhorou" significa prever melhor revisões que o ajuste não viu.
+
+Tudo é vetorizado em NumPy: os cards viram uma matriz (cards × revisões) e o replay roda
+para vários vetores de pesos de uma vez, de modo que o gradiente por diferenças centrais
+(2 × 18 perturbações + o ponto atual) sai de um único passe. O otimizador é Adam em
+unidades relativas à escala de cada peso, com limites por peso.
+
+O replay segue ``apply_fsrs``, que é quem agenda com esses pesos: a atualização da
+estabilidade usa o intervalo agendado na revisão anterior (1 dia após um lapso), não o tempo
+decorrido, e por isso depende da retenção desejada. Só a previsão avaliada no log-loss usa o
+tempo realmente decorrido, porque o rótulo (lembrou ou não) aconteceu nesse tempo. S e D não
+são arredondados como na tabela.
+
+NumPy é opcional: ``pip install .[fsrs]``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from itertools import groupby
+from typing import TYPE_CHECKING
+
+from app.services.fsrs import DECAY, DEFAULT_RETENTION, FACTOR, W
+from app.services.fsrs_batch import _require_numpy
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do extra instalado
+    np = None
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# Limites de cada peso durante o ajuste (w11–w14 não são usados por apply_fsrs).
+WEIGHT_BOUNDS: tuple[tuple[float, float], ...] = (
+    (0.01, 100.0),  # w0..w3: estabilidade inicial por rating
+    (0.01, 100.0),
+    (0.01, 100.0),
+    (0.01, 100.0),
+    (1.0, 10.0),  # w4: dificuldade inicial
+    (0.01, 5.0),  # w5
+    (0.01, 5.0),  # w6
+    (0.0, 0.5),  # w7: reversão à média da dificuldade
+    (0.0, 6.0),  # w8
+    (0.0, 0.8),  # w9
+    (0.01, 5.0),  # w10
+    (W[11], W[11]),
+    (W[12], W[12]),
+    (W[13], W[13]),
+    (W[14], W[14]),
+    (0.01, 1.0),  # w15: penalidade do hard
+    (1.0, 6.0),  # w16: bônus do easy
+    (0.0, 1.0),  # w17
+)
+_MAX_STABILITY = 36_500.0
+_PROBABILITY_EPS = 1e-6
+DEFAULT_HOLDOUT_FRACTION = 0.2
+
+
+@dataclass(slots=True)
+class ReviewHistory:
+    """Revisões de um usuário: matrizes (cards × revisões), completadas com rating 0."""
+
+    ratings: NDArray
+    elapsed_days: NDArray  # dias desde a revisão anterior do mesmo card (0 na primeira)
+    holdout: NDArray  # True nas previsões reservadas para a avaliação
+
+    @property
+    def prediction_mask(self) -> NDArray:
+        """Revisões que são previsões: todas menos a primeira de cada card."""
+        mask = self.ratings > 0
+        mask[:, 0] = False
+        return mask
+
+    @property
+    def train_mask(self) -> NDArray:
+        return self.prediction_mask & ~self.holdout
+
+    @property
+    def predictions(self) -> int:
+        return int(self.prediction_mask.sum())
+
+
+@dataclass(slots=True)
+class FitResult:
+    """``log_loss``/``default_log_loss``: pesos ajustados e ``W`` nas revisões reservadas."""
+
+    weights: list[float]
+    log_loss: float
+    default_log_loss: float
+    review_count: int
+
+    @property
+    def improved(self) -> bool:
+        return self.log_loss < self.default_log_loss
+
+
+def build_history(rows: Iterable[tuple[str, int, float]], *, holdout_fraction: float = 0.0) -> ReviewHistory:
+    """``rows`` = (flashcard_id, rating 1..4, momento em dias), ordenadas por card e momento.
+
+    ``holdout_fraction`` das previsões, as mais recentes no tempo (em todos os cards), vão
+    para ``holdout``.
+    """
+    _require_numpy()
+    cards = [[(rating, moment) for _, rating, moment in logs] for _, logs in groupby(rows, key=lambda row: row[0])]
+    width = max((len(logs) for logs in cards), default=0)
+    ratings = np.zeros((len(cards), width), dtype=np.int64)
+    elapsed = np.zeros((len(cards), width), dtype=np.float64)
+    moments = np.zeros((len(cards), width), dtype=np.float64)
+    for index, logs in enumerate(cards):
+        ratings[index, : len(logs)] = [rating for rating, _ in logs]
+        moments[index, : len(logs)] = [moment for _, moment in logs]
+        elapsed[index, 1 : len(logs)] = np.diff(moments[index, : len(logs)])
+
+    history = ReviewHistory(ratings=ratings, elapsed_days=elapsed, holdout=np.zeros(ratings.shape, dtype=bool))
+    predictions = history.prediction_mask
+    held = int(round(predictions.sum() * holdout_fraction))
+    if held > 0:
+        # Ordena as previsões pelo momento e reserva as ``held`` últimas.
+        rows_idx, cols_idx = np.nonzero(predictions)
+        latest = np.argsort(moments[rows_idx, cols_idx], kind="stable")[-held:]
+        history.holdout[rows_idx[latest], cols_idx[latest]] = True
+    return history
+
+
+def batch_log_loss(
+    weights: NDArray,
+    history: ReviewHistory,
+    mask: NDArray | None = None,
+    *,
+    desired_retention: float = DEFAULT_RETENTION,
+) -> NDArray:
+    """Log-loss médio para cada linha de ``weights`` (P × 18) sobre o mesmo histórico.
+
+    ``mask`` escolhe quais previsões entram na média (padrão: todas). O replay sempre percorre
+    todas as revisões, porque o estado de cada card depende das anteriores.
+    """
+    _require_numpy()
+    mask = history.prediction_mask if mask is None else mask
+    w = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    sets, cards = w.shape[0], history.ratings.shape[0]
+    column = lambda k: w[:, k : k + 1]  # noqa: E731 - (P, 1), broadcast sobre os cards
+
+    stability = np.zeros((sets, cards))
+    difficulty = np.full((sets, cards), 5.0)
+    repetitions = np.zeros((sets, cards), dtype=np.int64)
+    interval = np.zeros((sets, cards))  # agendado na revisão anterior, como current_interval
+    interval_factor = (desired_retention ** (1.0 / DECAY) - 1.0) / FACTOR
+    loss = np.zeros(sets)
+
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for step in range(history.ratings.shape[1]):
+            rating = history.ratings[:, step]
+            active = rating > 0
+            if not active.any():
+                break
+            elapsed = history.elapsed_days[:, step]
+
+            if step > 0:
+                retrievability = (1.0 + FACTOR * elapsed / np.maximum(stability, 0.01)) ** DECAY
+                retrievability = np.clip(retrievability, _PROBABILITY_EPS, 1.0 - _PROBABILITY_EPS)
+                recalled = rating > 1
+                log_likelihood = np.where(recalled, np.log(retrievability), np.log(1.0 - retrievability))
+                loss -= np.where(mask[:, step], log_likelihood, 0.0).sum(axis=1)
+
+            r = np.where(active, rating, 3)
+            grade = r - 3
+            first = (stability < 0.1) | (repetitions == 0)
+            lapse = r == 1
+
+            first_stability = np.take_along_axis(w[:, :4], np.broadcast_to(r - 1, (sets, cards)), axis=1)
+            first_difficulty = np.clip(column(4) - grade * column(5), 1.0, 10.0)
+            next_difficulty = difficulty + (-column(6) * grade) * ((10.0 - difficulty) / 9.0)
+            next_difficulty = np.clip(column(7) * 5.0 + (1.0 - column(7)) * next_difficulty, 1.0, 10.0)
+            safe_s = np.where(first, 1.0, stability)
+            retrievability = (1.0 + FACTOR * np.maximum(interval, 1.0) / safe_s) ** DECAY
+            lapse_stability = safe_s * np.exp(column(17) * (grade + column(16)))
+            recall_stability = safe_s * (
+                np.exp(column(8))
+                * (11.0 - next_difficulty)
+                * safe_s ** (-column(9))
+                * (np.exp(column(10) * (1.0 - retrievability)) - 1.0)
+                * np.where(r == 2, column(15), 1.0)
+                * np.where(r == 4, column(16), 1.0)
+            )
+            new_stability = np.where(first, first_stability, np.where(lapse, lapse_stability, recall_stability))
+            new_stability = np.clip(np.nan_to_num(new_stability, nan=0.01, posinf=_MAX_STABILITY), 0.01, _MAX_STABILITY)
+
+            new_interval = np.where(~first & lapse, 1.0, np.maximum(1.0, np.round(new_stability * interval_factor)))
+
+            stability = np.where(active, new_stability, stability)
+            interval = np.where(active, new_interval, interval)
+            difficulty = np.where(active, np.where(first, first_difficulty, next_difficulty), difficulty)
+            repetitions = np.where(active, np.where(lapse, 0, np.where(first, 1, repetitions + 1)), repetitions)
+
+    return loss / max(int(mask.sum()), 1)
+
+
+def _project(weights: NDArray, lower: NDArray, upper: NDArray) -> NDArray:
+    projected = np.clip(weights, lower, upper)
+    projected[:4] = np.sort(projected[:4])  # again <= hard <= good <= easy
+    return projected
+
+
+def fit_weights(
+    history: ReviewHistory,
+    *,
+    initial: Sequence[float] | None = None,
+    iterations: int = 150,
+    learning_rate: float = 0.03,
+    desired_retention: float = DEFAULT_RETENTION,
+) -> FitResult:
+    """Adam sobre o log-loss das previsões de treino, gradiente por diferenças centrais em lote.
+
+    O resultado compara os melhores pesos com ``W`` nas previsões de ``history.holdout`` (ou no
+    próprio treino, se não houver reserva).
+    """
+    _require_numpy()
+    lower = np.array([bound[0] for bound in WEIGHT_BOUNDS])
+    upper = np.array([bound[1] for bound in WEIGHT_BOUNDS])
+    defaults = np.array(W, dtype=np.float64)
+    scale = np.maximum(np.abs(defaults), 0.1)
+    free = lower < upper
+    size = len(W)
+
+    theta = _project(np.array(initial if initial is not None else W, dtype=np.float64), lower, upper)
+    loss = lambda weights, mask: batch_log_loss(  # noqa: E731
+        weights, history, mask, desired_retention=desired_retention
+    )
+    train = history.train_mask
+    evaluation = history.holdout if history.holdout.any() else train
+    best_theta, best_loss = defaults.copy(), float(loss(defaults, train)[0])
+
+    first_moment = np.zeros(size)
+    second_moment = np.zeros(size)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    offsets = np.diag(scale * 1e-3)
+    for iteration in range(1, iterations + 1):
+        candidates = np.vstack([theta, theta + offsets, theta - offsets])
+        losses = loss(candidates, train)
+        if losses[0] < best_loss:
+            best_theta, best_loss = theta.copy(), float(losses[0])
+
+        # Gradiente em unidades relativas (peso / escala), para passos comparáveis entre pesos.
+        gradient = (losses[1 : size + 1] - losses[size + 1 :]) / 2e-3
+        gradient = np.where(free & np.isfinite(gradient), gradient, 0.0)
+        first_moment = beta1 * first_moment + (1 - beta1) * gradient
+        second_moment = beta2 * second_moment + (1 - beta2) * gradient**2
+        step = learning_rate * (first_moment / (1 - beta1**iteration)) / (
+            np.sqrt(second_moment / (1 - beta2**iteration)) + eps
+        )
+        theta = _project(theta - step * scale, lower, upper)
+
+    final_loss = float(loss(theta, train)[0])
+    if final_loss < best_loss:
+        best_theta = theta
+    evaluated = loss(np.vstack([best_theta, defaults]), evaluation)
+    return FitResult(
+        weights=[float(value) for value in best_theta],
+        log_loss=float(evaluated[0]),
+        default_log_loss=float(evaluated[1]),
+        review_count=history.predictions,
+    )
+
+
+def fit_user(
+    user_id: str,
+    rows: list[tuple[str, int, float]],
+    iterations: int,
+    min_reviews: int,
+    holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+    desired_retention: float = DEFAULT_RETENTION,
+) -> tuple[str, FitResult | None]:
+    """Ponto de entrada dos processos de trabalho. None = histórico curto demais."""
+    history = build_history(rows, holdout_fraction=holdout_fraction)
+    if history.predictions < min_reviews or not history.holdout.any():
+        return user_id, None
+    return user_id, fit_weights(history, iterations=iterations, desired_retention=desired_retention)
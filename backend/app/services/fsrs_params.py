@@ -0,0 +1,42 @@
+"""Pesos FSRS de cada usuário (tabela ``user_fsrs_params``) para ``apply_fsrs``.
+
+Sem linha na tabela, vale o ``W`` global. As linhas são gravadas offline pelo
+``app.cli.optimize_fsrs_weights``; cada worker as enxerga quando o TTL do cache expira.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.models import UserFSRSParams
+from app.services.fsrs import W
+
+# Tupla vazia = usuário sem pesos próprios (o cache não distingue None de ausência).
+_weights_cache: LRUCache[str, tuple[float, ...]] = LRUCache(
+    "fsrs_weights",
+    settings.fsrs_weights_cache_max_entries,
+    ttl_seconds=settings.fsrs_weights_cache_ttl_seconds,
+)
+
+
+def invalidate_user_weights(user_id: str | None = None) -> None:
+    if user_id is None:
+        _weights_cache.clear()
+    else:
+        _weights_cache.delete(user_id)
+
+
+async def load_user_weights(db: AsyncSession, user_id: str) -> list[float] | None:
+    """Pesos ajustados do usuário, ou None para usar os padrões."""
+    cached = _weights_cache.get(user_id) if settings.fsrs_weights_cache_ttl_seconds > 0 else None
+    if cached is None:
+        stored = (
+            await db.execute(select(UserFSRSParams.weights).where(UserFSRSParams.user_id == user_id))
+        ).scalar_one_or_none()
+        cached = tuple(stored) if stored and len(stored) == len(W) else ()
+        if settings.fsrs_weights_cache_ttl_seconds > 0:
+            _weights_cache.set(user_id, cached)
+    return list(cached) or None
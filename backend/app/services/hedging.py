@@ -0,0 +1,32 @@
+"""Orçamento de requisições hedged (duplicadas) entre providers.
+
+Cada requisição elegível deposita ``ratio`` tokens; cada hedge consome 1. Assim a
+proporção de chamadas duplicadas fica limitada a ``ratio`` no longo prazo, com uma
+pequena rajada (``burst``) permitida — um provider lento não dobra o custo.
+"""
+
+from threading import Lock
+
+
+class HedgeBudget:
+    def __init__(self, ratio: float, burst: float) -> None:
+        self.ratio = max(ratio, 0.0)
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._lock = Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
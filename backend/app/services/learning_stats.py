@@ -0,0 +1,147 @@
+"""Estatísticas de revisão por usuário (tabela ``user_learning_stats``).
+
+``record_review``/``record_reviews`` rodam na mesma transação dos ReviewLogs: por dia, um
+upsert na linha do usuário (totais, streak, último dia) e outros no rollup diário e nos
+totais de atividade. Assim /stats/overview e /reviews/stats leem uma linha e alguns dias,
+não o histórico inteiro.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import DateTime, case, delete, func, literal, select, true
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.functions import day_number
+from app.db.models import DailyActivityRollup, UserLearningStats
+from app.services.activity_rollup import GOOD_RATINGS, lock_activity_rebuild, lock_activity_writes, record_activity
+
+
+def _upsert_insert(db: AsyncSession):
+    return postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+async def _record_day(
+    db: AsyncSession, user_id: str, day: date, total: int, good: int, last_at: datetime, now: datetime
+) -> None:
+    # Lock antes da primeira linha tocada: o rebuild pega o exclusivo e depois as mesmas linhas.
+    await lock_activity_writes(db)
+    table = UserLearningStats.__table__
+    stmt = _upsert_insert(db)(table).values(
+        user_id=user_id,
+        total_reviews=total,
+        good_reviews=good,
+        current_streak=1,
+        last_review_date=day,
+        updated_at=now,
+    )
+    last = table.c.last_review_date
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "total_reviews": table.c.total_reviews + total,
+            "good_reviews": table.c.good_reviews + good,
+            "current_streak": case(
+                # Mesmo dia, ou revisão anterior à última (lote offline atrasado): streak inalterado.
+                (last >= day, table.c.current_streak),
+                (last == day - timedelta(days=1), table.c.current_streak + 1),
+                else_=1,
+            ),
+            "last_review_date": case((last > day, last), else_=day),
+            "updated_at": now,
+        },
+    )
+    await db.execute(stmt)
+    await record_activity(db, user_id, at=last_at, reviews=total, good_reviews=good)
+
+
+async def record_reviews(db: AsyncSession, user_id: str, reviews: Iterable[tuple[str, datetime]]) -> None:
+    """Contabiliza várias revisões (rating, momento): upserts por dia (UTC) distinto. Não faz commit."""
+    per_day: dict[date, list] = {}
+    for rating, reviewed_at in reviews:
+        counters = per_day.setdefault(reviewed_at.astimezone(UTC).date(), [0, 0, reviewed_at])
+        counters[0] += 1
+        counters[1] += 1 if rating in GOOD_RATINGS else 0
+        counters[2] = max(counters[2], reviewed_at)
+
+    now = datetime.now(UTC)
+    # Em ordem cronológica para o streak avançar dia a dia.
+    for day in sorted(per_day):
+        total, good, last_at = per_day[day]
+        await _record_day(db, user_id, day, total, good, last_at, now)
+
+
+async def record_review(db: AsyncSession, user_id: str, rating: str, *, at: datetime | None = None) -> None:
+    """Contabiliza uma revisão no dia (UTC) de ``at``. Não faz commit."""
+    await record_reviews(db, user_id, [(rating, at or datetime.now(UTC))])
+
+
+def current_streak(stats: UserLearningStats | None, today: date) -> int:
+    """Streak exibido: só conta se a sequência chega até hoje."""
+    if stats is None or stats.last_review_date != today:
+        return 0
+    return stats.current_streak
+
+
+async def rebuild_learning_stats(db: AsyncSession) -> int:
+    """Recalcula as linhas a partir do rollup diário (que deve estar completo) e faz commit.
+
+    Tudo em SQL: um INSERT ... SELECT ... ON CONFLICT DO UPDATE por usuário com revisões, e um
+    DELETE para quem não tem mais nenhuma. Sob o lock exclusivo de
+    ``activity_rollup.lock_activity_rebuild``: revisões ao vivo esperam o commit em vez de serem
+    sobrescritas por ``excluded.*`` calculado de um snapshot anterior a elas. O streak é o
+    tamanho da última sequência de dias consecutivos (dia - row_number() é constante dentro de
+    cada sequência).
+    """
+    await lock_activity_rebuild(db)
+    rollup = DailyActivityRollup
+    numbered = (
+        select(
+            rollup.user_id,
+            rollup.day,
+            rollup.reviews,
+            rollup.good_reviews,
+            (day_number(rollup.day) - func.row_number().over(partition_by=rollup.user_id, order_by=rollup.day)).label(
+                "island"
+            ),
+        )
+        .where(rollup.reviews > 0)
+        .subquery()
+    )
+    islands = select(
+        numbered,
+        func.max(numbered.c.island).over(partition_by=numbered.c.user_id).label("last_island"),
+    ).subquery()
+    source = (
+        select(
+            islands.c.user_id,
+            func.sum(islands.c.reviews),
+            func.sum(islands.c.good_reviews),
+            func.sum(case((islands.c.island == islands.c.last_island, 1), else_=0)),
+            func.max(islands.c.day),
+            literal(datetime.now(UTC), DateTime(timezone=True)),
+        )
+        # WHERE explícito: no SQLite, INSERT ... SELECT ... ON CONFLICT é ambíguo sem ele.
+        .where(true())
+        .group_by(islands.c.user_id)
+    )
+
+    table = UserLearningStats.__table__
+    columns = ["user_id", "total_reviews", "good_reviews", "current_streak", "last_review_date", "updated_at"]
+    stmt = _upsert_insert(db)(table).from_select(columns, source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={name: stmt.excluded[name] for name in columns[1:]},
+    )
+    await db.execute(stmt)
+    await db.execute(
+        delete(UserLearningStats).where(
+            UserLearningStats.user_id.not_in(select(rollup.user_id).where(rollup.reviews > 0))
+        )
+    )
+    await db.commit()
+    return await db.scalar(select(func.count()).select_from(UserLearningStats))
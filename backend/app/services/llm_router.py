@@ -1,15 +1,23 @@
-﻿from collections.abc import AsyncGenerator
+﻿import asyncio
+import time
+from collections.abc import AsyncGenerator
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import metrics
 from app.providers.base import BaseLLMProvider
 from app.providers.gemini_provider import GeminiProvider
 from app.providers.ollama_provider import OllamaProvider
-from app.services.errors import ProviderError
+from app.services.circuit_breaker import CLOSED, BreakerSnapshot, CircuitBreakerRegistry
+from app.services.admission import AdmissionQueue
+from app.services.errors import ProviderError, ProviderOverloadedError
+from app.services.hedging import HedgeBudget
 from app.services.llm_types import ChatResult, CorrectionResult, ReadingActivity, SentenceAnalysis
 
 logger = get_logger(__name__)
 
+HEDGED_METHODS = frozenset({"correct_input", "analyze_sentence"})
+
 
 class LLMRouter:
     def __init__(self, providers: dict[str, BaseLLMProvider] | None = None) -> None:
@@ -21,6 +29,21 @@ class LLMRouter:
             }
             if settings.enable_ollama:
                 self.providers["ollama"] = OllamaProvider()
+        self.breakers = CircuitBreakerRegistry()
+        self.hedge_budget = HedgeBudget(settings.llm_hedge_max_ratio, settings.llm_hedge_burst)
+        self.admission: dict[str, AdmissionQueue] = {}
+
+    async def startup(self) -> None:
+        """Abre os pools HTTP de vida longa de cada provider (chamado no lifespan da app)."""
+        for provider in self.providers.values():
+            await provider.startup()
+
+    async def aclose(self) -> None:
+        for provider in self.providers.values():
+            try:
+                await provider.aclose()
+            except Exception:
+                logger.exception("Failed to close provider %s", provider.name)
 
     def available_provider_names(self) -> list[str]:
         names = []
@@ -29,7 +52,22 @@ class LLMRouter:
                 names.append(name)
         return names
 
-    def _provider_order(self, provider_override: str | None, user_preference: str | None) -> list[str]:
+    def _admission_for(self, provider_name: str) -> AdmissionQueue:
+        queue = self.admission.get(provider_name)
+        if queue is None:
+            queue = AdmissionQueue.for_provider(provider_name)
+            self.admission[provider_name] = queue
+        return queue
+
+    def circuit_breaker_status(self) -> list[BreakerSnapshot]:
+        return self.breakers.snapshots()
+
+    def _provider_order(
+        self,
+        provider_override: str | None,
+        user_preference: str | None,
+        method_name: str | None = None,
+    ) -> list[str]:
         candidates: list[str] = []
 
         if provider_override and provider_override in self.providers:
@@ -46,7 +84,11 @@ class LLMRouter:
             if name not in candidates:
                 candidates.append(name)
 
-        return candidates
+        if method_name is None:
+            return candidates
+
+        # Pula providers com circuito aberto (todos abertos = lista vazia, falha sem chamar ninguém).
+        return [name for name in candidates if self.breakers.get(name, method_name).is_available()]
 
     async def _execute_with_fallback(self, method_name: str, order: list[str], *args, **kwargs):
         errors: list[str] = []
@@ -63,13 +105,33 @@ class LLMRouter:
                 errors.append(f"{provider_name}: unavailable")
                 continue
 
-            max_attempts = 2 if index == 0 else 1
+            breaker = self.breakers.get(provider_name, method_name)
+            # Só repete no primeiro provider quando o circuito está saudável (fechado).
+            max_attempts = 2 if index == 0 and breaker.state == CLOSED else 1
+            admission = self._admission_for(provider_name)
             for attempt in range(max_attempts):
+                if not breaker.is_available():
+                    errors.append(f"{provider_name}: circuit {breaker.state}")
+                    break
+                try:
+                    await admission.acquire()
+                except ProviderOverloadedError as exc:
+                    # Fila cheia ou prazo expirado: transborda para o próximo provider.
+                    errors.append(f"{provider_name}: {fmt_exc(exc)}")
+                    logger.warning("Provider %s shed %s: %s", provider_name, method_name, exc)
+                    break
+                if not breaker.allow_request():
+                    admission.release()
+                    errors.append(f"{provider_name}: circuit {breaker.state}")
+                    break
+                started = time.perf_counter()
                 try:
                     method = getattr(provider, method_name)
                     result, model = await method(*args, **kwargs)
+                    breaker.record_success(time.perf_counter() - started)
                     return result, provider_name, model
                 except ProviderError as exc:
+                    breaker.record_failure(time.perf_counter() - started)
                     errors.append(f"{provider_name} attempt {attempt + 1}: {fmt_exc(exc)}")
                     logger.warning(
                         "Provider %s failed on %s attempt %s: %s",
@@ -79,6 +141,7 @@ class LLMRouter:
                         exc,
                     )
                 except Exception as exc:
+                    breaker.record_failure(time.perf_counter() - started)
                     errors.append(f"{provider_name} attempt {attempt + 1}: {fmt_exc(exc)}")
                     logger.exception(
                         "Unexpected provider error provider=%s method=%s attempt=%s",
@@ -86,10 +149,67 @@ class LLMRouter:
                         method_name,
                         attempt + 1,
                     )
+                finally:
+                    admission.release()
 
-        details = " | ".join(errors) if errors else "no provider attempted"
+        details = " | ".join(errors) if errors else "every provider circuit is open"
         raise ProviderError(f"all providers failed for {method_name}: {details}")
 
+    def _hedge_delay(self, provider_name: str, method_name: str) -> float:
+        """Tempo de espera antes do hedge: percentil móvel de latência do primário."""
+        observed = self.breakers.get(provider_name, method_name).latency_percentile(settings.llm_hedge_percentile)
+        delay = observed if observed is not None else settings.llm_hedge_default_delay_seconds
+        return max(delay, settings.llm_hedge_min_delay_seconds)
+
+    async def _execute_hedged(self, method_name: str, order: list[str], *args, **kwargs):
+        """Como ``_execute_with_fallback``, mas dispara o próximo provider se o primário passar do p90.
+
+        O primeiro resultado bem-sucedido vence e a outra chamada é cancelada.
+        """
+        candidates = [
+            name for name in order if self.providers[name].is_available() or name == "gemini"
+        ]
+        if not settings.llm_hedging_enabled or method_name not in HEDGED_METHODS or len(candidates) < 2:
+            return await self._execute_with_fallback(method_name, order, *args, **kwargs)
+
+        primary, secondary, rest = candidates[0], candidates[1], candidates[2:]
+        self.hedge_budget.deposit()
+        primary_task = asyncio.create_task(self._execute_with_fallback(method_name, [primary], *args, **kwargs))
+        tasks = {primary_task: "primary"}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self._hedge_delay(primary, method_name))
+            if not done:
+                if self.hedge_budget.try_spend():
+                    metrics.incr("llm_hedge_total", method=method_name, provider=secondary)
+                    hedge_task = asyncio.create_task(
+                        self._execute_with_fallback(method_name, [secondary], *args, **kwargs)
+                    )
+                    tasks[hedge_task] = "hedge"
+                else:
+                    metrics.incr("llm_hedge_throttled_total", method=method_name)
+
+            errors: list[str] = []
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        if len(tasks) > 1:
+                            metrics.incr("llm_hedge_won_total", method=method_name, winner=tasks[task])
+                        return task.result()
+                    errors.append(str(exc))
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # Ambos falharam (ou o primário falhou sem hedge): segue a cadeia de fallback normal.
+        remaining = rest if len(tasks) > 1 else [secondary, *rest]
+        if remaining:
+            return await self._execute_with_fallback(method_name, remaining, *args, **kwargs)
+        raise ProviderError(f"all providers failed for {method_name}: {' | '.join(errors)}")
+
     async def correct_input(
         self,
         raw_text: str,
@@ -97,8 +217,8 @@ class LLMRouter:
         provider_override: str | None,
         user_preference: str | None,
     ) -> tuple[CorrectionResult, str, str]:
-        order = self._provider_order(provider_override, user_preference)
-        result, provider_name, model = await self._execute_with_fallback(
+        order = self._provider_order(provider_override, user_preference, "correct_input")
+        result, provider_name, model = await self._execute_hedged(
             "correct_input", order, raw_text, context
         )
         return result, provider_name, model
@@ -111,7 +231,7 @@ class LLMRouter:
         provider_override: str | None,
         user_preference: str | None,
     ) -> tuple[ChatResult, str, str]:
-        order = self._provider_order(provider_override, user_preference)
+        order = self._provider_order(provider_override, user_preference, "generate_reply")
         result, provider_name, model = await self._execute_with_fallback(
             "generate_reply",
             order,
@@ -128,8 +248,8 @@ class LLMRouter:
         provider_override: str | None,
         user_preference: str | None,
     ) -> tuple[SentenceAnalysis, str, str]:
-        order = self._provider_order(provider_override, user_preference)
-        result, provider_name, model = await self._execute_with_fallback(
+        order = self._provider_order(provider_override, user_preference, "analyze_sentence")
+        result, provider_name, model = await self._execute_hedged(
             "analyze_sentence", order, sentence_en, context
         )
         return result, provider_name, model
@@ -141,7 +261,7 @@ class LLMRouter:
         provider_override: str | None,
         user_preference: str | None,
     ) -> tuple[ReadingActivity, str, str]:
-        order = self._provider_order(provider_override, user_preference)
+        order = self._provider_order(provider_override, user_preference, "generate_reading_activity")
         result, provider_name, model = await self._execute_with_fallback(
             "generate_reading_activity", order, theme, context
         )
@@ -156,7 +276,7 @@ class LLMRouter:
         user_preference: str | None,
     ) -> AsyncGenerator[str, None]:
         """Gera chunks da resposta via streaming. Usa o primeiro provider disponível que suporta stream."""
-        order = self._provider_order(provider_override, user_preference)
+        order = self._provider_order(provider_override, user_preference, "stream_reply")
         for provider_name in order:
             provider = self.providers[provider_name]
             if not provider.is_available() and provider_name != "gemini":
@@ -172,12 +292,29 @@ class LLMRouter:
                 except ProviderError:
                     continue
 
+            breaker = self.breakers.get(provider_name, "stream_reply")
+            if not breaker.is_available():
+                continue
+            admission = self._admission_for(provider_name)
             try:
-                async for chunk in stream_method(corrected_text, history, context):
-                    yield chunk
-                return
-            except Exception as exc:
-                logger.warning("stream_reply falhou no provider %s: %s", provider_name, exc)
+                await admission.acquire()
+            except ProviderOverloadedError as exc:
+                logger.warning("stream_reply shed no provider %s: %s", provider_name, exc)
                 continue
+            try:
+                if not breaker.allow_request():
+                    continue
+                started = time.perf_counter()
+                try:
+                    async for chunk in stream_method(corrected_text, history, context):
+                        yield chunk
+                    breaker.record_success(time.perf_counter() - started)
+                    return
+                except Exception as exc:
+                    breaker.record_failure(time.perf_counter() - started)
+                    logger.warning("stream_reply falhou no provider %s: %s", provider_name, exc)
+                    continue
+            finally:
+                admission.release()
 
         raise ProviderError("all providers failed for stream_reply")
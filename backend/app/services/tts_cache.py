@@ -0,0 +1,239 @@
+"""Cache de áudio TTS endereçado por conteúdo: LRU em memória → diretório em disco → Edge TTS."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable
+from pathlib import Path
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
+from app.services.edge_tts import (
+    normalize_edge_tts_rate,
+    split_tts_chunks,
+    stream_edge_tts,
+    synthesize_with_edge_tts,
+)
+
+logger = get_logger(__name__)
+
+
+def tts_cache_key(text: str, voice: str, rate: float) -> str:
+    """Chave estável para (texto, voz, taxa normalizada) — também usada como ETag."""
+    material = f"{voice}\n{normalize_edge_tts_rate(rate)}\n{text}".encode("utf-8")
+    return hashlib.sha256(material).hexdigest()
+
+
+class DiskAudioStore:
+    """Arquivos ``<dir>/<2 primeiros hex>/<chave>.mp3`` com despejo do menos acessado (mtime) por tamanho."""
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._total_bytes: int | None = None
+        # Escritas rodam em asyncio.to_thread: o lock protege o total e o rename que ele contabiliza.
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.mp3"
+
+    def _files(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [path for path in self.directory.glob("*/*.mp3") if path.is_file()]
+
+    def _scan_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(path.stat().st_size for path in self._files())
+        return self._total_bytes
+
+    def read(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # marca acesso recente para o despejo
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning("TTS disk cache read failed for %s: %s", key, exc)
+            return None
+        return data
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Temporário único por escrita: workers gravando a mesma chave não se intercalam.
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                with self._lock:
+                    total = self._scan_total()
+                    try:
+                        replaced = path.stat().st_size
+                    except FileNotFoundError:
+                        replaced = 0
+                    os.replace(tmp_name, path)
+                    self._total_bytes = total + len(data) - replaced
+                    if self._total_bytes > self.max_bytes:
+                        self._evict()
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_name)
+                raise
+        except OSError as exc:
+            logger.warning("TTS disk cache write failed for %s: %s", key, exc)
+
+    def _evict(self) -> None:
+        # Chamado com self._lock. Desce até 90% do limite para não varrer o diretório a cada escrita.
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        if removed:
+            metrics.incr("cache_evictions_total", removed, cache="tts_audio_disk")
+
+
+class TTSAudioCache:
+    def __init__(
+        self,
+        *,
+        memory_max_entries: int,
+        memory_max_bytes: int,
+        disk_dir: str | None,
+        disk_max_bytes: int,
+    ) -> None:
+        self._memory: LRUCache[str, bytes] = LRUCache(
+            "tts_audio",
+            memory_max_entries,
+            max_bytes=memory_max_bytes,
+            sizeof=len,
+        )
+        self._disk = DiskAudioStore(disk_dir, disk_max_bytes) if disk_dir else None
+        self._flights: SingleFlight[str, bytes] = SingleFlight("tts_audio")
+
+    @classmethod
+    def from_settings(cls) -> TTSAudioCache:
+        return cls(
+            memory_max_entries=settings.tts_cache_memory_max_entries,
+            memory_max_bytes=settings.tts_cache_memory_max_bytes,
+            disk_dir=settings.tts_cache_dir or None,
+            disk_max_bytes=settings.tts_cache_disk_max_bytes,
+        )
+
+    def get_memory(self, key: str) -> bytes | None:
+        return self._memory.get(key)
+
+    async def get(self, key: str) -> bytes | None:
+        audio = self._memory.get(key)
+        if audio is not None:
+            return audio
+        if self._disk is None:
+            return None
+        audio = await asyncio.to_thread(self._disk.read, key)
+        if audio is not None:
+            metrics.incr("cache_hits_total", cache="tts_audio_disk")
+            self._memory.set(key, audio)
+        else:
+            metrics.incr("cache_misses_total", cache="tts_audio_disk")
+        return audio
+
+    async def put(self, key: str, audio: bytes) -> None:
+        self._memory.set(key, audio)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.write, key, audio)
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[bytes]]) -> bytes:
+        audio = await self.get(key)
+        if audio is not None:
+            return audio
+
+        async def produce() -> bytes:
+            audio = await create()
+            if audio:
+                await self.put(key, audio)
+            return audio
+
+        return await self._flights.do(key, produce)
+
+
+tts_audio_cache = TTSAudioCache.from_settings()
+
+
+async def cached_audio(key: str) -> bytes | None:
+    return await tts_audio_cache.get(key)
+
+
+async def _synthesize_chunked(text: str, voice: str, rate: float) -> bytes:
+    """Sintetiza blocos de sentenças em paralelo (fan-out limitado), cada um com sua própria
+    entrada no cache, e concatena os frames MP3 na ordem original."""
+    chunks = split_tts_chunks(text, settings.tts_chunk_target_chars)
+    if len(chunks) <= 1:
+        return await synthesize_with_edge_tts(text=text, voice=voice, rate=rate)
+
+    semaphore = asyncio.Semaphore(max(settings.tts_chunk_concurrency, 1))
+
+    async def synthesize_chunk(chunk: str) -> bytes:
+        key = tts_cache_key(chunk, voice, rate)
+        async with semaphore:
+            return await tts_audio_cache.get_or_create(
+                key, lambda: synthesize_with_edge_tts(text=chunk, voice=voice, rate=rate)
+            )
+
+    parts = await asyncio.gather(*(synthesize_chunk(chunk) for chunk in chunks))
+    metrics.incr("tts_chunked_total")
+    # Edge TTS devolve frames MPEG crus (sem cabeçalho ID3/Xing), então concatenar é seguro.
+    return b"".join(parts)
+
+
+async def synthesize_cached(text: str, voice: str, rate: float) -> tuple[str, bytes]:
+    """Sintetiza (ou reaproveita) o áudio; retorna (chave, bytes).
+
+    Textos acima de ``tts_chunk_threshold_chars`` são divididos em blocos sintetizados em paralelo.
+    """
+    key = tts_cache_key(text, voice, rate)
+
+    async def create() -> bytes:
+        if len(text) > settings.tts_chunk_threshold_chars:
+            return await _synthesize_chunked(text=text, voice=voice, rate=rate)
+        return await synthesize_with_edge_tts(text=text, voice=voice, rate=rate)
+
+    audio = await tts_audio_cache.get_or_create(key, create)
+    return key, audio
+
+
+async def stream_and_cache(key: str, text: str, voice: str, rate: float) -> AsyncIterator[bytes]:
+    """Repassa os blocos do Edge TTS e só grava no cache se a síntese terminar por completo."""
+    chunks: list[bytes] = []
+    async for chunk in stream_edge_tts(text=text, voice=voice, rate=rate):
+        chunks.append(chunk)
+        yield chunk
+    audio = b"".join(chunks)
+    if audio:
+        await tts_audio_cache.put(key, audio)
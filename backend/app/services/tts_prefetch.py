@@ -0,0 +1,138 @@
+"""Pré-síntese de TTS em segundo plano para o áudio já estar no cache quando o aluno tocar "ouvir".
+
+Fila limitada + poucos workers: é trabalho oportunista, então quando a fila enche o pedido é
+descartado e os workers cedem a vez enquanto houver sínteses interativas em andamento.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.models import User
+from app.services.edge_tts import resolve_edge_tts_voice
+from app.services.tts_cache import cached_audio, synthesize_cached, tts_cache_key
+
+logger = get_logger(__name__)
+
+_IDLE_POLL_SECONDS = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class PrefetchJob:
+    key: str
+    text: str
+    voice: str
+    rate: float
+
+
+class TTSPrefetcher:
+    def __init__(self, *, workers: int, max_queue: int) -> None:
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 1)
+        self._queue: asyncio.Queue[PrefetchJob] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._pending: set[str] = set()
+        self._interactive = 0
+
+    @classmethod
+    def from_settings(cls) -> TTSPrefetcher:
+        return cls(workers=settings.tts_prefetch_workers, max_queue=settings.tts_prefetch_max_queue)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Marca uma síntese pedida pelo usuário; os workers esperam enquanto houver alguma."""
+        self._interactive += 1
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+
+    def _ensure_workers(self) -> asyncio.Queue[PrefetchJob]:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or not self._tasks or self._tasks[0].get_loop() is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._pending.clear()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    def schedule(self, text: str, voice: str, rate: float | None = None) -> bool:
+        """Enfileira sem bloquear. Retorna False se desativado, duplicado ou com a fila cheia."""
+        text = text.strip()
+        if not settings.tts_prefetch_enabled or not text:
+            return False
+        rate = settings.tts_prefetch_rate if rate is None else rate
+        key = tts_cache_key(text, voice, rate)
+        if key in self._pending:
+            return False
+        queue = self._ensure_workers()
+        try:
+            queue.put_nowait(PrefetchJob(key=key, text=text, voice=voice, rate=rate))
+        except asyncio.QueueFull:
+            metrics.incr("tts_prefetch_total", outcome="dropped")
+            return False
+        self._pending.add(key)
+        metrics.set_gauge("tts_prefetch_queue_depth", queue.qsize())
+        return True
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                # Baixa prioridade: espera as sínteses interativas terminarem.
+                while self._interactive > 0:
+                    await asyncio.sleep(_IDLE_POLL_SECONDS)
+                await self._run(job)
+            finally:
+                self._pending.discard(job.key)
+                queue.task_done()
+                metrics.set_gauge("tts_prefetch_queue_depth", queue.qsize())
+
+    async def _run(self, job: PrefetchJob) -> None:
+        if await cached_audio(job.key) is not None:
+            metrics.incr("tts_prefetch_total", outcome="cached")
+            return
+        try:
+            await synthesize_cached(text=job.text, voice=job.voice, rate=job.rate)
+        except Exception as exc:
+            metrics.incr("tts_prefetch_total", outcome="error")
+            logger.warning("TTS prefetch failed: %s", exc)
+            return
+        metrics.incr("tts_prefetch_total", outcome="synthesized")
+
+    async def join(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+
+
+tts_prefetcher = TTSPrefetcher.from_settings()
+
+
+def prefetch_speech(user: User, *texts: str | None, rate: float | None = None) -> None:
+    """Agenda a pré-síntese dos textos com a voz do usuário e a taxa que o cliente vai pedir
+    (``rate``; sem ela, ``TTS_PREFETCH_RATE``). No-op se desativado."""
+    if not settings.tts_prefetch_enabled:
+        return
+    voice = resolve_edge_tts_voice(user.edge_tts_voice)
+    for text in texts:
+        if text:
+            tts_prefetcher.schedule(text, voice, rate)
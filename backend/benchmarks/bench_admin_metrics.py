@@ -0,0 +1,106 @@
+"""Mede o tempo de GET /admin/metrics com muitos usuários (banco SQLite descartável).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_admin_metrics --users 50000
+
+Com DATABASE_URL apontando para um Postgres de testes, mede contra ele (as tabelas são recriadas!).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+from datetime import UTC, datetime, timedelta
+from time import perf_counter
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.gettempdir()}/bench_admin_metrics.db")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.v1.admin import get_metrics  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.models import Flashcard, Message, ReadingAttempt, ReviewLog, Session, User  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+from app.services.activity_rollup import rebuild_activity_summary, rebuild_daily_activity  # noqa: E402
+
+BATCH = 5_000
+
+
+async def _bulk(conn, model, rows: list[dict]) -> None:
+    for start in range(0, len(rows), BATCH):
+        await conn.execute(insert(model), rows[start : start + BATCH])
+
+
+async def seed(users: int) -> None:
+    rng = random.Random(42)
+    now = datetime.now(UTC)
+
+    def when(max_days: int = 90) -> datetime:
+        return now - timedelta(seconds=rng.randint(0, max_days * 86_400))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        await _bulk(conn, User, [
+            {"id": f"u{i}", "full_name": f"User {i}", "email": f"user{i}@example.com", "password_hash": "x",
+             "is_active": i % 3 != 0, "created_at": when(365)}
+            for i in range(users)
+        ])
+        sessions = [{"id": f"s{i}", "user_id": f"u{rng.randrange(users)}", "topic": "bench", "created_at": when()}
+                    for i in range(users * 2)]
+        await _bulk(conn, Session, sessions)
+        await _bulk(conn, Message, [
+            {"id": f"m{i}", "session_id": sessions[rng.randrange(len(sessions))]["id"],
+             "role": "user" if i % 2 == 0 else "assistant", "content_final": "hello", "created_at": when()}
+            for i in range(users * 6)
+        ])
+        await _bulk(conn, Flashcard, [
+            {"id": f"f{i}", "user_id": f"u{rng.randrange(users)}", "word": f"word{i}"} for i in range(users)
+        ])
+        await _bulk(conn, ReviewLog, [
+            {"id": f"r{i}", "flashcard_id": f"f{rng.randrange(users)}", "rating": "good", "old_interval": 1,
+             "new_interval": 3, "old_ef": 2.5, "new_ef": 2.5, "reviewed_at": when()}
+            for i in range(users * 2)
+        ])
+        await _bulk(conn, ReadingAttempt, [
+            {"id": f"a{i}", "user_id": f"u{rng.randrange(users)}", "title": "t", "theme": "bench",
+             "total_questions": 5, "correct_answers": 3, "accuracy_rate": 0.6, "completed_at": when()}
+            for i in range(users // 2)
+        ])
+
+    async with AsyncSessionLocal() as db:
+        await rebuild_daily_activity(db)
+        await rebuild_activity_summary(db)
+
+
+async def main_async(users: int, runs: int, skip_seed: bool) -> None:
+    if not skip_seed:
+        started = perf_counter()
+        await seed(users)
+        print(f"seeded {users} users in {perf_counter() - started:.1f}s")
+
+    for run in range(runs):
+        async with AsyncSessionLocal() as db:
+            started = perf_counter()
+            result = await get_metrics(days=30, limit=100, offset=0, sort="last_active", order="desc", db=db)
+            elapsed = perf_counter() - started
+        print(f"run {run + 1}: {elapsed * 1000:.0f} ms ({result.total_users} users, page of {len(result.user_metrics)})")
+    await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the admin metrics endpoint.")
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data from a previous run")
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args.users, args.runs, args.skip_seed))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
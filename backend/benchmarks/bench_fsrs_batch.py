@@ -0,0 +1,76 @@
+"""Vazão do FSRS escalar (apply_fsrs em laço) contra o vetorizado (apply_fsrs_batch).
+
+Uso (a partir de backend/, com ``pip install .[fsrs]``):
+    python -m benchmarks.bench_fsrs_batch --cards 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from app.services.fsrs import apply_fsrs
+from app.services.fsrs_batch import RATING_NAMES, apply_fsrs_batch, replay_fsrs_batch
+
+
+def _random_deck(cards: int, seed: int = 42) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "ratings": rng.integers(1, 5, cards),
+        "current_interval": rng.integers(1, 365, cards),
+        "current_repetitions": rng.integers(0, 20, cards),
+        "current_ef": np.round(rng.uniform(1.3, 3.0, cards), 3),
+        "stability": np.round(rng.lognormal(1.5, 1.5, cards), 4),
+        "difficulty": np.round(rng.uniform(1.0, 10.0, cards), 4),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark vectorized FSRS.")
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=100_000, help="cards timed with apply_fsrs")
+    parser.add_argument("--history", type=int, default=20, help="reviews per card for the replay benchmark")
+    args = parser.parse_args(argv)
+
+    deck = _random_deck(args.cards)
+
+    sample = min(args.scalar_sample, args.cards)
+    columns = {name: values[:sample].tolist() for name, values in deck.items()}
+    started = perf_counter()
+    for index in range(sample):
+        apply_fsrs(
+            RATING_NAMES[columns["ratings"][index]],
+            columns["current_interval"][index],
+            columns["current_repetitions"][index],
+            columns["current_ef"][index],
+            stability=columns["stability"][index],
+            difficulty=columns["difficulty"][index],
+        )
+    scalar = perf_counter() - started
+    print(f"scalar   {sample:>9} cards  {scalar:7.3f}s  {sample / scalar:>12,.0f} cards/s")
+
+    started = perf_counter()
+    apply_fsrs_batch(
+        deck["ratings"],
+        deck["current_interval"],
+        deck["current_repetitions"],
+        deck["current_ef"],
+        deck["stability"],
+        deck["difficulty"],
+    )
+    batch = perf_counter() - started
+    print(f"batch    {args.cards:>9} cards  {batch:7.3f}s  {args.cards / batch:>12,.0f} cards/s")
+
+    ratings = np.random.default_rng(7).integers(1, 5, (args.cards, args.history))
+    started = perf_counter()
+    replay_fsrs_batch(ratings)
+    replay = perf_counter() - started
+    reviews = args.cards * args.history
+    print(f"replay   {args.cards:>9} cards × {args.history} reviews  {replay:7.3f}s  {reviews / replay:>12,.0f} reviews/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+"""Compara o limitador antigo (deque de timestamps por chave) com os motores atuais.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_rate_limiter --keys 100000 --hits 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+from collections import defaultdict, deque
+from collections.abc import Callable
+from threading import Lock
+from time import monotonic, perf_counter
+
+from app.middleware.rate_limit import InMemoryRateLimiter
+
+
+class DequeRateLimiter:
+    """Implementação anterior, mantida aqui apenas como referência de comparação."""
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = Lock()
+
+    def check(self, key: str, limit: int, window_seconds: int) -> bool:
+        now = monotonic()
+        with self._lock:
+            bucket = self._buckets[key]
+            while bucket and now - bucket[0] > window_seconds:
+                bucket.popleft()
+            if len(bucket) >= limit:
+                return False
+            bucket.append(now)
+            return True
+
+
+def _drive(limiter, key_names: list[str], hits: int, limit: int, window_seconds: int) -> None:
+    for _ in range(hits):
+        for key in key_names:
+            limiter.check(key, limit=limit, window_seconds=window_seconds)
+
+
+def run(name: str, factory: Callable[[], object], keys: int, hits: int, limit: int, window_seconds: int) -> None:
+    key_names = [f"10.0.{index // 256}.{index % 256}:/api/v1/chat" for index in range(keys)]
+    started = perf_counter()
+    _drive(factory(), key_names, hits, limit, window_seconds)
+    elapsed = perf_counter() - started
+
+    # Memória retida medida numa segunda instância: tracemalloc distorceria o tempo acima.
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    limiter = factory()
+    _drive(limiter, key_names, hits, limit, window_seconds)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = keys * hits
+    print(
+        f"{name:<16} {total:>10} checks  {elapsed:7.2f}s  {elapsed / total * 1e6:6.2f} µs/check"
+        f"  retained {(retained - baseline) / 1024 / 1024:8.1f} MiB"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark rate limiter engines.")
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--hits", type=int, default=20, help="checks per key")
+    parser.add_argument("--limit", type=int, default=100, help="per-key limit (daily quota scale)")
+    parser.add_argument("--window", type=int, default=86_400)
+    args = parser.parse_args(argv)
+
+    run("deque", DequeRateLimiter, args.keys, args.hits, args.limit, args.window)
+    for algorithm in ("sliding_window", "token_bucket"):
+        run(
+            algorithm,
+            lambda algorithm=algorithm: InMemoryRateLimiter(algorithm, algorithm=algorithm, sweep_interval_seconds=3600),
+            args.keys,
+            args.hits,
+            args.limit,
+            args.window,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
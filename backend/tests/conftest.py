@@ -21,6 +21,9 @@ class FakeLLMRouter:
     def available_provider_names(self) -> list[str]:
         return ["gemini"]
 
+    def circuit_breaker_status(self) -> list:
+        return []
+
 
 
     async def correct_input(self, raw_text: str, context: dict, provider_override: str | None, user_preference: str | None):
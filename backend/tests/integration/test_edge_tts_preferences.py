@@ -1,5 +1,6 @@
 import asyncio
 
+import pytest
 from sqlalchemy import select
 
 from app.db.models import User
@@ -47,4 +48,134 @@ def test_update_profile_persists_edge_tts_voice(client) -> None:
     )
 
     assert response.status_code == 200
-    assert response.json()["edge_tts_voice"] == "en-GB-SoniaNeural"
\ No newline at end of file
+    assert response.json()["edge_tts_voice"] == "en-GB-SoniaNeural"
+
+def test_tts_is_cached_and_revalidated_by_etag(client, monkeypatch, tmp_path) -> None:
+    from app.services import tts_cache
+
+    calls = 0
+
+    async def fake_synthesize(text: str, voice: str, rate: float) -> bytes:
+        nonlocal calls
+        calls += 1
+        return b"ID3-fake-mp3"
+
+    monkeypatch.setattr(tts_cache, "synthesize_with_edge_tts", fake_synthesize)
+    monkeypatch.setattr(
+        tts_cache,
+        "tts_audio_cache",
+        tts_cache.TTSAudioCache(
+            memory_max_entries=8, memory_max_bytes=1024, disk_dir=str(tmp_path), disk_max_bytes=1024
+        ),
+    )
+    headers = _auth_headers(client, email="voice-cache@example.com")
+
+    first = client.post("/api/v1/speech/tts", headers=headers, json={"text": "Hello there", "rate": 1.0})
+    second = client.get("/api/v1/speech/tts", headers=headers, params={"text": "Hello there"})
+    revalidated = client.get(
+        "/api/v1/speech/tts",
+        headers={**headers, "If-None-Match": first.headers["etag"]},
+        params={"text": "Hello there"},
+    )
+
+    assert first.status_code == 200
+    assert first.content == second.content == b"ID3-fake-mp3"
+    assert "immutable" in first.headers["cache-control"]
+    assert second.headers["etag"] == first.headers["etag"]
+    assert revalidated.status_code == 304
+    assert calls == 1
+
+    # Rota autenticada: nenhum cache compartilhado pode guardar o áudio.
+    assert first.headers["cache-control"].startswith("private")
+    assert second.headers["cache-control"].startswith("private")
+
+
+def _isolated_tts_cache(monkeypatch, tmp_path):
+    from app.services import tts_cache
+
+    cache = tts_cache.TTSAudioCache(
+        memory_max_entries=8, memory_max_bytes=1024, disk_dir=str(tmp_path), disk_max_bytes=1024
+    )
+    monkeypatch.setattr(tts_cache, "tts_audio_cache", cache)
+    return tts_cache, cache
+
+
+def test_tts_stream_forwards_chunks_and_caches_complete_audio(client, monkeypatch, tmp_path) -> None:
+    tts_cache, cache = _isolated_tts_cache(monkeypatch, tmp_path)
+
+    async def fake_stream(text: str, voice: str, rate: float):
+        for chunk in (b"ID3", b"-part1", b"-part2"):
+            yield chunk
+
+    monkeypatch.setattr(tts_cache, "stream_edge_tts", fake_stream)
+    headers = _auth_headers(client, email="voice-stream@example.com")
+
+    response = client.post("/api/v1/speech/tts", headers=headers, json={"text": "Stream me", "stream": True})
+
+    assert response.status_code == 200
+    assert response.content == b"ID3-part1-part2"
+    assert cache.get_memory(response.headers["etag"].strip('"')) == b"ID3-part1-part2"
+
+
+def test_tts_stream_failure_is_not_cached(client, monkeypatch, tmp_path) -> None:
+    tts_cache, cache = _isolated_tts_cache(monkeypatch, tmp_path)
+
+    async def failing_stream(text: str, voice: str, rate: float):
+        yield b"ID3"
+        raise RuntimeError("connection reset")
+
+    async def failing_at_start(text: str, voice: str, rate: float):
+        raise RuntimeError("service down")
+        yield b""
+
+    headers = _auth_headers(client, email="voice-stream-fail@example.com")
+
+    monkeypatch.setattr(tts_cache, "stream_edge_tts", failing_at_start)
+    early = client.post("/api/v1/speech/tts", headers=headers, json={"text": "Broken", "stream": True})
+    assert early.status_code == 502
+
+    monkeypatch.setattr(tts_cache, "stream_edge_tts", failing_stream)
+    # O TestClient propaga a exceção que, em produção, faz o servidor abortar a conexão.
+    with pytest.raises(RuntimeError):
+        client.post("/api/v1/speech/tts", headers=headers, json={"text": "Broken", "stream": True})
+    assert len(cache._memory) == 0
+
+
+def test_prefetched_reply_is_served_from_cache_at_ui_rate(client, monkeypatch, tmp_path) -> None:
+    import time
+
+    from app.core.config import settings
+
+    tts_cache, cache = _isolated_tts_cache(monkeypatch, tmp_path)
+    calls: list[float] = []
+
+    async def fake_synthesize(text: str, voice: str, rate: float) -> bytes:
+        calls.append(rate)
+        return b"ID3-prefetched"
+
+    monkeypatch.setattr(tts_cache, "synthesize_with_edge_tts", fake_synthesize)
+    monkeypatch.setattr(settings, "tts_prefetch_enabled", True)
+    headers = _auth_headers(client, email="voice-prefetch@example.com")
+    session_id = client.post(
+        "/api/v1/sessions", headers=headers, json={"topic": "Travel", "persona_prompt": "You are a travel buddy."}
+    ).json()["id"]
+
+    reply = client.post(
+        "/api/v1/chat/send",
+        headers=headers,
+        json={"session_id": session_id, "text_raw": "I think we need to go now", "speech_rate": 0.8},
+    ).json()["assistant_reply"]
+
+    # Mesmos parâmetros que o ChatPanel usa ao tocar o áudio (slider em 0.8x).
+    key = tts_cache.tts_cache_key(reply, "en-US-JennyNeural", 0.8)
+    deadline = time.monotonic() + 5
+    while cache.get_memory(key) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_memory(key) == b"ID3-prefetched"
+
+    played = client.get("/api/v1/speech/tts", headers=headers, params={"text": reply, "rate": 0.8})
+
+    assert played.status_code == 200
+    assert played.content == b"ID3-prefetched"
+    assert played.headers["etag"] == f'"{key}"'
+    assert calls == [0.8]
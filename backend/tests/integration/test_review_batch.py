@@ -0,0 +1,121 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.db.models import ReviewLog, User
+from app.db.session import AsyncSessionLocal
+
+
+async def _activate_user(email: str) -> None:
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one()
+        user.is_active = True
+        await db.commit()
+
+
+async def _review_log_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count(ReviewLog.id)))).scalar_one()
+
+
+def _auth_headers(client, email: str = "offline@example.com", password: str = "secret1234") -> dict:
+    client.post(
+        "/api/v1/auth/register",
+        json={"full_name": "Offline User", "email": email, "password": password},
+    )
+    asyncio.run(_activate_user(email))
+    login_response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+def _create_card(client, headers: dict, word: str) -> str:
+    response = client.post("/api/v1/flashcards", headers=headers, json={"word": word})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_batch_review_applies_in_order_with_client_timestamps(client) -> None:
+    headers = _auth_headers(client)
+    house = _create_card(client, headers, "house")
+    tree = _create_card(client, headers, "tree")
+    now = datetime.now(UTC)
+
+    response = client.post(
+        "/api/v1/reviews/batch",
+        headers=headers,
+        json={
+            "reviews": [
+                {"flashcard_id": house, "rating": "good", "reviewed_at": (now - timedelta(days=2)).isoformat()},
+                {"flashcard_id": tree, "rating": "again", "reviewed_at": (now - timedelta(days=1)).isoformat()},
+                {"flashcard_id": house, "rating": "good", "reviewed_at": (now - timedelta(minutes=1)).isoformat()},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(item["flashcard_id"], item["rating"]) for item in results] == [
+        (house, "good"),
+        (tree, "again"),
+        (house, "good"),
+    ]
+    # Segunda revisão de "house" parte do estado deixado pela primeira.
+    assert (results[0]["repetitions"], results[2]["repetitions"]) == (1, 2)
+    # next_review é contado a partir do horário informado pelo cliente.
+    tree_next = datetime.fromisoformat(results[1]["next_review"])
+    assert tree_next - (now - timedelta(days=1)) < timedelta(days=1, minutes=1)
+    assert asyncio.run(_review_log_count()) == 3
+
+    overview = client.get("/api/v1/stats/overview", headers=headers).json()
+    assert (overview["streak_days"], overview["reviews_today"]) == (3, 1)
+    assert client.get("/api/v1/reviews/stats", headers=headers).json()["reviews_today"] == 1
+
+
+def test_batch_review_is_all_or_nothing(client) -> None:
+    headers = _auth_headers(client, email="offline-missing@example.com")
+    house = _create_card(client, headers, "house")
+    now = datetime.now(UTC).isoformat()
+
+    response = client.post(
+        "/api/v1/reviews/batch",
+        headers=headers,
+        json={
+            "reviews": [
+                {"flashcard_id": house, "rating": "good", "reviewed_at": now},
+                {"flashcard_id": "missing-card", "rating": "good", "reviewed_at": now},
+            ]
+        },
+    )
+
+    assert response.status_code == 404
+    assert "missing-card" in response.json()["detail"]
+    assert asyncio.run(_review_log_count()) == 0
+
+
+def test_live_reviews_use_configured_retention(client, monkeypatch) -> None:
+    from app.core.config import settings
+    from app.services.fsrs import apply_fsrs
+
+    monkeypatch.setattr(settings, "fsrs_desired_retention", 0.7)
+    headers = _auth_headers(client, email="offline-retention@example.com")
+    house = _create_card(client, headers, "house")
+
+    first = client.post("/api/v1/reviews", headers=headers, json={"flashcard_id": house, "rating": "good"}).json()
+    batch = client.post(
+        "/api/v1/reviews/batch",
+        headers=headers,
+        json={"reviews": [{"flashcard_id": house, "rating": "good", "reviewed_at": datetime.now(UTC).isoformat()}]},
+    ).json()["results"][0]
+
+    step = apply_fsrs("good", 1, 0, 2.5, desired_retention=0.7)
+    expected = apply_fsrs(
+        "good", step.interval_days, step.repetitions, step.ease_factor,
+        stability=step.stability, difficulty=step.difficulty, desired_retention=0.7,
+    )
+    assert first["interval_days"] == step.interval_days
+    assert batch["interval_days"] == expected.interval_days
+    assert expected.interval_days != apply_fsrs(
+        "good", step.interval_days, step.repetitions, step.ease_factor,
+        stability=step.stability, difficulty=step.difficulty,
+    ).interval_days
@@ -0,0 +1,180 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.api.v1.admin import get_metrics
+from app.db.base import Base
+from app.db.models import (
+    DailyActivityRollup,
+    Flashcard,
+    Message,
+    ReadingAttempt,
+    ReviewLog,
+    Session,
+    User,
+    UserActivitySummary,
+)
+from app.db.session import AsyncSessionLocal, engine
+from app.services.activity_rollup import (
+    rebuild_activity_summary,
+    rebuild_daily_activity,
+    record_activity,
+    remove_session_activity,
+)
+
+
+@pytest.fixture
+async def fresh_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        db.add(User(id="u1", full_name="Ana", email="ana@example.com", password_hash="x"))
+        await db.commit()
+
+
+async def _rollup_rows() -> list[tuple]:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(
+                DailyActivityRollup.day,
+                DailyActivityRollup.user_id,
+                DailyActivityRollup.messages,
+                DailyActivityRollup.sessions,
+                DailyActivityRollup.reviews,
+                DailyActivityRollup.reading_activities,
+            ).order_by(DailyActivityRollup.day)
+        )
+        return [tuple(row) for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_record_activity_upserts_counters_per_day(fresh_db) -> None:
+    now = datetime.now(UTC)
+    async with AsyncSessionLocal() as db:
+        await record_activity(db, "u1", at=now, messages=1)
+        await record_activity(db, "u1", at=now, messages=1, sessions=1)
+        await record_activity(db, "u1", at=now - timedelta(days=1), reviews=1)
+        await db.commit()
+
+    assert await _rollup_rows() == [
+        ((now - timedelta(days=1)).date(), "u1", 0, 0, 1, 0),
+        (now.date(), "u1", 2, 1, 0, 0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_raw_events_and_feeds_admin_metrics(fresh_db) -> None:
+    now = datetime.now(UTC)
+    yesterday = now - timedelta(days=1)
+    async with AsyncSessionLocal() as db:
+        db.add(Session(id="s1", user_id="u1", topic="travel", created_at=yesterday))
+        db.add_all(
+            [
+                Message(session_id="s1", role="user", content_final="hi", created_at=yesterday),
+                Message(session_id="s1", role="assistant", content_final="hello", created_at=yesterday),
+                Message(session_id="s1", role="user", content_final="again", created_at=now),
+            ]
+        )
+        db.add(Flashcard(id="f1", user_id="u1", word="house"))
+        db.add(
+            ReviewLog(
+                flashcard_id="f1", rating="good", old_interval=1, new_interval=3, old_ef=2.5, new_ef=2.5,
+                reviewed_at=now,
+            )
+        )
+        db.add(
+            ReadingAttempt(
+                user_id="u1", title="t", theme="travel", total_questions=5, correct_answers=4,
+                accuracy_rate=0.8, completed_at=now,
+            )
+        )
+        # Linha antiga e divergente: deve ser substituída pela reconstrução.
+        await record_activity(db, "u1", at=now, messages=40)
+        # Dia sem nenhum evento bruto: deve sumir.
+        await record_activity(db, "u1", at=now - timedelta(days=10), sessions=3)
+        await db.commit()
+
+    async with AsyncSessionLocal() as db:
+        assert await rebuild_daily_activity(db) == 2
+    expected = [(yesterday.date(), "u1", 1, 1, 0, 0), (now.date(), "u1", 1, 0, 1, 1)]
+    assert await _rollup_rows() == expected
+
+    async with AsyncSessionLocal() as db:
+        await rebuild_daily_activity(db, since=now.date())
+    assert await _rollup_rows() == expected
+
+    async with AsyncSessionLocal() as db:
+        result = await get_metrics(days=30, limit=100, offset=0, sort="last_active", order="desc", db=db)
+    assert [(item.date, item.messages, item.reviews) for item in result.daily_activity] == [
+        (yesterday.date().isoformat(), 1, 0),
+        (now.date().isoformat(), 1, 1),
+    ]
+    assert (result.messages_period, result.sessions_period, result.reading_activities_period) == (2, 1, 1)
+    assert (result.reading_questions_answered_period, result.reading_correct_answers_period) == (5, 4)
+
+
+@pytest.mark.asyncio
+async def test_summary_tracks_totals_and_last_active(fresh_db) -> None:
+    now = datetime.now(UTC).replace(microsecond=0)
+    async with AsyncSessionLocal() as db:
+        await record_activity(db, "u1", at=now, messages=1)
+        await record_activity(db, "u1", at=now + timedelta(hours=1), sessions=1)  # não é atividade
+        await record_activity(db, "u1", at=now - timedelta(days=2), reviews=3)  # lote offline atrasado
+        await record_activity(db, "u1", at=now, reading_activities=1, reading_questions=5)
+        await db.commit()
+
+        summary = await db.get(UserActivitySummary, "u1")
+        assert (summary.messages, summary.sessions, summary.reviews) == (1, 1, 3)
+        assert (summary.reading_activities, summary.reading_questions) == (1, 5)
+        assert summary.last_active.replace(tzinfo=UTC) == now
+
+        # A reconstrução sobrescreve com os eventos (aqui, nenhum) e cria linha para todo usuário.
+        db.add(User(id="u2", full_name="Bia", email="bia@example.com", password_hash="x"))
+        db.add(Session(id="s1", user_id="u2", topic="travel"))
+        await db.commit()
+        await rebuild_activity_summary(db)
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(UserActivitySummary).order_by(UserActivitySummary.user_id))).scalars().all()
+        assert [(row.user_id, row.messages, row.sessions, row.last_active) for row in rows] == [
+            ("u1", 0, 0, None),
+            ("u2", 0, 1, None),
+        ]
+
+
+async def _summary_row() -> tuple:
+    async with AsyncSessionLocal() as db:
+        summary = await db.get(UserActivitySummary, "u1")
+        return summary.messages, summary.sessions, summary.reviews, summary.last_active
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_session_matches_a_rebuild(fresh_db) -> None:
+    now = datetime.now(UTC).replace(microsecond=0)
+    yesterday = now - timedelta(days=1)
+    async with AsyncSessionLocal() as db:
+        for session_id, created_at in (("s1", yesterday), ("s2", now)):
+            db.add(Session(id=session_id, user_id="u1", topic="travel", created_at=created_at))
+            await record_activity(db, "u1", at=created_at, sessions=1)
+        for session_id, at in (("s1", yesterday), ("s2", now - timedelta(hours=1)), ("s2", now)):
+            db.add(Message(session_id=session_id, role="user", content_final="hi", created_at=at))
+            await record_activity(db, "u1", at=at, messages=1)
+        await db.commit()
+
+        # Apaga a sessão mais recente: o dia de hoje some e last_active volta para ontem.
+        session = await db.get(Session, "s2")
+        await remove_session_activity(db, session)
+        await db.delete(session)
+        await db.commit()
+
+    incremental = (await _rollup_rows(), await _summary_row())
+    assert incremental[0] == [(yesterday.date(), "u1", 1, 1, 0, 0)]
+    assert incremental[1][:3] == (1, 1, 0)
+    assert incremental[1][3].replace(tzinfo=UTC) == yesterday
+
+    async with AsyncSessionLocal() as db:
+        await rebuild_daily_activity(db)
+        await rebuild_activity_summary(db)
+    assert (await _rollup_rows(), await _summary_row()) == incremental
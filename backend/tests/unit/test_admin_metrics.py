@@ -0,0 +1,85 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.api.v1.admin import get_metrics
+from app.db.base import Base
+from app.db.models import Flashcard, Message, ReadingAttempt, ReviewLog, Session, User
+from app.db.session import AsyncSessionLocal, engine
+from app.services.activity_rollup import rebuild_activity_summary
+
+
+@pytest.fixture
+async def seeded():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    now = datetime.now(UTC)
+    async with AsyncSessionLocal() as db:
+        chatter = User(id="u-chat", full_name="Chatter", email="chat@example.com", password_hash="x", is_active=True)
+        reviewer = User(id="u-review", full_name="Reviewer", email="review@example.com", password_hash="x")
+        idle = User(id="u-idle", full_name="Idle", email="idle@example.com", password_hash="x")
+        db.add_all([chatter, reviewer, idle])
+        session = Session(id="s1", user_id="u-chat", topic="travel")
+        db.add(session)
+        db.add_all(
+            [
+                Message(session_id="s1", role="user", content_final="hi", created_at=now - timedelta(days=3)),
+                Message(session_id="s1", role="user", content_final="again", created_at=now - timedelta(days=2)),
+                Message(session_id="s1", role="assistant", content_final="hello", created_at=now),
+            ]
+        )
+        card = Flashcard(id="f1", user_id="u-review", word="house")
+        db.add(card)
+        db.add(
+            ReviewLog(
+                flashcard_id="f1", rating="good", old_interval=1, new_interval=3, old_ef=2.5, new_ef=2.5,
+                reviewed_at=now - timedelta(hours=1),
+            )
+        )
+        db.add(
+            ReadingAttempt(
+                user_id="u-chat", title="t", theme="travel", total_questions=5, correct_answers=4,
+                accuracy_rate=0.8, completed_at=now - timedelta(days=5),
+            )
+        )
+        await db.commit()
+        # Eventos inseridos direto no banco: preenche os totais como o backfill da migration.
+        await rebuild_activity_summary(db)
+
+
+@pytest.mark.asyncio
+async def test_user_metrics_are_aggregated_and_sorted_by_last_active(seeded) -> None:
+    statements: list[str] = []
+
+    def capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await get_metrics(days=30, limit=100, offset=0, sort="last_active", order="desc", db=db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert [m.id for m in result.user_metrics] == ["u-review", "u-chat", "u-idle"]
+    chatter = result.user_metrics[1]
+    assert (chatter.total_sessions, chatter.total_messages, chatter.total_reviews) == (1, 2, 0)
+    assert (chatter.total_reading_activities, chatter.total_reading_questions) == (1, 5)
+    assert result.user_metrics[2].last_active is None
+    assert (result.total_users, result.active_users, result.inactive_users) == (3, 1, 2)
+    # Número de queries independe da quantidade de usuários.
+    assert len(statements) <= 10
+
+
+@pytest.mark.asyncio
+async def test_user_metrics_are_paginated_server_side(seeded) -> None:
+    async with AsyncSessionLocal() as db:
+        page = await get_metrics(days=30, limit=1, offset=1, sort="total_messages", order="desc", db=db)
+
+    assert len(page.user_metrics) == 1
+    assert page.total_users == 3
+    assert page.user_metrics_offset == 1
+    assert page.user_metrics[0].total_messages == 0
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.admission import AdmissionQueue
+from app.services.errors import ProviderOverloadedError
+from app.services.llm_router import LLMRouter
+from tests.unit.test_llm_hedging import DelayedProvider
+
+
+@pytest.mark.asyncio
+async def test_queue_full_sheds_immediately() -> None:
+    queue = AdmissionQueue("test-full", max_concurrency=1, max_queue=1, queue_timeout_seconds=1)
+    await queue.acquire()
+    waiter = asyncio.create_task(queue.acquire())
+    await asyncio.sleep(0)
+    assert queue.depth == 1
+
+    with pytest.raises(ProviderOverloadedError):
+        await queue.acquire()
+
+    queue.release()
+    await waiter
+    assert queue.in_flight == 1
+    assert queue.depth == 0
+    queue.release()
+    assert queue.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_deadline_expires() -> None:
+    queue = AdmissionQueue("test-deadline", max_concurrency=1, max_queue=5, queue_timeout_seconds=0.01)
+    await queue.acquire()
+
+    with pytest.raises(ProviderOverloadedError):
+        await queue.acquire()
+
+    assert queue.depth == 0
+    assert metrics.counter("llm_queue_shed_total", provider="test-deadline", reason="deadline") == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot() -> None:
+    queue = AdmissionQueue("test-cancel", max_concurrency=1, max_queue=5, queue_timeout_seconds=5)
+    await queue.acquire()
+    waiter = asyncio.create_task(queue.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    queue.release()
+    assert queue.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_router_spills_over_when_primary_queue_is_full() -> None:
+    primary = DelayedProvider("gemini", delay=0.2)
+    secondary = DelayedProvider("secondary", delay=0)
+    router = LLMRouter(providers={"gemini": primary, "secondary": secondary})
+    router.admission["gemini"] = AdmissionQueue("gemini", max_concurrency=1, max_queue=0, queue_timeout_seconds=1)
+
+    results = await asyncio.gather(
+        router.correct_input("a", {}, provider_override=None, user_preference=None),
+        router.correct_input("b", {}, provider_override=None, user_preference=None),
+    )
+
+    assert sorted(provider for _, provider, _ in results) == ["gemini", "secondary"]
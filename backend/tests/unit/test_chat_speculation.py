@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.chat_service import ChatService, is_trivial_correction
+from app.services.llm_types import ChatResult
+
+
+def test_trivial_correction_ignores_case_and_punctuation() -> None:
+    assert is_trivial_correction("i think we need to go now", "I think we need to go now.")
+
+
+def test_small_correction_is_trivial_under_threshold() -> None:
+    assert is_trivial_correction("She go to school every day", "She goes to school every day")
+
+
+def test_mixed_language_rewrite_is_not_trivial() -> None:
+    assert not is_trivial_correction("Eu acho que we need to go agora", "I think we need to go now")
+
+
+@pytest.mark.asyncio
+async def test_speculative_reply_is_kept_on_trivial_correction() -> None:
+    service = ChatService(db=None, llm_router=None)  # type: ignore[arg-type]
+
+    async def reply():
+        return ChatResult(reply="Sure!"), "gemini", "model"
+
+    task = asyncio.create_task(reply())
+    result, outcome = await service._resolve_speculative_reply(task, "hello there", "Hello there!")
+
+    assert outcome == "hit"
+    assert result is not None and result[0].reply == "Sure!"
+
+
+@pytest.mark.asyncio
+async def test_speculative_reply_is_cancelled_on_real_correction() -> None:
+    service = ChatService(db=None, llm_router=None)  # type: ignore[arg-type]
+
+    async def slow_reply():
+        await asyncio.sleep(10)
+        return ChatResult(reply="never"), "gemini", "model"
+
+    task = asyncio.create_task(slow_reply())
+    result, outcome = await service._resolve_speculative_reply(task, "Eu quero cafe", "I want coffee")
+
+    assert outcome == "miss"
+    assert result is None
+    assert task.cancelled()
+
+
+def test_speculation_outcomes_are_counted() -> None:
+    from app.services.chat_service import _record_speculation
+
+    before = metrics.counter("chat_speculation_total", outcome="hit")
+    _record_speculation("hit")
+    assert metrics.counter("chat_speculation_total", outcome="hit") == before + 1
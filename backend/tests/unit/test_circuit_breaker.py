@@ -0,0 +1,146 @@
+import pytest
+
+from app.providers.base import BaseLLMProvider
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry
+from app.services.errors import ProviderError, ProviderRequestError
+from app.services.llm_router import LLMRouter
+from app.services.llm_types import CorrectionResult
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "gemini",
+        "correct_input",
+        window_seconds=60,
+        window_size=20,
+        min_samples=3,
+        error_rate_threshold=0.5,
+        slow_call_seconds=0,
+        open_seconds=10,
+        clock=clock,
+    )
+
+
+def test_breaker_opens_after_error_rate_threshold() -> None:
+    clock = FakeClock()
+    breaker = _breaker(clock)
+
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CLOSED
+    breaker.record_failure(0.1)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+
+def test_breaker_half_open_probe_closes_on_success() -> None:
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+
+    clock.now += 11
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # só uma sonda por vez
+
+    breaker.record_success(0.2)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_half_open_probe_reopens_on_failure() -> None:
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure(0.1)
+    clock.now += 11
+    assert breaker.allow_request()
+
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+
+
+def test_breaker_opens_on_slow_p90() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "gemini", "correct_input", min_samples=3, error_rate_threshold=0.9, slow_call_seconds=2.0, clock=clock
+    )
+    for _ in range(3):
+        breaker.record_success(5.0)
+
+    assert breaker.state == OPEN
+
+
+class CountingFailingProvider(BaseLLMProvider):
+    name = "gemini"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def correct_input(self, raw_text: str, context: dict):
+        self.calls += 1
+        raise ProviderRequestError("timeout")
+
+    async def generate_reply(self, corrected_text: str, history: list[dict], context: dict):
+        raise ProviderRequestError("timeout")
+
+    async def analyze_sentence(self, sentence_en: str, context: dict):
+        raise ProviderRequestError("timeout")
+
+    async def generate_reading_activity(self, theme: str, context: dict):
+        raise ProviderRequestError("timeout")
+
+
+class HealthyProvider(CountingFailingProvider):
+    name = "secondary"
+
+    async def correct_input(self, raw_text: str, context: dict):
+        self.calls += 1
+        return CorrectionResult(corrected_text="Fixed", changed=True, notes="ok"), "model"
+
+
+@pytest.mark.asyncio
+async def test_router_skips_provider_with_open_circuit() -> None:
+    primary = CountingFailingProvider()
+    secondary = HealthyProvider()
+    router = LLMRouter(providers={"gemini": primary, "secondary": secondary})
+    router.breakers = CircuitBreakerRegistry(min_samples=2, error_rate_threshold=0.5, open_seconds=60)
+
+    await router.correct_input("texto", {}, provider_override="gemini", user_preference=None)
+    assert primary.calls == 2
+    assert router.breakers.get("gemini", "correct_input").state == OPEN
+
+    result, provider, _ = await router.correct_input("texto", {}, provider_override="gemini", user_preference=None)
+    assert provider == "secondary"
+    assert result.corrected_text == "Fixed"
+    assert primary.calls == 2  # circuito aberto: nenhuma chamada nova ao primário
+
+    states = {(s.provider, s.method): s.state for s in router.circuit_breaker_status()}
+    assert states[("gemini", "correct_input")] == OPEN
+
+
+@pytest.mark.asyncio
+async def test_router_fails_fast_when_every_circuit_is_open() -> None:
+    primary = CountingFailingProvider()
+    secondary = HealthyProvider()
+    router = LLMRouter(providers={"gemini": primary, "secondary": secondary})
+    router.breakers = CircuitBreakerRegistry(min_samples=1, error_rate_threshold=0.5, open_seconds=60)
+    for name in ("gemini", "secondary"):
+        router.breakers.get(name, "correct_input").record_failure(0.1)
+
+    with pytest.raises(ProviderError, match="every provider circuit is open"):
+        await router.correct_input("texto", {}, provider_override=None, user_preference=None)
+    assert primary.calls == secondary.calls == 0
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.db.base import Base
+from app.db.session import engine
+from app.services.dictionary_lookup import DictionaryLookupService
+
+
+class CountingDictionaryService(DictionaryLookupService):
+    def __init__(self, *, found: bool = True) -> None:
+        super().__init__()
+        self.found = found
+        self.definition_calls = 0
+        self.translation_calls = 0
+
+    async def _lookup_definition(self, word: str):
+        self.definition_calls += 1
+        await asyncio.sleep(0.01)
+        if not self.found:
+            return None, None, None
+        return word, "noun", f"definition of {word}"
+
+    async def _lookup_translation_pt(self, word: str):
+        self.translation_calls += 1
+        await asyncio.sleep(0.01)
+        return "casa" if self.found else None
+
+
+@pytest.fixture
+async def fresh_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_hit_upstream_once(fresh_db) -> None:
+    service = CountingDictionaryService()
+
+    results = await asyncio.gather(*(service.lookup("House!") for _ in range(5)))
+
+    assert {r.translation for r in results} == {"casa"}
+    assert service.definition_calls == 1
+    assert service.translation_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_survive_process_restart(fresh_db) -> None:
+    first = CountingDictionaryService()
+    await first.lookup("house")
+
+    second = CountingDictionaryService()
+    info = await second.lookup("house")
+
+    assert info.definition == "definition of house"
+    assert second.definition_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_words_are_negatively_cached_in_memory_only(fresh_db) -> None:
+    service = CountingDictionaryService(found=False)
+    await service.lookup("zzxq")
+    await service.lookup("zzxq")
+    assert service.definition_calls == 1
+
+    other = CountingDictionaryService(found=False)
+    await other.lookup("zzxq")
+    assert other.definition_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_many_dedupes_and_bounds_concurrency(fresh_db, monkeypatch) -> None:
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "dictionary_batch_concurrency", 2)
+    service = CountingDictionaryService()
+    active = 0
+    peak = 0
+    original = service._lookup_uncached
+
+    async def tracked(normalized: str, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            return await original(normalized, **kwargs)
+        finally:
+            active -= 1
+
+    service._lookup_uncached = tracked
+    await service.lookup("cached")
+
+    result = await service.lookup_many(["Cat", "cat!", "dog", "bird", "fish", "cached", "123"])
+
+    assert list(result) == ["cat", "dog", "bird", "fish", "cached"]
+    assert service.definition_calls == 5  # "cached" veio da memória
+    assert peak <= 2
+
+
+@pytest.mark.asyncio
+async def test_lookup_many_reads_persisted_entries_in_one_query(fresh_db) -> None:
+    await CountingDictionaryService().lookup_many(["house", "tree", "river"])
+
+    service = CountingDictionaryService()
+    single_reads = 0
+    original = service._load_persisted
+
+    async def counted(word: str):
+        nonlocal single_reads
+        single_reads += 1
+        return await original(word)
+
+    service._load_persisted = counted
+    result = await service.lookup_many(["house", "tree", "river", "cloud"])
+
+    assert result["tree"].definition == "definition of tree"
+    assert single_reads == 0
+    assert service.definition_calls == 1  # só "cloud" vai às APIs
+
+
+@pytest.mark.asyncio
+async def test_lookup_many_caps_remote_lookups_per_request(fresh_db, monkeypatch) -> None:
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "dictionary_batch_max_remote_lookups", 2)
+    service = CountingDictionaryService()
+    await service.lookup("cached")
+
+    result = await service.lookup_many(["cached", "cat", "dog", "bird", "fish"])
+
+    # "cached" não conta no limite; das outras, só as duas primeiras vão às APIs.
+    assert list(result) == ["cached", "cat", "dog"]
+    assert service.definition_calls == 3
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from app.cli.build_dictionary_index import main as build_index
+from app.services.dictionary_index import OfflineDictionaryIndex
+from tests.unit.test_dictionary_cache import CountingDictionaryService
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    source = tmp_path / "source.jsonl"
+    rows = [
+        {"word": "leave", "pos": "verb", "definition": "go away from", "translation": "sair", "forms": ["left", "leaves"]},
+        {"word": "left", "pos": "adjective", "definition": "on the west side", "translation": "esquerdo"},
+        {"word": "House", "pos": "noun", "definition": "a building for living in", "translation": "casa"},
+        {"word": "house", "definition": "duplicate with worse rank", "rank": 999},
+        {"word": "rareword", "pos": "noun", "definition": "cut by the limit", "translation": "rara"},
+    ]
+    source.write_text("\n".join(json.dumps(row) for row in rows), encoding="utf-8")
+    output = tmp_path / "dictionary.sqlite"
+    assert build_index([str(source), "--output", str(output), "--limit", "3"]) == 0
+    return output
+
+
+def test_index_resolves_lemmas_and_inflections(index_path) -> None:
+    index = OfflineDictionaryIndex(index_path)
+
+    assert len(index) == 4  # leave, left, house, leaves
+    assert index.lookup("house").definition == "a building for living in"
+    assert index.lookup("leaves").lemma == "leave"
+    assert index.lookup("left").translation == "esquerdo"  # lema próprio não é sobrescrito pela flexão
+    assert index.lookup("rareword") is None
+    index.close()
+
+
+def test_open_if_available_tolerates_missing_file(tmp_path) -> None:
+    assert OfflineDictionaryIndex.open_if_available(str(tmp_path / "missing.sqlite")) is None
+    assert OfflineDictionaryIndex.open_if_available("") is None
+
+
+@pytest.mark.asyncio
+async def test_service_answers_from_index_without_network(index_path) -> None:
+    service = CountingDictionaryService()
+    service._index = OfflineDictionaryIndex(index_path)
+
+    info = await service.lookup("Leaves")
+
+    assert info.translation == "sair"
+    assert service.definition_calls == 0
+    assert service.translation_calls == 0
@@ -0,0 +1,157 @@
+"""Paridade do FSRS vetorizado com apply_fsrs (resultados idênticos, não aproximados)."""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.db.base import Base  # noqa: E402
+from app.db.models import Flashcard, ReviewLog, User  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+from app.services.fsrs import W, apply_fsrs  # noqa: E402
+from app.services.fsrs_batch import (  # noqa: E402
+    RATING_NAMES,
+    apply_fsrs_batch,
+    encode_ratings,
+    replay_fsrs_batch,
+)
+
+
+def _random_cards(count: int, seed: int) -> list[tuple]:
+    rng = random.Random(seed)
+    return [
+        (
+            rng.randint(1, 4),
+            rng.choice([0, 1, 2, rng.randint(1, 4000)]),
+            rng.choice([0, 1, rng.randint(0, 50)]),
+            round(rng.uniform(1.3, 3.0), 3),
+            rng.choice([0.0, 0.05, 0.1, round(rng.uniform(0.01, 5000), 4), round(rng.lognormvariate(1, 2), 4)]),
+            rng.choice([1.0, 10.0, round(rng.uniform(1, 10), 4)]),
+        )
+        for _ in range(count)
+    ]
+
+
+def _scalar_tuple(result) -> tuple:
+    return (
+        result.interval_days,
+        result.repetitions,
+        result.stability,
+        result.difficulty,
+        result.ease_factor,
+        result.lapses_increment,
+    )
+
+
+def _batch_tuple(result, index: int) -> tuple:
+    return (
+        int(result.interval_days[index]),
+        int(result.repetitions[index]),
+        float(result.stability[index]),
+        float(result.difficulty[index]),
+        float(result.ease_factor[index]),
+        int(result.lapses_increment[index]),
+    )
+
+
+@pytest.mark.parametrize(
+    ("weights", "retention"),
+    [
+        (None, 0.90),
+        (None, 0.80),
+        ([value * 1.1 for value in W], 0.95),
+    ],
+)
+def test_batch_matches_scalar_exactly(weights, retention) -> None:
+    cards = _random_cards(20_000, seed=len(str(weights)) + int(retention * 100))
+    ratings, intervals, repetitions, efs, stabilities, difficulties = map(list, zip(*cards))
+
+    result = apply_fsrs_batch(
+        ratings, intervals, repetitions, efs, stabilities, difficulties, weights=weights, desired_retention=retention
+    )
+
+    assert len(result) == len(cards)
+    for index, (rating, interval, reps, ef, stability, difficulty) in enumerate(cards):
+        expected = apply_fsrs(
+            RATING_NAMES[rating],
+            interval,
+            reps,
+            ef,
+            stability=stability,
+            difficulty=difficulty,
+            weights=weights,
+            desired_retention=retention,
+        )
+        assert _batch_tuple(result, index) == _scalar_tuple(expected), cards[index]
+
+
+def test_replay_matches_chained_scalar_reviews() -> None:
+    rng = random.Random(3)
+    histories = [[rng.randint(1, 4) for _ in range(rng.randint(1, 12))] for _ in range(500)]
+    width = max(len(history) for history in histories)
+    matrix = [history + [0] * (width - len(history)) for history in histories]
+
+    state, counts = replay_fsrs_batch(matrix)
+
+    assert counts.tolist() == [len(history) for history in histories]
+    for index, history in enumerate(histories):
+        interval, reps, ef, stability, difficulty, lapses = 1, 0, 2.5, 0.0, 5.0, 0
+        for rating in history:
+            step = apply_fsrs(RATING_NAMES[rating], interval, reps, ef, stability=stability, difficulty=difficulty)
+            interval, reps, ef = step.interval_days, step.repetitions, step.ease_factor
+            stability, difficulty = step.stability, step.difficulty
+            lapses += step.lapses_increment
+        assert _batch_tuple(state, index) == (interval, reps, stability, difficulty, ef, lapses)
+
+
+def test_invalid_ratings_are_rejected() -> None:
+    assert encode_ratings(["again", "easy"]).tolist() == [1, 4]
+    with pytest.raises(ValueError):
+        encode_ratings(["meh"])
+    with pytest.raises(ValueError):
+        apply_fsrs_batch([5], [1], [0], [2.5], [0.0], [5.0])
+
+
+@pytest.mark.asyncio
+async def test_reschedule_cli_replays_history_with_new_retention() -> None:
+    from app.cli.reschedule_flashcards import reschedule_flashcards
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    last_review = datetime(2026, 10, 1, 12, tzinfo=UTC)
+    async with AsyncSessionLocal() as db:
+        db.add(User(id="u1", full_name="Ana", email="ana@example.com", password_hash="x"))
+        db.add(Flashcard(id="f1", user_id="u1", word="house"))
+        db.add(Flashcard(id="f2", user_id="u1", word="never reviewed"))
+        for offset, rating in [(9, "good"), (6, "good"), (0, "hard")]:
+            db.add(
+                ReviewLog(
+                    flashcard_id="f1", rating=rating, old_interval=1, new_interval=1, old_ef=2.5, new_ef=2.5,
+                    reviewed_at=last_review - timedelta(days=offset),
+                )
+            )
+        await db.commit()
+
+        assert await reschedule_flashcards(db, desired_retention=0.8, chunk_size=1) == 1
+
+    interval, reps, ef, stability, difficulty = 1, 0, 2.5, 0.0, 5.0
+    for rating in ("good", "good", "hard"):
+        step = apply_fsrs(
+            rating, interval, reps, ef, stability=stability, difficulty=difficulty, desired_retention=0.8
+        )
+        interval, reps, ef, stability, difficulty = (
+            step.interval_days, step.repetitions, step.ease_factor, step.stability, step.difficulty,
+        )
+
+    async with AsyncSessionLocal() as db:
+        card = await db.get(Flashcard, "f1")
+        untouched = await db.get(Flashcard, "f2")
+    assert (card.interval_days, card.repetitions, card.stability, card.difficulty) == (
+        interval, reps, stability, difficulty,
+    )
+    assert card.next_review.replace(tzinfo=UTC) == last_review + timedelta(days=interval)
+    assert (untouched.stability, untouched.repetitions) == (0.0, 0)
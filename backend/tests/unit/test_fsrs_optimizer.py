@@ -0,0 +1,233 @@
+"""Ajuste de pesos FSRS por usuário: log-loss em lote, otimizador e CLI."""
+
+import logging
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from itertools import groupby
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.cli import optimize_fsrs_weights  # noqa: E402
+from app.cli.optimize_fsrs_weights import optimize_users, store_weights  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.models import Flashcard, ReviewLog, User, UserFSRSParams  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+from app.services.fsrs import DECAY, FACTOR, W, apply_fsrs  # noqa: E402
+from app.services.fsrs_optimizer import FitResult, batch_log_loss, build_history, fit_weights  # noqa: E402
+from app.services.fsrs_params import invalidate_user_weights, load_user_weights  # noqa: E402
+
+
+def _forgetful_rows(cards: int, reviews: int, seed: int) -> list[tuple[str, int, float]]:
+    """Usuário que esquece metade das vezes, mesmo após intervalos curtos."""
+    rng = random.Random(seed)
+    rows = []
+    for card in range(cards):
+        moment = 0.0
+        for _ in range(reviews):
+            rows.append((f"c{card:04d}", rng.choice([1, 3]), moment))
+            moment += rng.randint(1, 30)
+    return rows
+
+
+def test_batch_log_loss_rows_match_single_evaluations() -> None:
+    history = build_history(_forgetful_rows(50, 6, seed=1))
+    candidates = np.vstack([W, np.array(W) * 1.2, np.array(W) * 0.8])
+
+    losses = batch_log_loss(candidates, history)
+
+    assert losses.shape == (3,)
+    for row, expected in zip(candidates, losses):
+        assert batch_log_loss(row, history)[0] == pytest.approx(expected)
+    assert history.predictions == 50 * 5
+
+
+@pytest.mark.parametrize("desired_retention", [0.9, 0.8])
+def test_batch_log_loss_replays_state_like_apply_fsrs(desired_retention: float) -> None:
+    """O estado segue apply_fsrs (intervalo agendado); a previsão usa o tempo decorrido."""
+    rows = _forgetful_rows(30, 6, seed=5)
+    weights = [value * 1.1 for value in W]
+    names = {1: "again", 3: "good"}
+
+    expected, count = 0.0, 0
+    for _, logs in groupby(rows, key=lambda row: row[0]):
+        logs = list(logs)
+        state = None
+        for index, (_, rating, moment) in enumerate(logs):
+            if state is not None:
+                elapsed = moment - logs[index - 1][2]
+                retrievability = (1.0 + FACTOR * elapsed / max(state.stability, 0.01)) ** DECAY
+                retrievability = min(max(retrievability, 1e-6), 1.0 - 1e-6)
+                expected -= math.log(retrievability if rating > 1 else 1.0 - retrievability)
+                count += 1
+            state = apply_fsrs(
+                names[rating],
+                state.interval_days if state else 0,
+                state.repetitions if state else 0,
+                2.5,
+                stability=state.stability if state else 0.0,
+                difficulty=state.difficulty if state else 5.0,
+                weights=weights,
+                desired_retention=desired_retention,
+            )
+
+    loss = batch_log_loss(weights, build_history(rows), desired_retention=desired_retention)[0]
+    # apply_fsrs arredonda S e D a 4 casas; o replay não.
+    assert loss == pytest.approx(expected / count, rel=1e-3)
+
+
+def test_build_history_uses_elapsed_days_per_card() -> None:
+    history = build_history([("a", 3, 10.0), ("a", 1, 14.5), ("b", 4, 2.0)])
+
+    assert history.ratings.tolist() == [[3, 1], [4, 0]]
+    assert history.elapsed_days.tolist() == [[0.0, 4.5], [0.0, 0.0]]
+    assert history.predictions == 1
+
+
+def test_build_history_holds_out_latest_reviews_across_cards() -> None:
+    rows = [("a", 3, 0.0), ("a", 3, 5.0), ("a", 1, 40.0), ("b", 3, 1.0), ("b", 3, 20.0), ("b", 3, 30.0)]
+
+    history = build_history(rows, holdout_fraction=0.5)
+
+    # Previsões nos momentos 5, 40, 20 e 30: reserva as duas mais recentes (40 e 30).
+    assert history.holdout.tolist() == [[False, False, True], [False, False, True]]
+    assert history.train_mask.tolist() == [[False, True, False], [False, True, False]]
+    assert not build_history(rows).holdout.any()
+
+
+def test_fit_weights_beats_defaults_for_forgetful_user() -> None:
+    history = build_history(_forgetful_rows(120, 8, seed=2), holdout_fraction=0.2)
+
+    result = fit_weights(history, iterations=40)
+
+    assert result.improved
+    assert result.log_loss < result.default_log_loss
+    assert len(result.weights) == len(W)
+    assert result.weights[:4] == sorted(result.weights[:4])
+    assert result.weights[11:15] == list(W[11:15])
+    # A comparação usa só as previsões reservadas.
+    expected = batch_log_loss(np.vstack([result.weights, W]), history, history.holdout)
+    assert [result.log_loss, result.default_log_loss] == pytest.approx(expected.tolist())
+
+
+async def _reset_db() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    invalidate_user_weights()
+
+
+@pytest.mark.asyncio
+async def test_load_user_weights_feeds_apply_fsrs() -> None:
+    await _reset_db()
+    custom = [value * 1.5 for value in W]
+    async with AsyncSessionLocal() as db:
+        db.add(User(id="u1", full_name="Ana", email="ana@example.com", password_hash="x"))
+        db.add(User(id="u2", full_name="Bia", email="bia@example.com", password_hash="x"))
+        db.add(UserFSRSParams(user_id="u1", weights=custom, review_count=300, log_loss=0.5, default_log_loss=0.6))
+        await db.commit()
+
+        assert await load_user_weights(db, "u1") == custom
+        assert await load_user_weights(db, "u2") is None
+
+    first_review = apply_fsrs("good", 1, 0, 2.5, weights=custom)
+    assert first_review.stability == round(custom[2], 4)
+    invalidate_user_weights()
+
+
+async def _seed_reviews(users: tuple[tuple[str, int, int], ...]) -> None:
+    """(user_id, cards, seed): cada usuário com 6 revisões por card de ``_forgetful_rows``."""
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    async with AsyncSessionLocal() as db:
+        for user_id, _, _ in users:
+            db.add(User(id=user_id, full_name=user_id, email=f"{user_id}@example.com", password_hash="x"))
+        await db.flush()
+        for user_id, cards, seed in users:
+            for card_id, rating, moment in _forgetful_rows(cards, 6, seed):
+                flashcard_id = f"{user_id}-{card_id}"
+                if await db.get(Flashcard, flashcard_id) is None:
+                    db.add(Flashcard(id=flashcard_id, user_id=user_id, word=card_id))
+                    await db.flush()
+                db.add(
+                    ReviewLog(
+                        flashcard_id=flashcard_id,
+                        rating={1: "again", 3: "good"}[rating],
+                        old_interval=1, new_interval=1, old_ef=2.5, new_ef=2.5,
+                        reviewed_at=start + timedelta(days=moment),
+                    )
+                )
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_optimizer_streams_logs_and_stores_improved_weights() -> None:
+    await _reset_db()
+    await _seed_reviews((("u1", 40, 3), ("u2", 2, 4)))
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        async with AsyncSessionLocal() as db:
+            fitted = await optimize_users(db, executor, workers=2, chunk_size=50, min_reviews=100, iterations=20)
+    async with AsyncSessionLocal() as db:
+        stored_users, removed_users = await store_weights(db, fitted)
+
+    # u2 tem só 10 revisões repetidas: abaixo do mínimo, fica com o W padrão.
+    assert set(fitted) == {"u1"}
+    assert (stored_users, removed_users) == (["u1"], [])
+    async with AsyncSessionLocal() as db:
+        stored = await db.get(UserFSRSParams, "u1")
+        assert await db.get(UserFSRSParams, "u2") is None
+        assert stored.review_count == 40 * 5
+        assert stored.log_loss < stored.default_log_loss
+        assert await load_user_weights(db, "u1") == stored.weights
+    invalidate_user_weights()
+
+
+@pytest.mark.asyncio
+async def test_store_weights_drops_rows_whose_refit_does_not_beat_defaults() -> None:
+    await _reset_db()
+    old = [value * 1.5 for value in W]
+    async with AsyncSessionLocal() as db:
+        for user_id in ("u1", "u2", "u3"):
+            db.add(User(id=user_id, full_name=user_id, email=f"{user_id}@example.com", password_hash="x"))
+        await db.flush()
+        for user_id in ("u1", "u2"):
+            db.add(UserFSRSParams(user_id=user_id, weights=old, review_count=300, log_loss=0.4, default_log_loss=0.5))
+        await db.commit()
+        assert await load_user_weights(db, "u2") == old
+
+    better = FitResult(weights=[value * 0.9 for value in W], log_loss=0.3, default_log_loss=0.5, review_count=400)
+    worse = FitResult(weights=old, log_loss=0.55, default_log_loss=0.5, review_count=400)
+    async with AsyncSessionLocal() as db:
+        stored_users, removed_users = await store_weights(db, {"u1": better, "u2": worse, "u3": worse})
+
+    # u2 tinha pesos antigos que o novo ajuste não justifica: volta ao W. u3 não tinha linha.
+    assert (stored_users, removed_users) == (["u1"], ["u2"])
+    async with AsyncSessionLocal() as db:
+        assert (await db.get(UserFSRSParams, "u1")).weights == better.weights
+        assert await db.get(UserFSRSParams, "u2") is None
+        assert await db.get(UserFSRSParams, "u3") is None
+        assert await load_user_weights(db, "u2") is None
+    invalidate_user_weights()
+
+
+@pytest.mark.asyncio
+async def test_optimizer_skips_users_whose_fit_raises(monkeypatch, caplog) -> None:
+    await _reset_db()
+    await _seed_reviews((("u1", 40, 3), ("u2", 40, 4)))
+    fit_user = optimize_fsrs_weights.fit_user
+
+    def flaky_fit_user(user_id, *args):
+        if user_id == "u1":
+            raise FloatingPointError("boom")
+        return fit_user(user_id, *args)
+
+    monkeypatch.setattr(optimize_fsrs_weights, "fit_user", flaky_fit_user)
+    with ThreadPoolExecutor(max_workers=2) as executor, caplog.at_level(logging.ERROR):
+        async with AsyncSessionLocal() as db:
+            fitted = await optimize_users(db, executor, workers=1, chunk_size=50, min_reviews=100, iterations=5)
+
+    assert set(fitted) == {"u2"}
+    assert "u1" in caplog.text
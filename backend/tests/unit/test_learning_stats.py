@@ -0,0 +1,113 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.api.v1.srs import progress_overview, review_stats
+from app.db.base import Base
+from app.db.models import Flashcard, ReviewLog, User, UserLearningStats
+from app.db.session import AsyncSessionLocal, engine
+from app.services.activity_rollup import rebuild_daily_activity
+from app.services.learning_stats import rebuild_learning_stats, record_review
+
+
+@pytest.fixture
+async def learner():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user = User(id="u1", full_name="Ana", email="ana@example.com", password_hash="x")
+        db.add(user)
+        db.add(Flashcard(id="f1", user_id="u1", word="house", repetitions=3))
+        await db.commit()
+        return user
+
+
+async def _stats() -> tuple:
+    async with AsyncSessionLocal() as db:
+        stats = await db.get(UserLearningStats, "u1")
+        return stats.total_reviews, stats.good_reviews, stats.current_streak, stats.last_review_date
+
+
+@pytest.mark.asyncio
+async def test_record_review_tracks_totals_and_streak(learner) -> None:
+    now = datetime.now(UTC)
+    day = lambda offset: now - timedelta(days=offset)  # noqa: E731
+
+    async with AsyncSessionLocal() as db:
+        await record_review(db, "u1", "good", at=day(4))
+        await record_review(db, "u1", "again", at=day(4))
+        await record_review(db, "u1", "easy", at=day(3))
+        await db.commit()
+    assert await _stats() == (3, 2, 2, day(3).date())
+
+    async with AsyncSessionLocal() as db:
+        # Lacuna de um dia zera a sequência; revisão atrasada (dia anterior) não a altera.
+        await record_review(db, "u1", "good", at=day(1))
+        await record_review(db, "u1", "good", at=day(2))
+        await record_review(db, "u1", "hard", at=day(0))
+        await db.commit()
+    assert await _stats() == (6, 4, 2, now.date())
+
+
+@pytest.mark.asyncio
+async def test_dashboards_read_precomputed_stats(learner) -> None:
+    now = datetime.now(UTC)
+    async with AsyncSessionLocal() as db:
+        for offset, rating in [(2, "again"), (1, "good"), (0, "good"), (0, "easy")]:
+            db.add(
+                ReviewLog(
+                    flashcard_id="f1", rating=rating, old_interval=1, new_interval=3, old_ef=2.5, new_ef=2.5,
+                    reviewed_at=now - timedelta(days=offset),
+                )
+            )
+        await db.commit()
+        await rebuild_daily_activity(db)
+        assert await rebuild_learning_stats(db) == 1
+    assert await _stats() == (4, 3, 3, now.date())
+
+    statements: list[str] = []
+
+    def capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSessionLocal() as db:
+            overview = await progress_overview(db=db, current_user=learner)
+            stats = await review_stats(db=db, current_user=learner)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert (overview.streak_days, overview.total_learned, overview.accuracy_rate) == (3, 1, 0.75)
+    assert overview.reviews_today == 2
+    assert [(item.count, item.accuracy) for item in overview.daily_history] == [(1, 0.0), (1, 1.0), (2, 1.0)]
+    assert (stats.total_cards, stats.due_now, stats.reviews_today) == (1, 1, 2)
+    # Nenhuma leitura do histórico bruto de revisões.
+    assert not any("review_logs" in statement for statement in statements)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_recomputes_streak_in_sql_and_drops_stale_rows(learner) -> None:
+    from app.services.activity_rollup import record_activity
+
+    now = datetime.now(UTC)
+    async with AsyncSessionLocal() as db:
+        db.add(User(id="u2", full_name="Bia", email="bia@example.com", password_hash="x"))
+        # Linha sem nenhuma revisão no rollup: removida pela reconstrução.
+        db.add(UserLearningStats(user_id="u2", total_reviews=9, good_reviews=9, current_streak=9))
+        # Dias -6..-4 e -2..0: a última sequência tem 3 dias.
+        for offset in (6, 5, 4, 2, 1, 0):
+            await record_activity(db, "u1", at=now - timedelta(days=offset), reviews=2, good_reviews=1)
+        await db.commit()
+
+        assert await rebuild_learning_stats(db) == 1
+    assert await _stats() == (12, 6, 3, now.date())
+
+    async with AsyncSessionLocal() as db:
+        assert await db.get(UserLearningStats, "u2") is None
+        # Revisão gravada depois da reconstrução continua somando normalmente.
+        await record_review(db, "u1", "good", at=now)
+        await db.commit()
+    assert await _stats() == (13, 7, 3, now.date())
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.providers.base import BaseLLMProvider
+from app.services.hedging import HedgeBudget
+from app.services.llm_router import LLMRouter
+from app.services.llm_types import ChatResult, CorrectionResult
+
+
+class DelayedProvider(BaseLLMProvider):
+    def __init__(self, name: str, delay: float) -> None:
+        self.name = name
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def correct_input(self, raw_text: str, context: dict):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return CorrectionResult(corrected_text=f"{self.name} fixed", changed=True, notes=""), f"{self.name}-model"
+
+    async def generate_reply(self, corrected_text: str, history: list[dict], context: dict):
+        return ChatResult(reply="reply"), f"{self.name}-model"
+
+    async def analyze_sentence(self, sentence_en: str, context: dict):
+        raise NotImplementedError
+
+    async def generate_reading_activity(self, theme: str, context: dict):
+        raise NotImplementedError
+
+
+@pytest.fixture()
+def hedging_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedging_enabled", True)
+    monkeypatch.setattr(settings, "llm_hedge_default_delay_seconds", 0.05)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.01)
+
+
+@pytest.mark.asyncio
+async def test_hedge_fires_and_cancels_slow_primary(hedging_settings) -> None:
+    primary = DelayedProvider("gemini", delay=5)
+    secondary = DelayedProvider("secondary", delay=0.01)
+    router = LLMRouter(providers={"gemini": primary, "secondary": secondary})
+
+    result, provider, _ = await router.correct_input("texto", {}, provider_override=None, user_preference=None)
+    await asyncio.sleep(0)
+
+    assert provider == "secondary"
+    assert result.corrected_text == "secondary fixed"
+    assert primary.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_does_not_hedge(hedging_settings) -> None:
+    primary = DelayedProvider("gemini", delay=0)
+    secondary = DelayedProvider("secondary", delay=0)
+    router = LLMRouter(providers={"gemini": primary, "secondary": secondary})
+
+    _, provider, _ = await router.correct_input("texto", {}, provider_override=None, user_preference=None)
+
+    assert provider == "gemini"
+    assert secondary.started == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget_caps_duplicate_requests(hedging_settings) -> None:
+    primary = DelayedProvider("gemini", delay=0.1)
+    secondary = DelayedProvider("secondary", delay=0.5)
+    router = LLMRouter(providers={"gemini": primary, "secondary": secondary})
+    router.hedge_budget = HedgeBudget(ratio=0.0, burst=1.0)
+
+    for _ in range(3):
+        await router.correct_input("texto", {}, provider_override=None, user_preference=None)
+
+    assert secondary.started == 1
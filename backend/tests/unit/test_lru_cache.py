@@ -0,0 +1,49 @@
+from app.core.cache import LRUCache
+from app.core.metrics import metrics
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_least_recently_used_entry() -> None:
+    cache: LRUCache[str, int] = LRUCache("test-lru", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" passa a ser o mais recente
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert metrics.counter("cache_evictions_total", cache="test-lru") == 1
+
+
+def test_lru_respects_byte_budget() -> None:
+    cache: LRUCache[str, str] = LRUCache("test-bytes", max_entries=100, max_bytes=10, sizeof=len)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    cache.set("c", "123")
+
+    assert cache.get("a") is None
+    assert cache.total_bytes == 8
+
+    cache.set("huge", "x" * 11)
+    assert cache.get("huge") is None
+
+
+def test_lru_expires_entries_after_ttl() -> None:
+    clock = FakeClock()
+    cache: LRUCache[str, int] = LRUCache("test-ttl", max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=60)
+
+    clock.now = 6
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
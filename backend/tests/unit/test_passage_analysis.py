@@ -0,0 +1,62 @@
+import pytest
+
+from app.api.v1 import analysis
+from app.db.base import Base
+from app.db.models import User
+from app.db.session import AsyncSessionLocal, engine
+from app.services.llm_types import SentenceAnalysis, TokenAnalysis
+
+
+def test_split_passage_keeps_separators() -> None:
+    segments = analysis._split_passage("Hi there! How are you?\n\nI said \"go.\" Then he left.")
+
+    assert segments == [
+        ("Hi there!", " "),
+        ("How are you?", "\n\n"),
+        ('I said "go."', " "),
+        ("Then he left.", ""),
+    ]
+
+
+class EchoRouter:
+    def __init__(self) -> None:
+        self.sentences: list[str] = []
+
+    async def analyze_sentence(self, sentence_en, context, provider_override, user_preference):
+        self.sentences.append(sentence_en)
+        return (
+            SentenceAnalysis(
+                original_en=sentence_en,
+                translation_pt=f"PT({sentence_en})",
+                tokens=[TokenAnalysis(token=word) for word in sentence_en.split()],
+            ),
+            "gemini",
+            "fake-model",
+        )
+
+
+@pytest.mark.asyncio
+async def test_overlapping_passages_only_analyze_new_sentences() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    analysis._analysis_memory_cache.clear()
+    router = EchoRouter()
+    user = User(full_name="Reader", email="passage@example.com", password_hash="x")
+
+    async with AsyncSessionLocal() as db:
+        first, _, _ = await analysis._analyze_passage_by_sentence(
+            text="The sun rose.\nBirds sang.", llm_router=router, current_user=user, db=db
+        )
+    assert first.original_en == "The sun rose.\nBirds sang."
+    assert first.translation_pt == "PT(The sun rose.)\nPT(Birds sang.)"
+    assert [t.token for t in first.tokens] == ["The", "sun", "rose.", "Birds", "sang."]
+
+    analysis._analysis_memory_cache.clear()  # força a leitura da tabela
+    async with AsyncSessionLocal() as db:
+        second, _, _ = await analysis._analyze_passage_by_sentence(
+            text="The sun rose. A dog barked.", llm_router=router, current_user=user, db=db
+        )
+
+    assert router.sentences == ["The sun rose.", "Birds sang.", "A dog barked."]
+    assert second.translation_pt == "PT(The sun rose.) PT(A dog barked.)"
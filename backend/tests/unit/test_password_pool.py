@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import security
+from app.core.metrics import metrics
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_on_dedicated_pool(monkeypatch) -> None:
+    threads: list[str] = []
+    original_hash = security.pwd_context.hash
+
+    def tracking_hash(password: str) -> str:
+        threads.append(threading.current_thread().name)
+        return original_hash(password)
+
+    monkeypatch.setattr(security.pwd_context, "hash", tracking_hash)
+
+    password_hash = await security.hash_password_async("secret1234")
+
+    assert threads and threads[0].startswith("argon2")
+    assert await security.verify_password_async("secret1234", password_hash)
+    assert not await security.verify_password_async("wrong-pass", password_hash)
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_ticking_during_hash_burst(monkeypatch) -> None:
+    def slow_verify(plain: str, hashed: str) -> bool:
+        threading.Event().wait(0.05)  # simula o custo do argon2 fora do event loop
+        return True
+
+    monkeypatch.setattr(security, "verify_password", slow_verify)
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticking = asyncio.create_task(ticker())
+    results = await asyncio.gather(*(security.verify_password_async("p", "h") for _ in range(8)))
+    ticking.cancel()
+
+    assert all(results)
+    assert ticks >= 10
+    assert metrics.snapshot()["gauges"]["password_hash_queue_depth"] == 0
@@ -0,0 +1,43 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.providers.gemini_provider import GeminiProvider
+
+
+@pytest.mark.asyncio
+async def test_gemini_provider_reuses_pooled_client(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "gemini_api_key", "test-key")
+    seen_clients: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={"candidates": [{"content": {"parts": [{"text": "hello"}]}}]},
+        )
+
+    provider = GeminiProvider()
+    provider._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    for _ in range(3):
+        seen_clients.append(id(provider._get_client()))
+        assert await provider._generate("prompt", "model", 5) == "hello"
+
+    assert len(set(seen_clients)) == 1
+
+    await provider.aclose()
+    assert provider._client is None
+
+
+@pytest.mark.asyncio
+async def test_provider_startup_recreates_closed_client() -> None:
+    provider = GeminiProvider()
+    await provider.startup()
+    first = provider._client
+    await provider.aclose()
+    await provider.startup()
+
+    assert provider._client is not None
+    assert provider._client is not first
+    assert not provider._client.is_closed
+    await provider.aclose()
@@ -0,0 +1,125 @@
+import pytest
+
+from app.middleware.rate_limit import InMemoryRateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("algorithm", ["sliding_window", "token_bucket"])
+def test_limit_is_enforced_and_recovers(algorithm) -> None:
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter("test", algorithm=algorithm, sweep_interval_seconds=3600, clock=clock)
+
+    assert all(limiter.check("k", limit=3, window_seconds=60) for _ in range(3))
+    assert not limiter.check("k", limit=3, window_seconds=60)
+    assert limiter.count("k", window_seconds=60) == 3
+
+    clock.now += 120
+    assert limiter.check("k", limit=3, window_seconds=60)
+    assert limiter.count("other", window_seconds=60) == 0
+
+
+def test_sliding_window_weights_previous_window() -> None:
+    clock = FakeClock()
+    clock.now = 6_000.0  # início exato de uma janela de 60 s
+    limiter = InMemoryRateLimiter("test", algorithm="sliding_window", sweep_interval_seconds=3600, clock=clock)
+    for _ in range(10):
+        limiter.check("k", limit=10, window_seconds=60)
+
+    clock.now += 90  # metade da janela seguinte: 10 * 0.5 = 5 ainda contam
+    assert limiter.count("k", window_seconds=60) == 5
+    assert sum(limiter.check("k", limit=10, window_seconds=60) for _ in range(10)) == 5
+
+
+@pytest.mark.parametrize("algorithm", ["sliding_window", "token_bucket"])
+def test_idle_keys_are_swept(algorithm) -> None:
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter("test", algorithm=algorithm, sweep_interval_seconds=10, clock=clock)
+    for index in range(100):
+        limiter.check(f"ip-{index}", limit=5, window_seconds=60)
+    assert len(limiter) == 100
+
+    clock.now += 180
+    limiter.check("fresh", limit=5, window_seconds=60)
+
+    assert len(limiter) == 1
+
+
+@pytest.fixture
+async def counters_table():
+    from app.db.base import Base
+    from app.db.session import engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_database_backend_shares_quota_between_workers(counters_table) -> None:
+    from app.middleware.rate_limit import DatabaseRateLimitBackend
+
+    clock = FakeClock()
+    clock.now = 86_400.0 * 100  # início de um dia
+    worker_a = DatabaseRateLimitBackend("test", counters_table, purge_interval_seconds=3600, clock=clock)
+    worker_b = DatabaseRateLimitBackend("test", counters_table, purge_interval_seconds=3600, clock=clock)
+
+    results = [await backend.check("daily_chat:u1", 3, 86_400) for backend in (worker_a, worker_b, worker_a, worker_b)]
+
+    assert results == [True, True, True, False]
+    assert await worker_b.count("daily_chat:u1", 86_400) == 3
+    assert await worker_a.check("daily_chat:u2", 3, 86_400)
+
+    clock.now += 86_400 * 1.5  # metade do dia seguinte: 3 * 0.5 ainda pesam
+    assert await worker_a.count("daily_chat:u1", 86_400) == 2
+    assert [await worker_a.check("daily_chat:u1", 3, 86_400) for _ in range(3)] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_database_backend_namespaces_keys_by_limiter(counters_table) -> None:
+    from app.middleware.rate_limit import DatabaseRateLimitBackend
+
+    clock = FakeClock()
+    login = DatabaseRateLimitBackend("login", counters_table, purge_interval_seconds=3600, clock=clock)
+    chat = DatabaseRateLimitBackend("chat", counters_table, purge_interval_seconds=3600, clock=clock)
+
+    assert await login.check("u1", 1, 60)
+    assert not await login.check("u1", 1, 60)
+    assert await chat.check("u1", 1, 60)
+    assert (await login.count("u1", 60), await chat.count("u1", 60)) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_database_backend_purges_expired_windows(counters_table) -> None:
+    from sqlalchemy import func, select
+
+    from app.db.models import RateLimitCounter
+    from app.db.session import AsyncSessionLocal
+    from app.middleware.rate_limit import DatabaseRateLimitBackend
+
+    clock = FakeClock()
+    backend = DatabaseRateLimitBackend("test", counters_table, purge_interval_seconds=3600, clock=clock)
+    await backend.check("ip:/auth", 5, 60)
+    clock.now += 600
+
+    assert await backend.purge_expired() == 1
+    async with AsyncSessionLocal() as db:
+        assert (await db.execute(select(func.count()).select_from(RateLimitCounter))).scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_local_backend_wraps_in_memory_limiter() -> None:
+    from app.middleware.rate_limit import LocalRateLimitBackend
+
+    backend = LocalRateLimitBackend("test", InMemoryRateLimiter("test", sweep_interval_seconds=3600))
+
+    assert await backend.check("k", 1, 60)
+    assert not await backend.check("k", 1, 60)
+    assert await backend.count("k", 60) == 1
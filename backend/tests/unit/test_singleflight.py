@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api.v1 import analysis
+from app.core.singleflight import SingleFlight
+from app.db.base import Base
+from app.db.models import AnalysisCache, User
+from app.db.session import AsyncSessionLocal, engine
+from app.services.llm_types import SentenceAnalysis, TokenAnalysis
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution() -> None:
+    flights: SingleFlight[str, int] = SingleFlight("test")
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flights.do("k", work) for _ in range(10)))
+
+    assert results == [42] * 10
+    assert calls == 1
+    assert flights.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers() -> None:
+    flights: SingleFlight[str, str] = SingleFlight("test-cancel")
+
+    async def work() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    leader = asyncio.create_task(flights.do("k", work))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("k", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
+
+
+class CountingRouter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def analyze_sentence(self, sentence_en, context, provider_override, user_preference):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        return (
+            SentenceAnalysis(original_en=sentence_en, translation_pt="Olá", tokens=[TokenAnalysis(token="Hello")]),
+            "gemini",
+            "fake-model",
+        )
+
+
+@pytest.mark.asyncio
+async def test_identical_analysis_requests_hit_llm_and_cache_once() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    analysis._analysis_memory_cache.clear()
+
+    router = CountingRouter()
+    user = User(full_name="Reader", email="reader@example.com", password_hash="x")
+
+    async def request():
+        async with AsyncSessionLocal() as db:
+            return await analysis._analyze_text_with_cache(
+                text="Hello world passage",
+                context={},
+                llm_router=router,
+                current_user=user,
+                db=db,
+                cache_scope="reading_text",
+            )
+
+    results = await asyncio.gather(*(request() for _ in range(5)))
+
+    assert router.calls == 1
+    assert {r[0].translation_pt for r in results} == {"Olá"}
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(func.count(AnalysisCache.id)))).scalar_one()
+    assert rows == 1
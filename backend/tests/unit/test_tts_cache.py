@@ -0,0 +1,133 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.tts_cache import DiskAudioStore, TTSAudioCache, tts_cache_key
+
+
+def _cache(tmp_path, **overrides) -> TTSAudioCache:
+    options = {
+        "memory_max_entries": 16,
+        "memory_max_bytes": 1024,
+        "disk_dir": str(tmp_path),
+        "disk_max_bytes": 1024,
+    }
+    options.update(overrides)
+    return TTSAudioCache(**options)
+
+
+def test_key_uses_normalized_rate() -> None:
+    assert tts_cache_key("Hi", "en-US-JennyNeural", 1.0) == tts_cache_key("Hi", "en-US-JennyNeural", 1.001)
+    assert tts_cache_key("Hi", "en-US-JennyNeural", 1.0) != tts_cache_key("Hi", "en-GB-RyanNeural", 1.0)
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_synthesize_once(tmp_path) -> None:
+    cache = _cache(tmp_path)
+    calls = 0
+
+    async def synth() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"mp3"
+
+    results = await asyncio.gather(*(cache.get_or_create("k" * 64, synth) for _ in range(5)))
+    assert results == [b"mp3"] * 5
+    assert await cache.get_or_create("k" * 64, synth) == b"mp3"
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_new_instance(tmp_path) -> None:
+    await _cache(tmp_path).put("a" * 64, b"audio")
+
+    restarted = _cache(tmp_path)
+    assert restarted.get_memory("a" * 64) is None
+    assert await restarted.get("a" * 64) == b"audio"
+    assert restarted.get_memory("a" * 64) == b"audio"
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path) -> None:
+    store = DiskAudioStore(tmp_path, max_bytes=25)
+    store.write("a" * 64, b"x" * 10)
+    store.write("b" * 64, b"x" * 10)
+    os.utime(store._path("a" * 64), (1, 1))  # "a" é o menos acessado
+
+    store.write("c" * 64, b"x" * 10)
+
+    assert store.read("a" * 64) is None
+    assert store.read("b" * 64) is not None
+    assert store.read("c" * 64) is not None
+
+
+def test_concurrent_writes_of_same_key_never_interleave(tmp_path) -> None:
+    store = DiskAudioStore(tmp_path, max_bytes=10**9)
+    payloads = [bytes([index]) * 200_000 for index in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda data: store.write("d" * 64, data), payloads * 4))
+
+    assert store.read("d" * 64) in payloads
+    assert [path.name for path in store._path("d" * 64).parent.iterdir()] == [f"{'d' * 64}.mp3"]
+
+
+def test_concurrent_writes_keep_byte_total_in_step_with_disk(tmp_path) -> None:
+    store = DiskAudioStore(tmp_path, max_bytes=50_000)
+    writes = [(f"{index:064x}", bytes(1_000 + index)) for index in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda item: store.write(*item), writes + writes[:50]))
+
+    on_disk = sum(path.stat().st_size for path in store._files())
+    assert store._total_bytes == on_disk
+    assert on_disk <= 50_000
+
+
+@pytest.mark.asyncio
+async def test_long_text_is_synthesized_in_parallel_chunks(tmp_path, monkeypatch) -> None:
+    from app.core.config import settings
+    from app.services import tts_cache
+
+    monkeypatch.setattr(settings, "tts_chunk_threshold_chars", 40)
+    monkeypatch.setattr(settings, "tts_chunk_target_chars", 30)
+    monkeypatch.setattr(settings, "tts_chunk_concurrency", 2)
+    monkeypatch.setattr(tts_cache, "tts_audio_cache", _cache(tmp_path, memory_max_bytes=4096, disk_dir=None))
+    active = 0
+    peak = 0
+    calls: list[str] = []
+
+    async def fake_synthesize(text: str, voice: str, rate: float) -> bytes:
+        nonlocal active, peak
+        calls.append(text)
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01 if text.startswith("First") else 0)  # o primeiro termina por último
+        active -= 1
+        return f"[{text}]".encode()
+
+    monkeypatch.setattr(tts_cache, "synthesize_with_edge_tts", fake_synthesize)
+    passage = "First sentence here. Second one is here. Third closes it. Fourth for luck."
+
+    _, audio = await tts_cache.synthesize_cached(passage, "en-US-JennyNeural", 1.0)
+
+    assert audio == b"[First sentence here.][Second one is here.][Third closes it.][Fourth for luck.]"
+    assert peak == 2
+    reused = await tts_cache.cached_audio(tts_cache.tts_cache_key("Third closes it.", "en-US-JennyNeural", 1.0))
+    assert reused == b"[Third closes it.]"
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize(
+    ("threshold", "target"),
+    [(400, 0), (400, -10), (200, 300)],
+)
+def test_chunk_settings_are_validated(threshold, target) -> None:
+    from pydantic import ValidationError
+
+    from app.core.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(tts_chunk_threshold_chars=threshold, tts_chunk_target_chars=target)
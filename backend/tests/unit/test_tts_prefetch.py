@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import tts_cache
+from app.services.tts_prefetch import TTSPrefetcher
+
+
+@pytest.fixture
+def fake_tts(monkeypatch, tmp_path):
+    calls: list[str] = []
+
+    async def fake_synthesize(text: str, voice: str, rate: float) -> bytes:
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        return f"mp3:{text}".encode()
+
+    monkeypatch.setattr(settings, "tts_prefetch_enabled", True)
+    monkeypatch.setattr(tts_cache, "synthesize_with_edge_tts", fake_synthesize)
+    monkeypatch.setattr(
+        tts_cache,
+        "tts_audio_cache",
+        tts_cache.TTSAudioCache(memory_max_entries=8, memory_max_bytes=1024, disk_dir=None, disk_max_bytes=0),
+    )
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_prefetch_fills_cache_and_dedupes(fake_tts) -> None:
+    prefetcher = TTSPrefetcher(workers=2, max_queue=10)
+
+    assert prefetcher.schedule("Nice to meet you", "en-US-JennyNeural")
+    assert not prefetcher.schedule("Nice to meet you", "en-US-JennyNeural")
+    await prefetcher.join()
+
+    key = tts_cache.tts_cache_key("Nice to meet you", "en-US-JennyNeural", settings.tts_prefetch_rate)
+    assert await tts_cache.cached_audio(key) == b"mp3:Nice to meet you"
+    assert prefetcher.schedule("Nice to meet you", "en-US-JennyNeural")  # já no cache: não sintetiza de novo
+    await prefetcher.join()
+    assert fake_tts == ["Nice to meet you"]
+    await prefetcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_drops_when_queue_is_full(fake_tts) -> None:
+    prefetcher = TTSPrefetcher(workers=1, max_queue=1)
+
+    with prefetcher.interactive():  # segura o worker para a fila encher
+        results = [prefetcher.schedule(text, "en-US-JennyNeural") for text in ("a", "b", "c")]
+        await asyncio.sleep(0.02)
+        assert fake_tts == []
+
+    await prefetcher.join()
+    assert results.count(False) >= 1
+    assert len(fake_tts) == results.count(True)
+    await prefetcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_is_noop_when_disabled(fake_tts, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "tts_prefetch_enabled", False)
+    prefetcher = TTSPrefetcher(workers=1, max_queue=1)
+
+    assert not prefetcher.schedule("hello", "en-US-JennyNeural")
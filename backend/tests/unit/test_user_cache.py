@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import event, select
+
+from app.api import deps
+from app.db.base import Base
+from app.db.models import User
+from app.db.session import AsyncSessionLocal, engine
+
+
+@pytest.fixture
+async def user_id():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    deps.invalidate_user_cache()
+    async with AsyncSessionLocal() as db:
+        user = User(full_name="Cached", email="cached@example.com", password_hash="x")
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+@pytest.fixture
+def statements():
+    captured: list[str] = []
+
+    def capture(_conn, _cursor, statement, *_args):
+        captured.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.asyncio
+async def test_second_lookup_skips_users_query(user_id, statements) -> None:
+    async with AsyncSessionLocal() as db:
+        await deps._load_user(db, user_id)
+    async with AsyncSessionLocal() as db:
+        user = await deps._load_user(db, user_id)
+        assert user.email == "cached@example.com"
+
+    assert sum("FROM users" in statement for statement in statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_user_can_still_be_updated(user_id) -> None:
+    async with AsyncSessionLocal() as db:
+        await deps._load_user(db, user_id)
+    async with AsyncSessionLocal() as db:
+        user = await deps._load_user(db, user_id)
+        user.edge_tts_voice = "en-GB-SoniaNeural"
+        await db.commit()
+
+    async with AsyncSessionLocal() as db:
+        stored = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+        assert stored.edge_tts_voice == "en-GB-SoniaNeural"
+        assert (await deps._load_user(db, user_id)).edge_tts_voice == "en-GB-SoniaNeural"
+
+
+@pytest.mark.asyncio
+async def test_admin_changes_invalidate_cache(user_id) -> None:
+    async with AsyncSessionLocal() as db:
+        assert (await deps._load_user(db, user_id)).tier == "free"
+
+    async with AsyncSessionLocal() as db:
+        target = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+        target.tier = "pro"
+        await db.commit()
+    async with AsyncSessionLocal() as db:
+        assert (await deps._load_user(db, user_id)).tier == "pro"
+
+    async with AsyncSessionLocal() as db:
+        await db.delete(await db.get(User, user_id))
+        await db.commit()
+    async with AsyncSessionLocal() as db:
+        assert await deps._load_user(db, user_id) is None
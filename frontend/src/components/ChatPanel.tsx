@@ -144,13 +144,14 @@ export function ChatPanel({ token, sessionId, messages, reloadMessages }: Props)
               corrected_text: meta.corrected_text,
             });
           },
+          speechRate,
         );
 
         setStreamingText("");
         await reloadMessages(sessionId);
         scrollToBottom();
       } else {
-        const response = await sendChat(token, sessionId, text);
+        const response = await sendChat(token, sessionId, text, speechRate);
         setCorrectionMeta({ ...response.correction_meta, corrected_text: response.corrected_text });
         await reloadMessages(sessionId);
         speak(response.assistant_reply);
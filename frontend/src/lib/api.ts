@@ -233,10 +233,15 @@ export async function listMessages(token: string, sessionId: string): Promise<Me
   return request<Message[]>(`/sessions/${sessionId}/messages`, {}, token);
 }
 
-export async function sendChat(token: string, session_id: string, text_raw: string): Promise<ChatResponse> {
+export async function sendChat(
+  token: string,
+  session_id: string,
+  text_raw: string,
+  speech_rate?: number,
+): Promise<ChatResponse> {
   return request<ChatResponse>("/chat/send", {
     method: "POST",
-    body: JSON.stringify({ session_id, text_raw }),
+    body: JSON.stringify({ session_id, text_raw, speech_rate }),
   }, token);
 }
 
@@ -246,6 +251,7 @@ export async function sendChatStream(
   text_raw: string,
   onChunk: (chunk: string) => void,
   onCorrection: (meta: ChatResponse["correction_meta"] & { user_message_id: string; corrected_text: string }) => void,
+  speech_rate?: number,
 ): Promise<{ assistant_message_id: string; full_reply: string }> {
   const apiBase = getApiBase();
   const url = `${apiBase}/chat/stream`;
@@ -256,7 +262,7 @@ export async function sendChatStream(
       "Content-Type": "application/json",
       Authorization: `Bearer ${token}`,
     },
-    body: JSON.stringify({ session_id, text_raw }),
+    body: JSON.stringify({ session_id, text_raw, speech_rate }),
     cache: "no-store",
   });
 
@@ -421,18 +427,14 @@ export async function updateProfile(
 
 export async function synthesizeSpeech(token: string, text: string, rate = 1): Promise<Blob> {
   const apiBases = buildApiBaseCandidates();
+  const query = new URLSearchParams({ text, rate: String(rate) });
   let response: Response | null = null;
 
   for (const apiBase of apiBases) {
     try {
-      response = await fetch(`${apiBase}/speech/tts`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          Authorization: `Bearer ${token}`,
-        },
-        body: JSON.stringify({ text, rate }),
-        cache: "no-store",
+      // GET (sem no-store): o navegador guarda o áudio (Cache-Control private) e revalida por ETag.
+      response = await fetch(`${apiBase}/speech/tts?${query}`, {
+        headers: { Authorization: `Bearer ${token}` },
       });
       break;
     } catch {